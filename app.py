@@ -1,80 +1,304 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
-from flask_sqlalchemy import SQLAlchemy
-from datetime import datetime
+from flask import (Flask, Blueprint, render_template, request, redirect, url_for, flash,
+                   jsonify, Response, current_app)
+from markupsafe import Markup
+from werkzeug.exceptions import HTTPException
+from werkzeug.local import LocalProxy
+from datetime import datetime, date, timedelta, timezone
+from functools import partial
 import urllib.parse
+import base64
+import hashlib
+import tempfile
+import json
 import os
-from sqlalchemy import text
-
-# Charger les variables d'environnement depuis le fichier .env
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-    print("🔧 Variables d'environnement chargées depuis .env")
-except ImportError:
-    print("⚠️  python-dotenv non installé, utilisation des variables système uniquement")
-
-app = Flask(__name__)
+from sqlalchemy import text, or_, select, func, insert, inspect, literal_column
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm import Session
+from cache_incidents import MANQUANT, creer_cache
+from compression_reponses import CompressionReponses
+from disjoncteur_azure import Disjoncteur
+from ecriture_differee import FileEcriture, FilePleine
+from flux_incidents import DiffuseurIncidents, FERME
+from instantane_incidents import InstantaneLocal
+from jeton_azure import CacheJetons
+from json_rapide import installer_json
+from metriques import MetriquesRequetes, valeurs_instantanees
+from moteur_azure import SQLAlchemyDiffere
+from pool_azure import PoolInstrumente
+from recherche_incidents import IndexInverse, condition_fulltext, tokeniser
+from ressources_statiques import RessourcesStatiques
+from routage_lecture import RoutageLecture, SessionRoutee, lecture_seule
+from sonde_azure import SondeSante
+from stats_incidents import AgregatsIncidents, cle_heure, cle_jour
 
 # ========================================
 # CONFIGURATION AZURE SQL DATABASE
 # ========================================
 
-# 🌐 Configuration Azure SQL Database
-# Modifiez ces paramètres selon votre Azure SQL Database
-AZURE_SQL_SERVER = os.environ.get('AZURE_SQL_SERVER', 'votre-serveur.database.windows.net')
-AZURE_SQL_DATABASE = os.environ.get('AZURE_SQL_DATABASE', 'IncidentsReseau')
-AZURE_SQL_USERNAME = os.environ.get('AZURE_SQL_USERNAME', 'votre-admin')
-AZURE_SQL_PASSWORD = os.environ.get('AZURE_SQL_PASSWORD', 'VotreMotDePasse123!')
-
 # 🔐 Méthodes d'authentification Azure SQL
-def create_azure_connection_string():
-    """Créer la chaîne de connexion Azure SQL Database"""
+def create_azure_connection_string(lecture_seule=False):
+    """Créer la chaîne de connexion Azure SQL Database
+    
+    ``lecture_seule`` : connexion ApplicationIntent=ReadOnly (réplica en lecture),
+    vers AZURE_SQL_REPLICA_SERVER s'il est défini, sinon vers le même serveur.
+    Avec AZURE_SQL_AUTH autre que 'sql', la chaîne ne contient pas
+    d'identifiants : le jeton Azure AD est passé au driver à chaque connexion.
+    """
     
     # Récupérer la configuration depuis les variables d'environnement
+    server = os.environ.get('AZURE_SQL_SERVER', 'votre-serveur.database.windows.net')
+    if lecture_seule:
+        server = os.environ.get('AZURE_SQL_REPLICA_SERVER') or server
+    database = os.environ.get('AZURE_SQL_DATABASE', 'IncidentsReseau')
+    username = os.environ.get('AZURE_SQL_USERNAME', 'votre-admin')
+    password = os.environ.get('AZURE_SQL_PASSWORD', 'VotreMotDePasse123!')
     odbc_driver = os.environ.get('AZURE_ODBC_DRIVER', 'ODBC Driver 18 for SQL Server')
     encrypt = os.environ.get('AZURE_ENCRYPT', 'yes')
     trust_cert = os.environ.get('AZURE_TRUST_SERVER_CERTIFICATE', 'no')
     timeout = os.environ.get('AZURE_CONNECTION_TIMEOUT', '30')
+    mode = os.environ.get('AZURE_SQL_AUTH', 'sql')
     
-    # Option 1: Authentification SQL Server (classique)
-    if AZURE_SQL_USERNAME and AZURE_SQL_PASSWORD:
+    if mode != 'sql':
+        # Option 1: Azure Active Directory (identité managée, principal de service)
+        print(f"🔐 Utilisation d'un jeton Azure AD ({mode}) pour Azure SQL")
+        identifiants = ""
+    elif username and password:
+        # Option 2: Authentification SQL Server (classique)
         print("🔐 Utilisation de l'authentification SQL Server pour Azure")
-        connection_params = urllib.parse.quote_plus(
-            f"DRIVER={{{odbc_driver}}};"
-            f"SERVER={AZURE_SQL_SERVER};"
-            f"DATABASE={AZURE_SQL_DATABASE};"
-            f"UID={AZURE_SQL_USERNAME};"
-            f"PWD={AZURE_SQL_PASSWORD};"
-            f"Encrypt={encrypt};"                    # Configuration depuis .env
-            f"TrustServerCertificate={trust_cert};"  # Configuration depuis .env
-            f"Connection Timeout={timeout};"
-        )
+        identifiants = f"UID={username};PWD={password};"
     else:
-        # Option 2: Azure Active Directory (pour plus tard)
         print("⚠️  Variables d'environnement manquantes pour Azure SQL")
         raise ValueError("Configuration Azure SQL incomplète")
     
+    connection_params = urllib.parse.quote_plus(
+        f"DRIVER={{{odbc_driver}}};"
+        f"SERVER={server};"
+        f"DATABASE={database};"
+        f"{identifiants}"
+        f"Encrypt={encrypt};"                    # Configuration depuis .env
+        f"TrustServerCertificate={trust_cert};"  # Configuration depuis .env
+        f"Connection Timeout={timeout};"
+        + ("ApplicationIntent=ReadOnly;" if lecture_seule else "")
+    )
+    
     return f"mssql+pyodbc:///?odbc_connect={connection_params}"
 
-# Configuration Flask
-app.config['SQLALCHEMY_DATABASE_URI'] = create_azure_connection_string()
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'azure-secret-key-dev')
+def create_azure_credential(mode):
+    """Créer le credential azure-identity du mode AZURE_SQL_AUTH
+    
+    'managed-identity' (AZURE_CLIENT_ID pour une identité affectée par
+    l'utilisateur), 'service-principal' (AZURE_TENANT_ID, AZURE_CLIENT_ID,
+    AZURE_CLIENT_SECRET) ou 'default' (DefaultAzureCredential : variables
+    d'environnement, identité managée, Azure CLI...).
+    """
+    from azure.identity import ClientSecretCredential, DefaultAzureCredential, ManagedIdentityCredential
+    
+    if mode == 'managed-identity':
+        return ManagedIdentityCredential(client_id=os.environ.get('AZURE_CLIENT_ID'))
+    if mode == 'service-principal':
+        return ClientSecretCredential(os.environ['AZURE_TENANT_ID'], os.environ['AZURE_CLIENT_ID'],
+                                      os.environ['AZURE_CLIENT_SECRET'])
+    if mode == 'default':
+        return DefaultAzureCredential()
+    raise ValueError(f"Mode d'authentification Azure SQL inconnu: {mode}")
+
+# 🏊 Pool de connexions Azure SQL
+def create_engine_options(uri):
+    """Créer les options du moteur SQLAlchemy (pool de connexions Azure SQL)"""
+    url = make_url(uri)
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        # SQLite en mémoire : SQLAlchemy impose un pool à connexion unique
+        return {}
+    
+    # Échecs consécutifs avant ouverture, durée d'ouverture, nouveaux essais des erreurs transitoires
+    disjoncteur = Disjoncteur(seuil=int(os.environ.get('AZURE_DISJONCTEUR_SEUIL', '5')),
+                              delai_ouverture=float(os.environ.get('AZURE_DISJONCTEUR_DELAI', '30')),
+                              tentatives=int(os.environ.get('AZURE_RETRY_TENTATIVES', '3')),
+                              delai_base=float(os.environ.get('AZURE_RETRY_DELAI', '0.2')),
+                              delai_max=float(os.environ.get('AZURE_RETRY_DELAI_MAX', '2')))
+    options = {
+        'poolclass': PoolInstrumente.avec(disjoncteur),
+        'pool_size': int(os.environ.get('AZURE_POOL_SIZE', '5')),
+        'max_overflow': int(os.environ.get('AZURE_POOL_MAX_OVERFLOW', '10')),
+        'pool_timeout': float(os.environ.get('AZURE_POOL_TIMEOUT', '30')),
+        # Azure SQL coupe les connexions inactives : les recycler avant
+        'pool_recycle': int(os.environ.get('AZURE_POOL_RECYCLE', '1200')),
+        # Vérifier la connexion au checkout plutôt qu'échouer sur la première requête
+        'pool_pre_ping': os.environ.get('AZURE_POOL_PRE_PING', 'yes') == 'yes'
+    }
+    if url.get_driver_name() == 'pyodbc':
+        # fast_executemany : chaque lot d'insertions part en un seul aller-retour ODBC
+        options['fast_executemany'] = True
+        jetons = current_app.extensions.get('jetons_azure')
+        if jetons is not None:
+            # Jeton Azure AD lu dans le cache du processus à chaque nouvelle connexion du pool
+            options['attributs_connexion'] = jetons.attributs_connexion
+    return options
+
+def create_binds():
+    """Moteurs secondaires : réplica en lecture optionnel (bind 'lecture')
+    
+    DATABASE_URL_LECTURE vise une autre base (SQLite en local) ;
+    AZURE_SQL_LECTURE=yes ouvre une connexion ApplicationIntent=ReadOnly.
+    """
+    if os.environ.get('DATABASE_URL_LECTURE'):
+        return {'lecture': os.environ['DATABASE_URL_LECTURE']}
+    if os.environ.get('AZURE_SQL_LECTURE', 'no') == 'yes':
+        return {'lecture': partial(create_azure_connection_string, lecture_seule=True)}
+    return {}
+
+def charger_variables_env():
+    """Charger les variables d'environnement depuis le fichier .env"""
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        print("⚠️  python-dotenv non installé, utilisation des variables système uniquement")
+
+def create_config():
+    """Créer la configuration Flask à partir des variables d'environnement
+    
+    La chaîne de connexion et les options du moteur sont passées sous forme de
+    fonctions : elles ne sont évaluées qu'à la première requête SQL.
+    DATABASE_URL permet de viser une autre base (SQLite pour les benchmarks).
+    """
+    return {
+        'SQLALCHEMY_DATABASE_URI': os.environ.get('DATABASE_URL') or create_azure_connection_string,
+        'SQLALCHEMY_ENGINE_OPTIONS': create_engine_options,
+        'SQLALCHEMY_BINDS': create_binds(),
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+        'SECRET_KEY': os.environ.get('SECRET_KEY', 'azure-secret-key-dev'),
+        
+        # Informations affichées par les routes de diagnostic
+        'AZURE_SQL_SERVER': os.environ.get('AZURE_SQL_SERVER', 'votre-serveur.database.windows.net'),
+        'AZURE_SQL_DATABASE': os.environ.get('AZURE_SQL_DATABASE', 'IncidentsReseau'),
+        'AZURE_SQL_USERNAME': os.environ.get('AZURE_SQL_USERNAME', 'votre-admin'),
+        
+        # Authentification : 'sql' (utilisateur / mot de passe), 'managed-identity', 'service-principal'
+        # ou 'default' (jeton Azure AD renouvelé AZURE_JETON_MARGE secondes avant expiration)
+        'AZURE_SQL_AUTH': os.environ.get('AZURE_SQL_AUTH', 'sql'),
+        'AZURE_JETON_MARGE': float(os.environ.get('AZURE_JETON_MARGE', '300')),
+        
+        # Pagination par curseur (keyset) des listes d'incidents
+        'PAGE_TAILLE_DEFAUT': int(os.environ.get('PAGE_TAILLE_DEFAUT', '50')),
+        'PAGE_TAILLE_MAX': int(os.environ.get('PAGE_TAILLE_MAX', '500')),
+        
+        # Export en flux : nombre de lignes lues par lot sur le curseur serveur
+        'EXPORT_TAILLE_LOT': int(os.environ.get('EXPORT_TAILLE_LOT', '1000')),
+        
+        # Ingestion en masse : taille des lots insérés et nombre maximal de lignes par requête
+        'BULK_TAILLE_LOT': int(os.environ.get('BULK_TAILLE_LOT', '1000')),
+        'BULK_MAX_LIGNES': int(os.environ.get('BULK_MAX_LIGNES', '50000')),
+        
+        # Cache de lecture des incidents (backend 'lru' ou 'aucun')
+        'CACHE_BACKEND': os.environ.get('CACHE_BACKEND', 'lru'),
+        'CACHE_TAILLE_MAX': int(os.environ.get('CACHE_TAILLE_MAX', '1024')),
+        'CACHE_TTL': float(os.environ.get('CACHE_TTL', '30')),
+        
+        # Sonde de santé : intervalle entre deux mesures et nombre de mesures conservées
+        'SONDE_INTERVALLE': float(os.environ.get('SONDE_INTERVALLE', '15')),
+        'SONDE_FENETRE': int(os.environ.get('SONDE_FENETRE', '120')),
+        # Nombre d'incidents et détails du serveur (COUNT complet) : relus bien moins souvent que la latence
+        'SONDE_INTERVALLE_INFORMATIONS': float(os.environ.get('SONDE_INTERVALLE_INFORMATIONS', '300')),
+        
+        # Flux temps réel (SSE) : lecture des nouveautés, battement de cœur, file par abonné
+        'FLUX_INTERVALLE': float(os.environ.get('FLUX_INTERVALLE', '2')),
+        'FLUX_HEARTBEAT': float(os.environ.get('FLUX_HEARTBEAT', '15')),
+        'FLUX_FILE_MAX': int(os.environ.get('FLUX_FILE_MAX', '100')),
+        
+        # Statistiques : réconciliation avec la table et fenêtres des histogrammes
+        'STATS_RECONCILIATION': float(os.environ.get('STATS_RECONCILIATION', '300')),
+        'STATS_HEURES': int(os.environ.get('STATS_HEURES', '168')),
+        'STATS_JOURS': int(os.environ.get('STATS_JOURS', '90')),
+        
+        # Encodage des réponses JSON : 'auto' (orjson s'il est installé), 'orjson' ou 'standard'
+        'JSON_BACKEND': os.environ.get('JSON_BACKEND', 'auto'),
+        
+        # Métriques par route exposées sur /metrics (format Prometheus)
+        'METRIQUES_ACTIVES': os.environ.get('METRIQUES_ACTIVES', 'yes') == 'yes',
+        
+        # Recherche plein texte : 'auto' (index SQL Server si présent), 'fulltext' ou 'memoire'
+        'RECHERCHE_BACKEND': os.environ.get('RECHERCHE_BACKEND', 'auto'),
+        
+        # Compression gzip / brotli des réponses HTML et JSON au-delà du seuil (octets)
+        'COMPRESSION_SEUIL': int(os.environ.get('COMPRESSION_SEUIL', '1024')),
+        'COMPRESSION_NIVEAU_GZIP': int(os.environ.get('COMPRESSION_NIVEAU_GZIP', '6')),
+        'COMPRESSION_NIVEAU_BROTLI': int(os.environ.get('COMPRESSION_NIVEAU_BROTLI', '4')),
+        
+        # Fragments HTML des cartes d'incident (même backend que le cache de lecture)
+        'FRAGMENTS_TAILLE_MAX': int(os.environ.get('FRAGMENTS_TAILLE_MAX', '5000')),
+        'FRAGMENTS_TTL': float(os.environ.get('FRAGMENTS_TTL', '3600')),
+        
+        # Écriture différée du formulaire d'ajout : file bornée, lots, spool local (défaut : instance/spool)
+        'ECRITURE_DIFFEREE': os.environ.get('ECRITURE_DIFFEREE', 'no') == 'yes',
+        'ECRITURE_SPOOL': os.environ.get('ECRITURE_SPOOL'),
+        'ECRITURE_FILE_MAX': int(os.environ.get('ECRITURE_FILE_MAX', '1000')),
+        'ECRITURE_TAILLE_LOT': int(os.environ.get('ECRITURE_TAILLE_LOT', '100')),
+        'ECRITURE_DELAI': float(os.environ.get('ECRITURE_DELAI', '0.05')),
+        'ECRITURE_ATTENTE_MAX': float(os.environ.get('ECRITURE_ATTENTE_MAX', '2')),
+        
+        # Instantané local des incidents récents, servi quand Azure SQL est injoignable ou trop lent
+        # (désactivé par défaut ; fichier sur le disque local, jamais sur le partage réseau de wwwroot :
+        # le journal WAL de SQLite n'y est pas fiable ; latence max 0 = repli uniquement sur erreur)
+        'INSTANTANE_ACTIF': os.environ.get('INSTANTANE_ACTIF', 'no') == 'yes',
+        'INSTANTANE_CHEMIN': os.environ.get('INSTANTANE_CHEMIN'),
+        'INSTANTANE_TAILLE_MAX': int(os.environ.get('INSTANTANE_TAILLE_MAX', '5000')),
+        'INSTANTANE_INTERVALLE': float(os.environ.get('INSTANTANE_INTERVALLE', '30')),
+        'INSTANTANE_OBSOLESCENCE_MAX': float(os.environ.get('INSTANTANE_OBSOLESCENCE_MAX', '3600')),
+        'INSTANTANE_LATENCE_MAX_MS': float(os.environ.get('INSTANTANE_LATENCE_MAX_MS', '2000')),
+        
+        # Réplica en lecture : mesure du retard, retard toléré, durée de lecture sur le primaire après une écriture
+        'LECTURE_INTERVALLE': float(os.environ.get('LECTURE_INTERVALLE', '5')),
+        'LECTURE_RETARD_MAX': float(os.environ.get('LECTURE_RETARD_MAX', '30')),
+        'LECTURE_COHERENCE': float(os.environ.get('LECTURE_COHERENCE', '10')),
+        
+        # Flux de changements : âge minimal (secondes) des modifications renvoyées
+        'CHANGEMENTS_MARGE': float(os.environ.get('CHANGEMENTS_MARGE', '5'))
+    }
+
+# Extension SQLAlchemy : moteurs créés à la première requête SQL
+db = SQLAlchemyDiffere(session_options={'class_': SessionRoutee})
+
+# Cache de lecture et sonde de santé de l'application courante
+cache = LocalProxy(lambda: current_app.extensions['cache_incidents'])
+sonde = LocalProxy(lambda: current_app.extensions['sonde_sante'])
+diffuseur = LocalProxy(lambda: current_app.extensions['diffuseur_incidents'])
+statistiques = LocalProxy(lambda: current_app.extensions['statistiques_incidents'])
+recherche = LocalProxy(lambda: current_app.extensions['recherche_incidents'])
+fragments = LocalProxy(lambda: current_app.extensions['fragments_incidents'])
 
-# Initialisation SQLAlchemy
-db = SQLAlchemy(app)
+bp = Blueprint('incidents', __name__)
 
 # ========================================
 # MODÈLE DE DONNÉES (identique au projet original)
 # ========================================
 
+# Sévérités autorisées (contrainte CHECK de init_azure_database.sql)
+SEVERITES = ('Faible', 'Moyenne', 'Élevée', 'Critique')
+
+def formater_date_incident(date_incident):
+    """Format des dates d'incident en JSON (AAAA-MM-JJ HH:MM)"""
+    # isoformat() est plusieurs fois plus rapide que strftime('%Y-%m-%d %H:%M')
+    return date_incident.isoformat(' ', 'minutes')
+
 class Incident(db.Model):
     __tablename__ = 'incidents'
     
     id = db.Column(db.Integer, primary_key=True)
     titre = db.Column(db.String(200), nullable=False)
     severite = db.Column(db.String(50), nullable=False)
+    description = db.Column(db.String(1000))
     date_incident = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # Mise à jour par le trigger tr_incidents_update_date (Azure SQL) et par l'ORM : flux de changements
+    date_modification = db.Column(db.DateTime, nullable=False, default=datetime.utcnow,
+                                  onupdate=datetime.utcnow)
+    
+    # Index de init_azure_database.sql, utilisés par la pagination par curseur et le flux de changements
+    __table_args__ = (
+        db.Index('IX_incidents_date_severite', date_incident.desc(), severite),
+        db.Index('IX_incidents_date_modification', date_modification, id),
+    )
     
     def __repr__(self):
         return f'<Incident {self.id}: {self.titre}>'
@@ -85,20 +309,677 @@ class Incident(db.Model):
             'id': self.id,
             'titre': self.titre,
             'severite': self.severite,
-            'date_incident': self.date_incident.strftime('%Y-%m-%d %H:%M')
+            'date_incident': formater_date_incident(self.date_incident)
         }
 
+# Colonnes lues par les listes et l'export : lignes Core, sans objets Incident
+COLONNES_LISTE = (Incident.id, Incident.titre, Incident.severite, Incident.date_incident)
+
+def lignes_en_dicts(lignes):
+    """Convertir des lignes de COLONNES_LISTE au format de Incident.to_dict()"""
+    return [
+        {'id': identifiant, 'titre': titre, 'severite': severite,
+         'date_incident': formater_date_incident(date_incident)}
+        for identifiant, titre, severite, date_incident in lignes
+    ]
+
+# ========================================
+# PAGINATION PAR CURSEUR (KEYSET)
+# ========================================
+
+def encoder_position(date_position, identifiant):
+    """Encoder une position (date, id) en curseur opaque"""
+    brut = f"{date_position.isoformat()}|{identifiant}"
+    return base64.urlsafe_b64encode(brut.encode('utf-8')).decode('ascii').rstrip('=')
+
+def encoder_curseur(incident):
+    """Encoder la position (date_incident, id) d'un incident en curseur opaque"""
+    return encoder_position(incident.date_incident, incident.id)
+
+def decoder_curseur(curseur):
+    """Décoder un curseur opaque en couple (date_incident, id)"""
+    try:
+        brut = base64.urlsafe_b64decode(curseur + '=' * (-len(curseur) % 4)).decode('utf-8')
+        date_texte, id_texte = brut.rsplit('|', 1)
+        return datetime.fromisoformat(date_texte), int(id_texte)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError('Curseur de pagination invalide')
+
+def lire_limite():
+    """Lire le paramètre limit, borné par PAGE_TAILLE_MAX"""
+    limite = request.args.get('limit', type=int) or current_app.config['PAGE_TAILLE_DEFAUT']
+    return max(1, min(limite, current_app.config['PAGE_TAILLE_MAX']))
+
+def lire_parametres_pagination():
+    """Lire les paramètres limit/after de la requête courante"""
+    curseur = request.args.get('after')
+    return lire_limite(), decoder_curseur(curseur) if curseur else None
+
+# ========================================
+# FILTRES (SÉVÉRITÉ, PLAGE DE DATES)
+# ========================================
+
+def lire_date_filtre(nom):
+    """Lire une borne de date ISO 8601 (paramètre from ou to)"""
+    valeur = request.args.get(nom)
+    if not valeur:
+        return None
+    try:
+        borne = datetime.fromisoformat(valeur)
+    except ValueError:
+        raise ValueError(f'Date invalide pour {nom}: {valeur}')
+    if borne.tzinfo is not None:
+        borne = borne.astimezone().replace(tzinfo=None)
+    return borne
+
+def lire_filtres():
+    """Lire les filtres severite/from/to de la requête courante
+    
+    Renvoie le tuple ``(severites, debut, fin)``, utilisable en clé de cache.
+    ``severite`` peut être répété ou séparé par des virgules ; ``from`` est
+    inclus et ``to`` exclu.
+    """
+    severites = sorted({severite.strip()
+                        for valeur in request.args.getlist('severite')
+                        for severite in valeur.split(',') if severite.strip()})
+    for severite in severites:
+        if severite not in SEVERITES:
+            raise ValueError(f'Sévérité invalide: {severite}')
+    
+    debut, fin = lire_date_filtre('from'), lire_date_filtre('to')
+    if debut and fin and debut >= fin:
+        raise ValueError('La date from doit précéder la date to')
+    return tuple(severites), debut, fin
+
+def parametres_filtres():
+    """Paramètres de filtre bruts, reportés dans les liens de pagination"""
+    parametres = {
+        'severite': [valeur for valeur in request.args.getlist('severite') if valeur],
+        'from': request.args.get('from'),
+        'to': request.args.get('to')
+    }
+    return {nom: valeur for nom, valeur in parametres.items() if valeur}
+
+def filtrer_incidents(requete, filtres):
+    """Appliquer les filtres dans la clause WHERE
+    
+    Les bornes de date portent sur la première colonne de
+    IX_incidents_date_severite (seek sur une plage), la sévérité sur la
+    seconde : elle est évaluée dans l'index, avant toute lecture de ligne.
+    """
+    severites, debut, fin = filtres
+    if debut is not None:
+        requete = requete.filter(Incident.date_incident >= debut)
+    if fin is not None:
+        requete = requete.filter(Incident.date_incident < fin)
+    if severites:
+        requete = requete.filter(Incident.severite.in_(severites))
+    return requete
+
+def paginer_incidents(limite, apres=None, filtres=None, connexion=None):
+    """Lire une page d'incidents triés par (date_incident, id) décroissants
+    
+    Le coût d'une page ne dépend pas de la taille de la table : la condition
+    ``date_incident <= :date`` permet un seek sur IX_incidents_date_severite,
+    puis seules ``limite + 1`` lignes sont lues pour détecter la page suivante.
+    Renvoie des lignes Core (colonnes de COLONNES_LISTE). ``connexion``
+    permet de lire une autre copie de la table (instantané local).
+    """
+    requete = select(*COLONNES_LISTE)
+    if filtres is not None:
+        requete = filtrer_incidents(requete, filtres)
+    if apres is not None:
+        date_ref, id_ref = apres
+        requete = requete.filter(
+            Incident.date_incident <= date_ref,
+            or_(Incident.date_incident < date_ref, Incident.id < id_ref)
+        )
+    
+    incidents = (connexion or db.session).execute(
+        requete
+        .order_by(Incident.date_incident.desc(), Incident.id.desc())
+        .limit(limite + 1)
+    ).all()
+    
+    curseur_suivant = None
+    if len(incidents) > limite:
+        incidents = incidents[:limite]
+        curseur_suivant = encoder_curseur(incidents[-1])
+    
+    return incidents, curseur_suivant
+
+def lire_en_cache(cle, calcul):
+    """Lire via le cache de lecture, avec une entrée par moteur (primaire / réplica)
+    
+    Un client épinglé au primaire après une écriture lit hors cache. Une
+    lecture du réplica n'est pas mémorisée dans les LECTURE_RETARD_MAX
+    secondes qui suivent l'invalidation de son espace.
+    """
+    routage = current_app.extensions.get('routage_lecture')
+    if routage is None:
+        return cache.lire_ou_calculer(cle, calcul)
+    
+    source = routage.source_cache()
+    if source is None:
+        return calcul()
+    quarantaine = routage.retard_max if source == 'replica' else 0.0
+    return cache.lire_ou_calculer(cle + (source,), calcul, quarantaine=quarantaine)
+
+def lire_page_incidents(limite, apres=None, filtres=None, version=None):
+    """Lire une page d'incidents sérialisés, via le cache de lecture
+    
+    Renvoie ``(incidents, curseur_suivant, dernier_id)``. Sur la première page
+    non filtrée, ``dernier_id`` est MAX(id) lu juste avant la page et mis en
+    cache avec elle : le flux SSE du tableau de bord part de là (None sinon).
+    ``version`` (version_table()) fait partie de la clé : une réponse
+    annoncée sous un ETag ne vient jamais d'une page antérieure.
+    """
+    def calculer():
+        dernier_id = None
+        if apres is None and not any(filtres or ()):
+            # Un incident ajouté entre les deux lectures est affiché puis diffusé : le script ignore le doublon
+            dernier_id = db.session.execute(select(func.max(Incident.id))).scalar() or 0
+        incidents, curseur_suivant = paginer_incidents(limite, apres, filtres)
+        return lignes_en_dicts(incidents), curseur_suivant, dernier_id
+    
+    return lire_en_cache(('liste', limite, apres, filtres, version), calculer)
+
+# ========================================
+# REQUÊTES CONDITIONNELLES (ETag / Last-Modified)
+# ========================================
+
+def version_table():
+    """Lire la version de la table incidents (dernier id, dernière écriture)
+    
+    Les deux agrégats sont résolus par un seek sur la clé primaire et sur
+    IX_incidents_date_modification. date_modification est l'heure UTC de
+    l'écriture (ORM ou trigger), et non date_incident, date de l'événement
+    qui peut être antidatée par un import en masse.
+    
+    Lue à chaque requête, sans cache : le cache est propre au worker, une
+    version mise en cache continuerait d'annoncer 304 après une écriture
+    passée par un autre worker. Elle entre dans la clé de cache des réponses
+    validées par ETag, qui ne peuvent donc pas être plus anciennes qu'elle.
+    """
+    return tuple(db.session.execute(
+        select(func.max(Incident.id), func.max(Incident.date_modification))
+    ).one())
+
+def validateurs_http(version):
+    """Calculer l'ETag et la date Last-Modified de la requête courante"""
+    dernier_id, derniere_date = version
+    empreinte = f"{dernier_id}|{derniere_date}|{request.full_path}"
+    etag = hashlib.sha1(empreinte.encode('utf-8')).hexdigest()
+    derniere_modification = (derniere_date.replace(microsecond=0, tzinfo=timezone.utc)
+                             if derniere_date else None)
+    return etag, derniere_modification
+
+def est_non_modifie(etag, derniere_modification):
+    """Vérifier les en-têtes If-None-Match / If-Modified-Since de la requête"""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and derniere_modification:
+        return derniere_modification <= request.if_modified_since
+    return False
+
+def appliquer_validateurs(reponse, etag, derniere_modification):
+    """Ajouter ETag et Last-Modified à une réponse"""
+    reponse.set_etag(etag)
+    if derniere_modification:
+        reponse.last_modified = derniere_modification
+    return reponse
+
+def reponse_non_modifiee(etag, derniere_modification):
+    """Réponse 304 sans corps, ni requête ni sérialisation"""
+    return appliquer_validateurs(Response(status=304), etag, derniere_modification)
+
+# ========================================
+# FLUX DE CHANGEMENTS (SYNCHRONISATION)
+# ========================================
+
+# Incident complet : les intégrations remplacent leur copie par id
+COLONNES_CHANGEMENTS = (Incident.id, Incident.titre, Incident.severite, Incident.description,
+                        Incident.date_incident, Incident.date_modification)
+
+def lire_changements(limite, depuis=None):
+    """Lire les incidents créés ou modifiés après la position ``depuis``
+    
+    Tri par (date_modification, id) croissants, seek sur
+    IX_incidents_date_modification : le coût dépend du nombre de changements,
+    pas de la taille de la table. Seules les lignes modifiées il y a plus de
+    CHANGEMENTS_MARGE secondes sont lues, pour que le curseur ne dépasse pas
+    une transaction encore en cours (ou une horloge de worker en avance).
+    Renvoie ``(lignes, reste)``.
+    """
+    borne = datetime.utcnow() - timedelta(seconds=current_app.config['CHANGEMENTS_MARGE'])
+    requete = select(*COLONNES_CHANGEMENTS).where(Incident.date_modification < borne)
+    if depuis is not None:
+        date_ref, id_ref = depuis
+        requete = requete.where(
+            Incident.date_modification >= date_ref,
+            or_(Incident.date_modification > date_ref, Incident.id > id_ref)
+        )
+    
+    lignes = db.session.execute(
+        requete
+        .order_by(Incident.date_modification, Incident.id)
+        .limit(limite + 1)
+    ).all()
+    return lignes[:limite], len(lignes) > limite
+
+def changement_en_dict(ligne):
+    """Ligne de COLONNES_CHANGEMENTS au format JSON du flux"""
+    identifiant, titre, severite, description, date_incident, date_modification = ligne
+    return {
+        'id': identifiant,
+        'titre': titre,
+        'severite': severite,
+        'description': description,
+        'date_incident': formater_date_incident(date_incident),
+        'date_modification': date_modification.isoformat()
+    }
+
+# ========================================
+# INGESTION EN MASSE
+# ========================================
+
+def lire_lignes_bulk():
+    """Lire le corps d'une requête bulk (tableau JSON ou NDJSON)"""
+    if request.mimetype == 'application/x-ndjson':
+        lignes = []
+        for texte in request.get_data(as_text=True).splitlines():
+            if not texte.strip():
+                continue
+            try:
+                lignes.append(json.loads(texte))
+            except ValueError:
+                lignes.append(texte)  # rejetée à la validation
+        return lignes
+    
+    lignes = request.get_json(silent=True)
+    if not isinstance(lignes, list):
+        raise ValueError('Le corps doit être un tableau JSON ou du NDJSON')
+    return lignes
+
+def valider_incident(ligne, maintenant):
+    """Valider une ligne d'ingestion, renvoie (valeurs, erreurs)"""
+    if not isinstance(ligne, dict):
+        return None, ['Ligne JSON invalide']
+    
+    erreurs = []
+    titre = ligne.get('titre')
+    titre = titre.strip() if isinstance(titre, str) else ''
+    if not titre:
+        erreurs.append('Le titre est obligatoire')
+    elif len(titre) > 200:
+        erreurs.append('Le titre dépasse 200 caractères')
+    
+    severite = ligne.get('severite', 'Moyenne')
+    if severite not in SEVERITES:
+        erreurs.append(f'Sévérité invalide: {severite}')
+    
+    date_incident = ligne.get('date_incident')
+    if date_incident is None:
+        date_incident = maintenant
+    else:
+        try:
+            date_incident = datetime.fromisoformat(date_incident)
+            if date_incident.tzinfo is not None:
+                date_incident = date_incident.astimezone().replace(tzinfo=None)
+        except (TypeError, ValueError):
+            erreurs.append(f'Date invalide: {date_incident}')
+    
+    description = ligne.get('description')
+    if description is not None and not isinstance(description, str):
+        erreurs.append('La description doit être du texte')
+    elif description and len(description) > 1000:
+        erreurs.append('La description dépasse 1000 caractères')
+    
+    if erreurs:
+        return None, erreurs
+    return {'titre': titre, 'severite': severite, 'description': description or None,
+            'date_incident': date_incident}, []
+
+def valider_incidents(lignes):
+    """Valider toutes les lignes en une passe, avant tout accès à la base"""
+    maintenant = datetime.now()
+    valides, resultats = [], []
+    for index, ligne in enumerate(lignes):
+        valeurs, erreurs = valider_incident(ligne, maintenant)
+        if erreurs:
+            resultats.append({'ligne': index, 'statut': 'rejete', 'erreurs': erreurs})
+        else:
+            resultats.append({'ligne': index, 'statut': 'en_attente'})
+            valides.append((index, valeurs))
+    return valides, resultats
+
+def inserer_par_lots(valides, resultats, taille_lot):
+    """Insérer les lignes valides par lots, une transaction par lot"""
+    table = Incident.__table__
+    lots = []
+    for debut in range(0, len(valides), taille_lot):
+        lot = valides[debut:debut + taille_lot]
+        try:
+            with db.engine.begin() as connexion:
+                # executemany : fast_executemany côté pyodbc
+                connexion.execute(insert(table), [valeurs for _, valeurs in lot])
+            statut, erreur = 'commit', None
+        except Exception as e:
+            statut, erreur = 'rollback', str(e)
+        
+        for index, _ in lot:
+            resultats[index]['statut'] = 'insere' if statut == 'commit' else 'annule'
+        lots.append({
+            'lot': len(lots),
+            'lignes': [lot[0][0], lot[-1][0]],
+            'taille': len(lot),
+            'statut': statut,
+            'erreur': erreur
+        })
+    return lots
+
+# ========================================
+# ÉCRITURE DIFFÉRÉE (GROUP COMMIT)
+# ========================================
+
+def ecrire_lot_incidents(app, lignes):
+    """Insérer un lot de créations en une transaction (thread d'écriture)"""
+    with app.app_context():
+        with db.engine.begin() as connexion:
+            connexion.execute(insert(Incident.__table__), lignes)
+
+def apres_lot_incidents(app, lignes):
+    """Répercuter un lot écrit sur les caches, le flux et les statistiques"""
+    with app.app_context():
+        cache.invalider('liste')
+        diffuseur.reveiller()
+        for valeurs in lignes:
+            statistiques.enregistrer(valeurs['severite'], valeurs['date_incident'])
+        # Ids non relus, comme pour le bulk : l'index de recherche les rattrape
+
+# ========================================
+# FLUX TEMPS RÉEL (SERVER-SENT EVENTS)
+# ========================================
+
+def incidents_crees_apres(app, dernier_id, limite=500):
+    """Incidents créés après dernier_id, dans l'ordre de création"""
+    with app.app_context():
+        return lignes_en_dicts(db.session.execute(
+            select(*COLONNES_LISTE)
+            .where(Incident.id > dernier_id)
+            .order_by(Incident.id)
+            .limit(limite)
+        ))
+
+def dernier_id_incident(app):
+    """Id de l'incident le plus récent (point de départ du diffuseur)"""
+    with app.app_context():
+        return db.session.execute(select(func.max(Incident.id))).scalar()
+
+def evenement_sse(incident, json_dumps):
+    """Formater un incident en événement Server-Sent Events"""
+    return f"id: {incident['id']}\nevent: incident\ndata: {json_dumps(incident)}\n\n"
+
+# ========================================
+# STATISTIQUES (RÉCONCILIATION EN BASE)
+# ========================================
+
+def tranche_date(colonne, unite, dialecte):
+    """Expression SQL tronquant une date à l'heure ('hour') ou au jour ('day')"""
+    if dialecte == 'mssql':
+        # DATEADD(unite, DATEDIFF(unite, 0, date), 0) : troncature sans FORMAT()
+        unite_sql = literal_column(unite)
+        return func.dateadd(unite_sql, func.datediff(unite_sql, literal_column('0'), colonne),
+                            literal_column('0'))
+    if dialecte == 'sqlite':
+        return func.strftime('%Y-%m-%d %H:00:00' if unite == 'hour' else '%Y-%m-%d', colonne)
+    return func.date_trunc(unite, colonne)
+
+def en_datetime(valeur):
+    """Normaliser une tranche renvoyée par la base (datetime, date ou texte)"""
+    if isinstance(valeur, datetime):
+        return valeur
+    if isinstance(valeur, date):
+        return datetime(valeur.year, valeur.month, valeur.day)
+    return datetime.fromisoformat(valeur)
+
+def agreger_incidents(app, debut_heures, debut_jours):
+    """Recalculer en base les agrégats des statistiques (réconciliation)"""
+    with app.app_context():
+        dialecte = db.engine.dialect.name
+        par_severite = dict(db.session.execute(
+            select(Incident.severite, func.count()).group_by(Incident.severite)
+        ).all())
+        
+        def histogramme(unite, debut, cle):
+            tranche = tranche_date(Incident.date_incident, unite, dialecte)
+            lignes = db.session.execute(
+                select(tranche, func.count())
+                .where(Incident.date_incident >= debut)
+                .group_by(tranche)
+            ).all()
+            return {cle(en_datetime(valeur)): nombre for valeur, nombre in lignes}
+        
+        return (par_severite,
+                histogramme('hour', debut_heures, cle_heure),
+                histogramme('day', debut_jours, cle_jour))
+
+# ========================================
+# RECHERCHE PLEIN TEXTE
+# ========================================
+
+def incidents_a_indexer(app, dernier_id, limite=1000):
+    """Lot de (id, titre, description) créés après dernier_id, pour l'index en mémoire"""
+    with app.app_context():
+        return db.session.execute(
+            select(Incident.id, Incident.titre, Incident.description)
+            .where(Incident.id > dernier_id)
+            .order_by(Incident.id)
+            .limit(limite)
+        ).all()
+
+def fulltext_disponible():
+    """Vérifier que la table incidents a un index plein texte SQL Server actif"""
+    if db.engine.dialect.name != 'mssql':
+        return False
+    
+    def calculer():
+        return bool(db.session.execute(text(
+            "SELECT OBJECTPROPERTYEX(OBJECT_ID('incidents'), 'TableHasActiveFulltextIndex')"
+        )).scalar())
+    
+    return cache.lire_ou_calculer(('fulltext',), calculer)
+
+def rechercher_fulltext(requete, limite, decalage):
+    """Recherche classée par CONTAINSTABLE (index plein texte SQL Server)"""
+    rangs = (text("SELECT [KEY] AS id, [RANK] AS score "
+                  "FROM CONTAINSTABLE(incidents, (titre, description), :condition)")
+             .bindparams(condition=condition_fulltext(requete))
+             .columns(id=db.Integer, score=db.Integer)
+             .subquery('rangs'))
+    lignes = db.session.execute(
+        select(Incident, rangs.c.score, func.count().over())
+        .join(rangs, rangs.c.id == Incident.id)
+        .order_by(rangs.c.score.desc(), Incident.id.desc())
+        .offset(decalage)
+        .limit(limite)
+    ).all()
+    if lignes:
+        total = lignes[0][2]
+    else:
+        total = db.session.execute(select(func.count()).select_from(rangs)).scalar()
+    return [(incident, score) for incident, score, _ in lignes], total
+
+def rechercher_memoire(requete, limite, decalage):
+    """Recherche classée par l'index inversé du processus (SQLite, local)
+    
+    Seuls les incidents de la page demandée sont lus en base, par clé primaire.
+    """
+    recherche.synchroniser()
+    classement = recherche.rechercher(requete)
+    page = classement[decalage:decalage + limite]
+    incidents = {incident.id: incident for incident in
+                 Incident.query.filter(Incident.id.in_([identifiant for identifiant, _ in page]))}
+    return [(incidents[identifiant], score) for identifiant, score in page
+            if identifiant in incidents], len(classement)
+
+def rechercher_incidents(requete, limite, decalage):
+    """Rechercher dans titre et description, renvoie (résultats, total, moteur)"""
+    backend = current_app.config['RECHERCHE_BACKEND']
+    moteur = 'fulltext' if backend == 'fulltext' or (backend == 'auto' and fulltext_disponible()) else 'memoire'
+    if not tokeniser(requete):
+        # Que des mots vides : aucun résultat, sans envoyer à SQL Server une condition vide
+        return [], 0, moteur
+    if moteur == 'fulltext':
+        return (*rechercher_fulltext(requete, limite, decalage), moteur)
+    return (*rechercher_memoire(requete, limite, decalage), moteur)
+
+# ========================================
+# INSTANTANÉ LOCAL (REPLI DES LECTURES)
+# ========================================
+
+class PrimaireDegrade(Exception):
+    """Azure SQL en erreur ou trop lent selon la sonde : lecture servie par l'instantané"""
+
+def incidents_a_copier(app, dernier_id, limite):
+    """Incidents complets créés après dernier_id (source de l'instantané local)"""
+    with app.app_context():
+        return [dict(ligne) for ligne in db.session.execute(
+            select(Incident.__table__)
+            .where(Incident.id > dernier_id)
+            .order_by(Incident.id)
+            .limit(limite)
+        ).mappings()]
+
+def incidents_recents(app, limite):
+    """Dernier id et incidents complets les plus récents (amorce de l'instantané local)
+    
+    Le dernier id est lu avant la page : un incident ajouté entre les deux
+    est recopié par le rafraîchissement suivant.
+    """
+    with app.app_context():
+        dernier_id = db.session.execute(select(func.max(Incident.id))).scalar() or 0
+        return dernier_id, [dict(ligne) for ligne in db.session.execute(
+            select(Incident.__table__)
+            .order_by(Incident.date_incident.desc(), Incident.id.desc())
+            .limit(limite)
+        ).mappings()]
+
+def instantane_utilisable():
+    """Instantané local s'il existe et respecte la borne d'obsolescence, sinon None"""
+    instantane = current_app.extensions.get('instantane_incidents')
+    return instantane if instantane is not None and instantane.utilisable() else None
+
+def demarrer_instantane():
+    """Démarrer dans ce worker le rafraîchissement de l'instantané et la sonde de latence"""
+    current_app.extensions['instantane_incidents'].demarrer()
+    if current_app.config['INSTANTANE_LATENCE_MAX_MS']:
+        sonde.demarrer()
+
+def verifier_primaire():
+    """Lever PrimaireDegrade si la sonde voit Azure SQL en erreur ou au-delà de la latence maximale
+    
+    Rien n'est levé sans instantané utilisable : mieux vaut alors tenter la base.
+    """
+    seuil = current_app.config['INSTANTANE_LATENCE_MAX_MS']
+    if not seuil or instantane_utilisable() is None:
+        return
+    statut, latence = sonde.derniere_mesure()
+    if statut == 'ERREUR' or (latence is not None and latence > seuil):
+        raise PrimaireDegrade(f'Azure SQL dégradé (statut {statut}, latence {latence} ms)')
+
+def page_instantanee(limite, apres=None, filtres=None):
+    """Page d'incidents lue dans l'instantané : (incidents, curseur, état) ou None"""
+    instantane = instantane_utilisable()
+    if instantane is None:
+        return None
+    with instantane.connexion() as connexion:
+        incidents, curseur_suivant = paginer_incidents(limite, apres, filtres, connexion)
+        return lignes_en_dicts(incidents), curseur_suivant, instantane.etat()
+
+def incident_instantane(incident_id):
+    """Incident lu dans l'instantané (dictionnaire de toutes les colonnes, état) ou None"""
+    instantane = instantane_utilisable()
+    if instantane is None:
+        return None
+    with instantane.connexion() as connexion:
+        ligne = connexion.execute(
+            select(instantane.table).where(instantane.table.c.id == incident_id)
+        ).mappings().first()
+    return (dict(ligne), instantane.etat()) if ligne is not None else None
+
+def reponse_perimee(corps, etat):
+    """Réponse JSON servie depuis l'instantané, marquée comme périmée"""
+    reponse = jsonify({**corps, 'stale': True, 'instantane': etat})
+    reponse.headers['Warning'] = '110 - "Response is Stale"'
+    reponse.headers['Cache-Control'] = 'no-store'
+    return reponse
+
+def message_perime(etat):
+    return (f"Azure SQL indisponible : données de l'instantané local du {etat['rafraichi_le']} "
+            f"(il y a {etat['age_secondes']:.0f} s)")
+
+# ========================================
+# FRAGMENTS HTML DES CARTES D'INCIDENT
+# ========================================
+
+def version_carte(incident):
+    """Version d'une carte : les champs affichés (un incident n'est jamais modifié)"""
+    return incident['date_incident'], incident['severite'], incident['titre']
+
+@bp.app_template_global('cartes_incidents')
+def cartes_incidents(incidents):
+    """Cartes HTML d'une liste d'incidents, à partir des fragments mis en cache
+    
+    Chaque carte est rendue une fois puis mémorisée sous (id, version) : une
+    page déjà vue se réduit à la concaténation de ses fragments.
+    """
+    modele = None
+    cartes = []
+    for incident in incidents:
+        cle = ('carte', incident['id'], version_carte(incident))
+        carte = fragments.get(cle)
+        if carte is MANQUANT:
+            if modele is None:
+                modele = current_app.jinja_env.get_template('carte_incident.html')
+            carte = modele.render(incident=incident).strip()
+            fragments.set(cle, carte)
+        cartes.append(carte)
+    return Markup('\n            '.join(cartes))
+
 # ========================================
 # ROUTES PRINCIPALES (adaptées du projet original)
 # ========================================
 
-@app.route('/')
+@bp.route('/')
+@lecture_seule
 def index():
     """Page principale avec liste des incidents"""
     try:
-        incidents = Incident.query.order_by(Incident.date_incident.desc()).all()
-        return render_template('incidents.html', incidents=incidents)
+        limite, apres = lire_parametres_pagination()
+        filtres = lire_filtres()
+    except ValueError as e:
+        flash(str(e), 'error')
+        return redirect(url_for('.index'))
+    
+    try:
+        verifier_primaire()
+        incidents, curseur_suivant, dernier_id = lire_page_incidents(limite, apres, filtres)
+        return render_template('incidents.html', incidents=incidents, dernier_id=dernier_id,
+                               curseur_suivant=curseur_suivant, limite=limite,
+                               premiere_page=apres is None, filtres=parametres_filtres(),
+                               severites=SEVERITES)
     except Exception as e:
+        perimee = page_instantanee(limite, apres, filtres)
+        if perimee is not None:
+            incidents, curseur_suivant, etat = perimee
+            flash(message_perime(etat), 'error')
+            # Instantané : pas de rattrapage, le flux ne diffuse que les incidents à venir
+            return render_template('incidents.html', incidents=incidents, dernier_id=None,
+                                   curseur_suivant=curseur_suivant, limite=limite,
+                                   premiere_page=apres is None, filtres=parametres_filtres(),
+                                   severites=SEVERITES)
+        
         flash(f'Erreur de connexion à Azure SQL Database: {str(e)}', 'error')
         # Fallback avec des données par défaut si la DB n'est pas accessible
         incidents_demo = [
@@ -106,150 +987,693 @@ def index():
         ]
         return render_template('incidents.html', incidents=incidents_demo)
 
-@app.route('/ajouter')
+@bp.route('/ajouter')
 def ajouter_incident_form():
     """Formulaire d'ajout d'incident"""
     return render_template('ajouter.html')
 
-@app.route('/ajouter-incident', methods=['POST'])
+@bp.route('/ajouter-incident', methods=['POST'])
 def ajouter_incident():
     """Traitement de l'ajout d'incident"""
     try:
         titre = request.form.get('titre', '').strip()
         severite = request.form.get('severite', 'Moyenne')
+        description = request.form.get('description', '').strip() or None
         
         if not titre:
             flash('Le titre de l\'incident est obligatoire', 'error')
-            return redirect(url_for('ajouter_incident_form'))
+            return redirect(url_for('.ajouter_incident_form'))
+        
+        ecritures = current_app.extensions.get('ecriture_incidents')
+        if ecritures is not None:
+            return ajouter_incident_differe(ecritures, titre, severite, description)
         
         # Créer le nouvel incident
         nouvel_incident = Incident(
             titre=titre,
             severite=severite,
+            description=description,
             date_incident=datetime.now()
         )
         
         # Sauvegarder dans Azure SQL
         db.session.add(nouvel_incident)
         db.session.commit()
+        cache.invalider('liste')
+        diffuseur.reveiller()
+        statistiques.enregistrer(nouvel_incident.severite, nouvel_incident.date_incident)
+        recherche.indexer(nouvel_incident.id, titre, description)
         
         flash(f'Incident "{titre}" ajouté avec succès dans Azure SQL Database!', 'success')
-        return redirect(url_for('index'))
+        return redirect(url_for('.index'))
         
     except Exception as e:
         db.session.rollback()
         flash(f'Erreur lors de l\'ajout dans Azure SQL: {str(e)}', 'error')
-        return redirect(url_for('ajouter_incident_form'))
+        return redirect(url_for('.ajouter_incident_form'))
+
+def ajouter_incident_differe(ecritures, titre, severite, description):
+    """Accepter l'incident dans la file d'écriture (écrit en base par lot)"""
+    valeurs, erreurs = valider_incident({'titre': titre, 'severite': severite,
+                                         'description': description}, datetime.now())
+    if erreurs:
+        flash(' ; '.join(erreurs), 'error')
+        return redirect(url_for('.ajouter_incident_form'))
+    
+    try:
+        ecritures.ajouter(valeurs)
+    except FilePleine:
+        flash('Trop d\'incidents en cours d\'enregistrement, réessayez dans quelques secondes', 'error')
+        return render_template('ajouter.html'), 503
+    
+    flash(f'Incident "{titre}" enregistré, il apparaîtra dans la liste dans quelques instants', 'success')
+    return redirect(url_for('.index'))
 
-@app.route('/incident/<int:incident_id>')
+@bp.route('/incident/<int:incident_id>')
+@lecture_seule
 def detail_incident(incident_id):
     """Page de détail d'un incident"""
     try:
+        verifier_primaire()
         incident = Incident.query.get_or_404(incident_id)
         return render_template('detail.html', incident=incident)
     except Exception as e:
+        perime = None if isinstance(e, HTTPException) else incident_instantane(incident_id)
+        if perime is not None:
+            incident, etat = perime
+            flash(message_perime(etat), 'error')
+            return render_template('detail.html', incident=incident)
         flash(f'Erreur lors de la récupération de l\'incident: {str(e)}', 'error')
-        return redirect(url_for('index'))
+        return redirect(url_for('.index'))
 
 # ========================================
 # API REST (pour intégrations)
 # ========================================
 
-@app.route('/api/incidents')
+@bp.route('/api/incidents')
+@lecture_seule
 def api_incidents():
-    """API REST - Liste des incidents"""
+    """API REST - Liste des incidents, paginée par curseur et filtrable (?limit=&after=&severite=&from=&to=)"""
+    try:
+        limite, apres = lire_parametres_pagination()
+        filtres = lire_filtres()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        verifier_primaire()
+        version = version_table()
+        etag, derniere_modification = validateurs_http(version)
+        if est_non_modifie(etag, derniere_modification):
+            return reponse_non_modifiee(etag, derniere_modification)
+        
+        incidents, curseur_suivant, _ = lire_page_incidents(limite, apres, filtres, version)
+        corps = page_api_incidents(incidents, limite, curseur_suivant)
+        return appliquer_validateurs(lien_page_suivante(jsonify(corps), corps), etag, derniere_modification)
+    except Exception as e:
+        perimee = page_instantanee(limite, apres, filtres)
+        if perimee is None:
+            return jsonify({'error': f'Erreur Azure SQL: {str(e)}'}), 500
+        incidents, curseur_suivant, etat = perimee
+        corps = page_api_incidents(incidents, limite, curseur_suivant)
+        return lien_page_suivante(reponse_perimee(corps, etat), corps)
+
+def page_api_incidents(incidents, limite, curseur_suivant):
+    """Corps JSON d'une page de /api/incidents"""
+    lien_suivant = (url_for('.api_incidents', limit=limite, after=curseur_suivant,
+                            **parametres_filtres())
+                    if curseur_suivant else None)
+    return {
+        'incidents': incidents,
+        'pagination': {
+            'limit': limite,
+            'next_cursor': curseur_suivant,
+            'next': lien_suivant
+        }
+    }
+
+def lien_page_suivante(reponse, corps):
+    """En-tête Link vers la page suivante d'une réponse de /api/incidents"""
+    lien_suivant = corps['pagination']['next']
+    if lien_suivant:
+        reponse.headers['Link'] = f'<{lien_suivant}>; rel="next"'
+    return reponse
+
+@bp.route('/api/incidents/changes')
+def api_incidents_changes():
+    """API REST - Incidents créés ou modifiés depuis un curseur (?since=&limit=)
+    
+    Toujours lu sur le primaire : un réplica en retard ferait avancer le
+    curseur au-delà de lignes qu'il n'a pas encore reçues.
+    """
+    curseur = request.args.get('since')
+    try:
+        limite = lire_limite()
+        depuis = decoder_curseur(curseur) if curseur else None
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        lignes, reste = lire_changements(limite, depuis)
+    except Exception as e:
+        return jsonify({'error': f'Erreur Azure SQL: {str(e)}'}), 500
+    
+    # Sans changement, le curseur reçu reste valable pour la synchronisation suivante
+    if lignes:
+        curseur = encoder_position(lignes[-1].date_modification, lignes[-1].id)
+    corps = {
+        'incidents': [changement_en_dict(ligne) for ligne in lignes],
+        'pagination': {
+            'limit': limite,
+            'next_cursor': curseur,
+            'has_more': reste,
+            'next': url_for('.api_incidents_changes', since=curseur, limit=limite) if reste else None
+        }
+    }
+    return lien_page_suivante(jsonify(corps), corps)
+
+@bp.route('/api/incidents/export')
+@lecture_seule
+def api_incidents_export():
+    """API REST - Export complet des incidents en flux (?format=ndjson|json)"""
+    format_export = request.args.get('format', 'ndjson')
+    if format_export not in ('ndjson', 'json'):
+        return jsonify({'error': f'Format d\'export inconnu: {format_export}'}), 400
+    
+    taille_lot = current_app.config['EXPORT_TAILLE_LOT']
+    json_dumps = current_app.json.dumps
+    requete = (select(*COLONNES_LISTE)
+               .order_by(Incident.date_incident.desc(), Incident.id.desc())
+               .execution_options(yield_per=taille_lot))
+    
+    # Session dédiée (sur le réplica si la vue y est routée) : le flux continue après la fin de la vue
+    session = Session(db.session.get_bind())
+    try:
+        lots = session.execute(requete).partitions()
+    except Exception as e:
+        session.close()
+        return jsonify({'error': f'Erreur Azure SQL: {str(e)}'}), 500
+    
+    def generer():
+        """Produire l'export lot par lot, sans jamais charger toute la table"""
+        try:
+            if format_export == 'ndjson':
+                for lot in lots:
+                    yield ''.join(json_dumps(incident) + '\n' for incident in lignes_en_dicts(lot))
+            else:
+                separateur = '['
+                for lot in lots:
+                    # Un seul appel à l'encodeur par lot, crochets du tableau retirés
+                    yield separateur + json_dumps(lignes_en_dicts(lot))[1:-1]
+                    separateur = ','
+                yield ']' if separateur == ',' else '[]'
+        finally:
+            session.close()
+    
+    mimetype = 'application/x-ndjson' if format_export == 'ndjson' else 'application/json'
+    return Response(generer(), mimetype=mimetype)
+
+@bp.route('/api/incidents/stream')
+def api_incidents_stream():
+    """API REST - Flux Server-Sent Events des nouveaux incidents"""
+    heartbeat = current_app.config['FLUX_HEARTBEAT']
+    json_dumps = current_app.json.dumps
+    diffuseur_app = diffuseur._get_current_object()
+    
+    # Abonnement avant le rattrapage : aucun incident ne tombe entre les deux
+    abonnement = diffuseur_app.abonner()
+    
+    # Reconnexion : Last-Event-ID ; première connexion : dernier id affiché par la page (?depuis=)
+    rattrapage = []
+    dernier_id_client = request.headers.get('Last-Event-ID', type=int)
+    if dernier_id_client is None:
+        dernier_id_client = request.args.get('depuis', type=int)
+    if dernier_id_client is not None:
+        try:
+            rattrapage = incidents_crees_apres(current_app._get_current_object(), dernier_id_client)
+        except Exception:
+            rattrapage = []
+    
+    def generer():
+        """Rattrapage éventuel, puis incidents diffusés et battements de cœur"""
+        dernier_envoye = dernier_id_client or 0
+        try:
+            yield 'retry: 5000\n\n'
+            for incident in rattrapage:
+                dernier_envoye = incident['id']
+                yield evenement_sse(incident, json_dumps)
+            
+            while True:
+                evenement = abonnement.attendre(heartbeat)
+                if evenement is FERME:
+                    break
+                if evenement is None:
+                    yield ': ping\n\n'
+                elif evenement['id'] > dernier_envoye:
+                    dernier_envoye = evenement['id']
+                    yield evenement_sse(evenement, json_dumps)
+        finally:
+            diffuseur_app.desabonner(abonnement)
+    
+    return Response(generer(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@bp.route('/api/incidents/bulk', methods=['POST'])
+def api_incidents_bulk():
+    """API REST - Ingestion en masse (tableau JSON ou NDJSON)"""
+    try:
+        lignes = lire_lignes_bulk()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if len(lignes) > current_app.config['BULK_MAX_LIGNES']:
+        return jsonify({'error': f"Trop de lignes (maximum {current_app.config['BULK_MAX_LIGNES']})"}), 413
+    
+    valides, resultats = valider_incidents(lignes)
+    lots = inserer_par_lots(valides, resultats, current_app.config['BULK_TAILLE_LOT'])
+    
+    # Les ids des lignes insérées ne sont pas relus : l'index de recherche
+    # les rattrape à sa prochaine synchronisation
+    inseres = sum(lot['taille'] for lot in lots if lot['statut'] == 'commit')
+    if inseres:
+        cache.invalider('liste')
+        diffuseur.reveiller()
+        for index, valeurs in valides:
+            if resultats[index]['statut'] == 'insere':
+                statistiques.enregistrer(valeurs['severite'], valeurs['date_incident'])
+    
+    return jsonify({
+        'recus': len(lignes),
+        'inseres': inseres,
+        'rejetes': len(lignes) - len(valides),
+        'lots': lots,
+        'resultats': resultats
+    }), 201 if inseres == len(lignes) else 207
+
+@bp.route('/api/incidents/stats')
+def api_incidents_stats():
+    """API REST - Comptes par sévérité et histogrammes horaires / journaliers"""
     try:
-        incidents = Incident.query.order_by(Incident.date_incident.desc()).all()
-        return jsonify([incident.to_dict() for incident in incidents])
+        return jsonify(statistiques.photo())
     except Exception as e:
         return jsonify({'error': f'Erreur Azure SQL: {str(e)}'}), 500
 
-@app.route('/api/incidents/<int:incident_id>')
+@bp.route('/api/incidents/search')
+@lecture_seule
+def api_incidents_search():
+    """API REST - Recherche plein texte classée et paginée (?q=&limit=&page=)"""
+    requete = request.args.get('q', '').strip()
+    if not requete:
+        return jsonify({'error': 'Le paramètre q est obligatoire'}), 400
+    
+    limite = request.args.get('limit', type=int) or current_app.config['PAGE_TAILLE_DEFAUT']
+    limite = max(1, min(limite, current_app.config['PAGE_TAILLE_MAX']))
+    page = max(1, request.args.get('page', 1, type=int))
+    
+    try:
+        resultats, total, moteur = rechercher_incidents(requete, limite, (page - 1) * limite)
+    except Exception as e:
+        return jsonify({'error': f'Erreur Azure SQL: {str(e)}'}), 500
+    
+    lien_suivant = (url_for('.api_incidents_search', q=requete, limit=limite, page=page + 1)
+                    if page * limite < total else None)
+    return jsonify({
+        'q': requete,
+        'moteur': moteur,
+        'resultats': [{**incident.to_dict(), 'description': incident.description,
+                       'score': round(score, 4)} for incident, score in resultats],
+        'pagination': {
+            'limit': limite,
+            'page': page,
+            'total': total,
+            'next': lien_suivant
+        }
+    })
+
+@bp.route('/api/incidents/<int:incident_id>')
+@lecture_seule
 def api_incident_detail(incident_id):
     """API REST - Détail d'un incident"""
     try:
-        incident = Incident.query.get_or_404(incident_id)
-        return jsonify(incident.to_dict())
+        verifier_primaire()
+        version = version_table()
+        etag, derniere_modification = validateurs_http(version)
+        if est_non_modifie(etag, derniere_modification):
+            return reponse_non_modifiee(etag, derniere_modification)
+        
+        incident = lire_en_cache(
+            ('detail', incident_id, version),
+            lambda: Incident.query.get_or_404(incident_id).to_dict()
+        )
+        return appliquer_validateurs(jsonify(incident), etag, derniere_modification)
     except Exception as e:
-        return jsonify({'error': f'Erreur Azure SQL: {str(e)}'}), 500
+        perime = None if isinstance(e, HTTPException) else incident_instantane(incident_id)
+        if perime is None:
+            return jsonify({'error': f'Erreur Azure SQL: {str(e)}'}), 500
+        incident, etat = perime
+        return reponse_perimee(lignes_en_dicts([(incident['id'], incident['titre'], incident['severite'],
+                                                 incident['date_incident'])])[0], etat)
 
 # ========================================
 # ROUTES DE DIAGNOSTIC AZURE
 # ========================================
 
-@app.route('/azure-status')
+def verifier_connexion(app):
+    """Mesure de la sonde : aller-retour SELECT 1 sur une connexion du pool"""
+    with app.app_context():
+        with db.engine.connect() as connexion:
+            connexion.execute(text("SELECT 1"))
+
+def informations_azure(app):
+    """Détails du serveur Azure SQL, relus par la sonde toutes les SONDE_INTERVALLE_INFORMATIONS secondes"""
+    with app.app_context():
+        with db.engine.connect() as connexion:
+            informations = {
+                'nombre_incidents': connexion.execute(select(func.count(Incident.id))).scalar()
+            }
+            if connexion.dialect.name == 'mssql':
+                info = connexion.execute(text("""
+                    SELECT 
+                        @@SERVERNAME as serveur_azure,
+                        DB_NAME() as base_donnees,
+                        SYSTEM_USER as utilisateur_azure,
+                        @@VERSION as version_sql,
+                        GETDATE() as heure_azure
+                """)).fetchone()
+                informations.update({
+                    'serveur': info[0],
+                    'base_donnees': info[1],
+                    'utilisateur': info[2],
+                    'version_sql': info[3][:100] + '...',
+                    'heure_serveur': info[4].strftime('%Y-%m-%d %H:%M:%S')
+                })
+            return informations
+
+def resume_sonde(etat):
+    """Partie « mesure » de l'état de la sonde renvoyée par les routes de diagnostic"""
+    return {
+        'mesure_le': etat['mesure_le'],
+        'latence_ms': etat['latence_ms'],
+        'intervalle_secondes': etat['intervalle_secondes'],
+        'distribution_latence_ms': etat['distribution_latence_ms']
+    }
+
+def etat_replica():
+    """État du réplica en lecture (None s'il n'est pas configuré)"""
+    routage = current_app.extensions.get('routage_lecture')
+    return routage.etat() if routage is not None else None
+
+def etat_authentification():
+    """Mode d'authentification et état du jeton Azure AD"""
+    jetons = current_app.extensions.get('jetons_azure')
+    etat = {'mode': current_app.config['AZURE_SQL_AUTH']}
+    if jetons is not None:
+        etat['jeton'] = jetons.etat()
+    return etat
+
+def etat_disjoncteur():
+    """État du disjoncteur des checkouts (None sans pool instrumenté)"""
+    disjoncteur = getattr(db.engine.pool, 'disjoncteur', None)
+    return disjoncteur.etat() if disjoncteur is not None else None
+
+@bp.route('/azure-status')
 def azure_status():
-    """Page de diagnostic de la connexion Azure SQL"""
-    try:
-        # Test de connexion Azure SQL
-        result = db.session.execute(text("""
-            SELECT 
-                @@SERVERNAME as serveur_azure,
-                DB_NAME() as base_donnees,
-                SYSTEM_USER as utilisateur_azure,
-                @@VERSION as version_sql,
-                GETDATE() as heure_azure
-        """))
-        
-        info = result.fetchone()
-        
-        # Compter les incidents
-        count_incidents = db.session.execute(text("SELECT COUNT(*) FROM incidents")).fetchone()[0]
-        
-        azure_info = {
-            'status': 'Connecté à Azure SQL Database',
-            'serveur': info[0],
-            'base_donnees': info[1], 
-            'utilisateur': info[2],
-            'version_sql': info[3][:100] + '...',
-            'heure_serveur': info[4].strftime('%Y-%m-%d %H:%M:%S'),
-            'nombre_incidents': count_incidents,
-            'region_azure': 'Détection automatique...'
-        }
-        
-        return jsonify(azure_info)
-        
-    except Exception as e:
+    """Page de diagnostic de la connexion Azure SQL (état mesuré par la sonde)"""
+    etat = sonde.etat()
+    
+    if etat['statut'] != 'OK':
         return jsonify({
-            'status': 'Erreur de connexion',
-            'erreur': str(e),
+            'status': 'Erreur de connexion' if etat['statut'] == 'ERREUR' else 'Mesure en cours',
+            'erreur': etat['erreur'],
             'configuration': {
-                'serveur': AZURE_SQL_SERVER,
-                'base': AZURE_SQL_DATABASE,
-                'utilisateur': AZURE_SQL_USERNAME
-            }
-        }), 500
+                'serveur': current_app.config['AZURE_SQL_SERVER'],
+                'base': current_app.config['AZURE_SQL_DATABASE'],
+                'utilisateur': current_app.config['AZURE_SQL_USERNAME']
+            },
+            'sonde': resume_sonde(etat),
+            'authentification': etat_authentification(),
+            'disjoncteur': etat_disjoncteur(),
+            'replica': etat_replica()
+        }), 500 if etat['statut'] == 'ERREUR' else 503
+    
+    details = etat['details']
+    azure_info = {
+        'status': 'Connecté à Azure SQL Database',
+        'serveur': details.get('serveur'),
+        'base_donnees': details.get('base_donnees'),
+        'utilisateur': details.get('utilisateur'),
+        'version_sql': details.get('version_sql'),
+        'heure_serveur': details.get('heure_serveur'),
+        'nombre_incidents': details.get('nombre_incidents'),
+        'region_azure': 'Détection automatique...',
+        'sonde': resume_sonde(etat),
+        'authentification': etat_authentification(),
+        'disjoncteur': etat_disjoncteur(),
+        'replica': etat_replica()
+    }
+    
+    return jsonify(azure_info)
 
-@app.route('/test-azure')
+@bp.route('/pool-stats')
+def pool_stats():
+    """État du pool de connexions et temps d'attente au checkout"""
+    pool = db.engine.pool
+    if not hasattr(pool, 'stats'):
+        return jsonify({'pool': type(pool).__name__, 'status': pool.status()})
+    return jsonify(pool.stats())
+
+@bp.route('/metrics')
+def metrics():
+    """Métriques par route, du pool et du cache au format Prometheus"""
+    metriques = current_app.extensions.get('metriques')
+    if metriques is None:
+        return jsonify({'error': 'Métriques désactivées (METRIQUES_ACTIVES=no)'}), 404
+    
+    supplementaires = []
+    pool = db.engine.pool
+    if hasattr(pool, 'stats'):
+        etat_pool = pool.stats()
+        connexions = {(('etat',), (etat,)): etat_pool[f'connexions_{etat}']
+                      for etat in ('utilisees', 'inactives', 'overflow')}
+        supplementaires.append(valeurs_instantanees(
+            'incidents_pool_connexions', 'Connexions du pool par état', 'gauge', connexions))
+    
+    etat_cache = cache.stats()
+    operations = {(('type',), (compteur,)): etat_cache[compteur]
+                  for compteur in ('hits', 'misses', 'evictions', 'expirations', 'invalidations')
+                  if compteur in etat_cache}
+    supplementaires.append(valeurs_instantanees(
+        'incidents_cache_operations_total', 'Opérations du cache de lecture', 'counter', operations))
+    
+    ecritures = current_app.extensions.get('ecriture_incidents')
+    if ecritures is not None:
+        supplementaires.append(ecritures.lignes_metriques())
+    
+    return Response(metriques.exposer(supplementaires),
+                    content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@bp.route('/ecriture-stats')
+def ecriture_stats():
+    """Compteurs de la file d'écriture différée"""
+    ecritures = current_app.extensions.get('ecriture_incidents')
+    if ecritures is None:
+        return jsonify({'error': 'Écriture différée désactivée (ECRITURE_DIFFEREE=no)'}), 404
+    ecritures.demarrer()
+    return jsonify(ecritures.stats())
+
+@bp.route('/cache-stats')
+def cache_stats():
+    """Compteurs du cache de lecture (dimensionnement)"""
+    return jsonify(cache.stats())
+
+@bp.route('/test-azure')
 def test_azure():
-    """Page de test Azure SQL Database"""
-    try:
-        # Tests de base
-        db.session.execute(text("SELECT 1"))
-        
+    """Page de test Azure SQL Database (état mesuré par la sonde)"""
+    etat = sonde.etat()
+    
+    if etat['statut'] == 'OK':
         return jsonify({
             'azure_sql_test': 'SUCCESS',
             'message': 'Connexion Azure SQL Database fonctionnelle',
-            'server': AZURE_SQL_SERVER,
-            'database': AZURE_SQL_DATABASE
+            'server': current_app.config['AZURE_SQL_SERVER'],
+            'database': current_app.config['AZURE_SQL_DATABASE'],
+            **resume_sonde(etat)
         })
-        
-    except Exception as e:
-        return jsonify({
-            'azure_sql_test': 'FAILED', 
-            'error': str(e)
-        }), 500
+    
+    return jsonify({
+        'azure_sql_test': 'FAILED' if etat['statut'] == 'ERREUR' else 'PENDING',
+        'error': etat['erreur'],
+        **resume_sonde(etat)
+    }), 500 if etat['statut'] == 'ERREUR' else 503
+
+# ========================================
+# FABRIQUE D'APPLICATION
+# ========================================
+
+def create_app(config=None):
+    """Créer l'application Flask
+    
+    Aucune connexion n'est ouverte ici : la chaîne de connexion, le driver ODBC
+    et le moteur sont résolus à la première requête SQL. ``config`` surcharge la
+    configuration issue de l'environnement, par exemple
+    ``create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///incidents.db'})``.
+    """
+    charger_variables_env()
+    
+    app = Flask(__name__)
+    app.config.from_mapping(create_config())
+    if config:
+        app.config.from_mapping(config)
+    
+    db.init_app(app)
+    if app.config['AZURE_SQL_AUTH'] != 'sql':
+        # Jeton Azure AD partagé par les moteurs ; AZURE_CREDENTIAL permet un credential factice (tests)
+        credential = app.config.get('AZURE_CREDENTIAL') or create_azure_credential(app.config['AZURE_SQL_AUTH'])
+        jetons = CacheJetons(credential, marge=app.config['AZURE_JETON_MARGE'])
+        app.extensions['jetons_azure'] = jetons
+        # Premier jeton demandé dès la première requête du worker, avant le premier checkout
+        app.before_request(jetons.demarrer)
+    installer_json(app, app.config['JSON_BACKEND'])
+    if app.config['METRIQUES_ACTIVES']:
+        MetriquesRequetes(app)
+    # CSS / JS de static/ servis sous /assets/ avec une empreinte de contenu
+    RessourcesStatiques(app)
+    CompressionReponses(app)
+    app.extensions['cache_incidents'] = creer_cache(app.config['CACHE_BACKEND'],
+                                                    taille_max=app.config['CACHE_TAILLE_MAX'],
+                                                    ttl=app.config['CACHE_TTL'])
+    # Fragments versionnés : jamais périmés, le TTL ne sert qu'à libérer la mémoire
+    app.extensions['fragments_incidents'] = creer_cache(app.config['CACHE_BACKEND'],
+                                                        taille_max=app.config['FRAGMENTS_TAILLE_MAX'],
+                                                        ttl=app.config['FRAGMENTS_TTL'])
+    # Sonde démarrée à la première consultation, dans chaque processus
+    app.extensions['sonde_sante'] = SondeSante(partial(verifier_connexion, app),
+                                               informations=partial(informations_azure, app),
+                                               intervalle=app.config['SONDE_INTERVALLE'],
+                                               fenetre=app.config['SONDE_FENETRE'],
+                                               intervalle_informations=app.config['SONDE_INTERVALLE_INFORMATIONS'])
+    # Diffuseur SSE : un seul lecteur en base par processus, quel que soit le nombre d'abonnés
+    app.extensions['diffuseur_incidents'] = DiffuseurIncidents(partial(incidents_crees_apres, app),
+                                                               partial(dernier_id_incident, app),
+                                                               intervalle=app.config['FLUX_INTERVALLE'],
+                                                               taille_file=app.config['FLUX_FILE_MAX'])
+    # Statistiques mises à jour à chaque écriture, réconciliées périodiquement avec la table
+    app.extensions['statistiques_incidents'] = AgregatsIncidents(
+        partial(agreger_incidents, app),
+        intervalle_reconciliation=app.config['STATS_RECONCILIATION'],
+        heures=app.config['STATS_HEURES'],
+        jours=app.config['STATS_JOURS']
+    )
+    # Index inversé de la recherche, chargé à la première recherche hors index SQL Server
+    app.extensions['recherche_incidents'] = IndexInverse(partial(incidents_a_indexer, app))
+    if app.config['ECRITURE_DIFFEREE']:
+        ecritures = FileEcriture(partial(ecrire_lot_incidents, app),
+                                 app.config['ECRITURE_SPOOL'] or os.path.join(app.instance_path, 'spool'),
+                                 apres_lot=partial(apres_lot_incidents, app),
+                                 taille_max=app.config['ECRITURE_FILE_MAX'],
+                                 taille_lot=app.config['ECRITURE_TAILLE_LOT'],
+                                 delai=app.config['ECRITURE_DELAI'],
+                                 attente_max=app.config['ECRITURE_ATTENTE_MAX'],
+                                 erreurs_definitives=(IntegrityError, DataError))
+        app.extensions['ecriture_incidents'] = ecritures
+        # Démarrée dès la première requête du worker : le spool d'un arrêt brutal est rejoué sans attendre
+        app.before_request(ecritures.demarrer)
+    if 'lecture' in app.config['SQLALCHEMY_BINDS']:
+        # Vues de lecture routées vers le réplica, retard mesuré par un thread par processus
+        RoutageLecture(db, Incident.id, app)
+    if app.config['INSTANTANE_ACTIF']:
+        app.extensions['instantane_incidents'] = InstantaneLocal(
+            partial(incidents_a_copier, app),
+            partial(incidents_recents, app),
+            app.config['INSTANTANE_CHEMIN'] or os.path.join(tempfile.gettempdir(), 'incidents-instantane.db'),
+            Incident.__table__,
+            taille_max=app.config['INSTANTANE_TAILLE_MAX'],
+            intervalle=app.config['INSTANTANE_INTERVALLE'],
+            obsolescence_max=app.config['INSTANTANE_OBSOLESCENCE_MAX']
+        )
+        app.before_request(demarrer_instantane)
+    app.register_blueprint(bp)
+    return app
+
+def __getattr__(nom):
+    """Créer ``app`` au premier accès (``gunicorn app:app``), pas à l'import"""
+    if nom == 'app':
+        global app
+        app = create_app()
+        verifier_schema(app)
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {nom!r}")
 
 # ========================================
 # INITIALISATION ET LANCEMENT
 # ========================================
 
-def init_azure_database():
+# Valeur initiale d'une colonne ajoutée par migrer_schema (expression SQL), NULL sinon
+VALEURS_INITIALES = {
+    # Date de modification inconnue : celle de l'incident
+    'date_modification': 'date_incident'
+}
+
+def colonnes_incidents():
+    return {colonne['name'] for colonne in inspect(db.engine).get_columns(Incident.__tablename__)}
+
+def migrer_schema():
+    """Ajouter à une table incidents plus ancienne les colonnes et index du modèle
+    
+    Chaque colonne de Incident.__table__ absente en base est ajoutée,
+    nullable (les lignes existantes n'ont pas de valeur), puis remplie avec
+    VALEURS_INITIALES. Peut être lancée en même temps par plusieurs workers
+    (gunicorn sans preload_app) : un ALTER perdant est ignoré si la colonne
+    existe ensuite.
+    """
+    table = Incident.__table__
+    if not inspect(db.engine).has_table(table.name):
+        return
+    existantes = colonnes_incidents()
+    preparateur = db.engine.dialect.identifier_preparer
+    for colonne in table.columns:
+        if colonne.name in existantes:
+            continue
+        print(f"🔄 Ajout de la colonne {colonne.name} à la table {table.name}...")
+        type_sql = colonne.type.compile(dialect=db.engine.dialect)
+        nom = preparateur.quote(colonne.name)
+        try:
+            with db.engine.begin() as connexion:
+                connexion.execute(text(f'ALTER TABLE {preparateur.format_table(table)} ADD {nom} {type_sql}'))
+                if colonne.name in VALEURS_INITIALES:
+                    connexion.execute(text(f'UPDATE {preparateur.format_table(table)} '
+                                           f'SET {nom} = {VALEURS_INITIALES[colonne.name]}'))
+        except Exception:
+            if colonne.name not in colonnes_incidents():
+                raise
+    for index in table.indexes:
+        try:
+            index.create(db.engine, checkfirst=True)
+        except Exception:
+            if index.name not in {existant['name'] for existant in inspect(db.engine).get_indexes(table.name)}:
+                raise
+
+def verifier_schema(app):
+    """Migration du schéma au démarrage du serveur de production (wsgi.py, ``gunicorn app:app``)
+    
+    Sans elle, une table créée par une version antérieure (sans description,
+    date_modification...) fait échouer toutes les lectures ORM. Une base
+    injoignable au démarrage n'empêche pas le serveur de démarrer (instantané
+    local, nouvelles tentatives de la sonde).
+    """
+    try:
+        with app.app_context():
+            migrer_schema()
+    except Exception as e:
+        print(f"⚠️  Schéma Azure SQL non vérifié au démarrage: {e}")
+
+def init_azure_database(app):
     """Initialiser la base de données Azure SQL si nécessaire"""
     try:
         with app.app_context():
             # Créer les tables si elles n'existent pas
             db.create_all()
+            migrer_schema()
             
             # Vérifier s'il y a déjà des données
             existing_count = Incident.query.count()
@@ -283,11 +1707,13 @@ def init_azure_database():
         print(f"❌ Erreur lors de l'initialisation Azure SQL: {e}")
 
 if __name__ == '__main__':
+    app = create_app()
+    
     print("🚀 Démarrage Flask - Incidents Réseau avec Azure SQL Database")
     print("=" * 60)
-    print(f"☁️  Serveur Azure SQL: {AZURE_SQL_SERVER}")
-    print(f"💾 Base de données: {AZURE_SQL_DATABASE}")
-    print(f"👤 Utilisateur: {AZURE_SQL_USERNAME}")
+    print(f"☁️  Serveur Azure SQL: {app.config['AZURE_SQL_SERVER']}")
+    print(f"💾 Base de données: {app.config['AZURE_SQL_DATABASE']}")
+    print(f"👤 Utilisateur: {app.config['AZURE_SQL_USERNAME']}")
     print("=" * 60)
     print("📋 Routes disponibles:")
     print("   📊 / - Liste des incidents")
@@ -296,10 +1722,13 @@ if __name__ == '__main__':
     print("   🧪 /azure-status - Diagnostic Azure SQL")
     print("   🔬 /test-azure - Test de connexion")
     print("   📡 /api/incidents - API REST")
+    print("   🔄 /api/incidents/changes - Flux de changements")
+    print("   📈 /metrics - Métriques Prometheus")
     print("=" * 60)
+    print("⚠️  Serveur de développement : en production, gunicorn -c gunicorn.conf.py wsgi:app")
     
     # Initialisation de la base de données Azure
-    init_azure_database()
+    init_azure_database(app)
     
     # Démarrage de l'application sur port 5003 pour éviter les conflits
     print("🌐 Application accessible sur: http://localhost:5003")
@@ -0,0 +1,361 @@
+"""
+🏋️ Banc de charge des routes de l'application
+Flask Incidents Réseau - Version Azure
+
+Peuple une base locale (SQLite par défaut, ou toute URL SQLAlchemy comme un
+conteneur SQL Server) avec un nombre configurable d'incidents, démarre
+l'application dans un processus serveur séparé puis sollicite `/`,
+`/api/incidents`, `/api/incidents/<id>` et `/ajouter-incident` avec N
+clients concurrents. Le résultat (p50/p95/p99, débit, mémoire du serveur)
+est écrit en JSON ; `--reference` compare à un résultat précédent et
+renvoie un code d'erreur en cas de régression, pour la CI.
+
+Par défaut le serveur est celui de développement (un processus, un thread
+par requête) ; ``--workers N`` sert l'application avec gunicorn
+(gunicorn.conf.py, N workers) pour mesurer la montée en charge sur
+plusieurs cœurs.
+
+    python bench_charge.py --incidents 100000 --concurrence 8 --requetes 2000 --sortie resultats.json
+    python bench_charge.py --incidents 100000 --reference resultats.json --tolerance 0.2
+    python bench_charge.py --incidents 100000 --concurrence 32 --workers 4
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select
+
+from mesures import resume_latences
+
+ROUTES = ('index', 'api_incidents', 'api_incident_detail', 'ajouter_incident')
+TAILLE_LOT_INSERTION = 10000
+
+
+# ========================================
+# PRÉPARATION DE LA BASE
+# ========================================
+
+def peupler_base(url, nombre):
+    """Créer la table et la compléter jusqu'à ``nombre`` incidents, renvoie le total"""
+    import app as application
+
+    app = application.create_app({'SQLALCHEMY_DATABASE_URI': url})
+    with app.app_context():
+        application.db.create_all()
+        moteur = application.db.engine
+        with moteur.connect() as connexion:
+            existants = connexion.execute(select(func.count(application.Incident.id))).scalar()
+
+        generateur = random.Random(42)
+        debut = datetime.now() - timedelta(days=365)
+        for lot in range(existants, nombre, TAILLE_LOT_INSERTION):
+            lignes = [{
+                'titre': f'Incident réseau n°{numero}',
+                'severite': generateur.choice(application.SEVERITES),
+                'description': f'Description de test {numero} : latence, routage, DNS.',
+                'date_incident': debut + timedelta(seconds=generateur.randrange(365 * 86400))
+            } for numero in range(lot, min(lot + TAILLE_LOT_INSERTION, nombre))]
+            with moteur.begin() as connexion:
+                connexion.execute(insert(application.Incident.__table__), lignes)
+            print(f"   📥 {min(lot + TAILLE_LOT_INSERTION, nombre)}/{nombre} incidents", end='\r', file=sys.stderr)
+        if nombre > existants:
+            print(file=sys.stderr)
+
+        with moteur.connect() as connexion:
+            total = connexion.execute(select(func.count(application.Incident.id))).scalar()
+        moteur.dispose()
+    return total
+
+
+# ========================================
+# SERVEUR APPLICATIF
+# ========================================
+
+def lancer_serveur(port):
+    """Mode --serveur : servir l'application (DATABASE_URL) sur 127.0.0.1:port"""
+    import app as application
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    application.create_app().run(host='127.0.0.1', port=port, threaded=True,
+                                 debug=False, use_reloader=False)
+
+
+def port_libre():
+    import socket
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def demarrer_serveur(url, port, cache, workers=0):
+    """Démarrer le processus serveur (gunicorn si ``workers``) et attendre qu'il réponde"""
+    environnement = dict(os.environ, DATABASE_URL=url, CACHE_BACKEND=cache)
+    if workers:
+        environnement.update(GUNICORN_WORKERS=str(workers), GUNICORN_BIND=f'127.0.0.1:{port}',
+                             GUNICORN_LOGLEVEL='warning')
+        commande = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app']
+    else:
+        commande = [sys.executable, os.path.abspath(__file__), '--serveur', '--port', str(port)]
+    processus = subprocess.Popen(commande, env=environnement, cwd=os.path.dirname(os.path.abspath(__file__)),
+                                 stdout=sys.stderr)
+    limite = time.monotonic() + 60
+    while time.monotonic() < limite:
+        if processus.poll() is not None:
+            raise RuntimeError(f'Le serveur s\'est arrêté (code {processus.returncode})')
+        try:
+            connexion = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            connexion.request('GET', '/api/incidents?limit=1')
+            if connexion.getresponse().status == 200:
+                return processus
+        except OSError:
+            pass
+        time.sleep(0.2)
+    processus.terminate()
+    raise RuntimeError('Le serveur ne répond pas après 60 secondes')
+
+
+def processus_enfants(pid):
+    """Pids des processus enfants (workers gunicorn), via /proc (Linux)"""
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as enfants:
+            return [int(enfant) for enfant in enfants.read().split()]
+    except (OSError, ValueError):
+        return []
+
+
+def memoire_processus(pid):
+    """RSS courante et pic (Mo) d'un processus et de ses workers, via /proc (Linux)"""
+    rss = pic = 0
+    try:
+        for courant in [pid] + processus_enfants(pid):
+            with open(f'/proc/{courant}/status') as statut:
+                valeurs = dict(ligne.split(':', 1) for ligne in statut if ':' in ligne)
+            rss += int(valeurs['VmRSS'].split()[0])
+            pic += int(valeurs['VmHWM'].split()[0])
+        return {'rss_mo': round(rss / 1024, 1), 'pic_rss_mo': round(pic / 1024, 1)}
+    except (OSError, KeyError, ValueError):
+        return {'rss_mo': None, 'pic_rss_mo': None}
+
+
+# ========================================
+# SCÉNARIOS DE CHARGE
+# ========================================
+
+# Routes qui signalent leurs échecs par une redirection : seule cette destination est un succès
+# (/ajouter-incident renvoie vers /ajouter, avec un message, si l'incident n'est pas enregistré)
+REDIRECTIONS_ATTENDUES = {'ajouter_incident': '/'}
+
+
+def generateur_requetes(route, nombre_incidents, aleatoire):
+    """Fonction produisant (méthode, chemin, corps, en-têtes) pour une route"""
+    if route == 'index':
+        return lambda: ('GET', '/', None, {})
+    if route == 'api_incidents':
+        return lambda: ('GET', '/api/incidents?limit=50', None, {})
+    if route == 'api_incident_detail':
+        return lambda: ('GET', f'/api/incidents/{aleatoire.randint(1, max(nombre_incidents, 1))}', None, {})
+    if route == 'ajouter_incident':
+        def ajouter():
+            corps = urllib.parse.urlencode({
+                'titre': f'Incident de charge {aleatoire.randrange(10 ** 9)}',
+                'severite': aleatoire.choice(('Faible', 'Moyenne', 'Élevée', 'Critique')),
+                'description': 'Créé par bench_charge.py'
+            })
+            return 'POST', '/ajouter-incident', corps, {'Content-Type': 'application/x-www-form-urlencoded'}
+        return ajouter
+    raise ValueError(f'Route inconnue: {route}')
+
+
+def executer_scenario(port, route, nombre_requetes, concurrence, nombre_incidents, graine):
+    """Envoyer ``nombre_requetes`` requêtes sur une route avec ``concurrence`` clients"""
+    restantes = [nombre_requetes]
+    verrou = threading.Lock()
+    latences, erreurs = [], []
+    redirection_attendue = REDIRECTIONS_ATTENDUES.get(route)
+
+    def client(numero):
+        aleatoire = random.Random(graine * 1000 + numero)
+        prochaine = generateur_requetes(route, nombre_incidents, aleatoire)
+        mesures, echecs = [], []
+        connexion = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        while True:
+            with verrou:
+                if restantes[0] <= 0:
+                    break
+                restantes[0] -= 1
+            methode, chemin, corps, entetes = prochaine()
+            debut = time.perf_counter()
+            try:
+                connexion.request(methode, chemin, body=corps, headers=entetes)
+                reponse = connexion.getresponse()
+                reponse.read()
+                statut = reponse.status
+                if redirection_attendue and 300 <= statut < 400:
+                    destination = urllib.parse.urlsplit(reponse.getheader('Location', '')).path
+                    if destination != redirection_attendue:
+                        statut = f'{statut} {destination}'
+            except (OSError, http.client.HTTPException) as e:
+                statut = type(e).__name__
+                connexion.close()
+                connexion = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+            duree = time.perf_counter() - debut
+            if isinstance(statut, int) and statut < 400:
+                mesures.append(duree)
+            else:
+                echecs.append(str(statut))
+        connexion.close()
+        with verrou:
+            latences.extend(mesures)
+            erreurs.extend(echecs)
+
+    clients = [threading.Thread(target=client, args=(numero,)) for numero in range(concurrence)]
+    debut = time.perf_counter()
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    duree_totale = time.perf_counter() - debut
+
+    return {
+        'requetes': nombre_requetes,
+        'erreurs': len(erreurs),
+        'codes_erreur': sorted(set(erreurs)),
+        'duree_secondes': round(duree_totale, 3),
+        'debit_rps': round(len(latences) / duree_totale, 1) if duree_totale else None,
+        'latence_ms': resume_latences(latences)
+    }
+
+
+# ========================================
+# COMPARAISON AVEC UNE RÉFÉRENCE (CI)
+# ========================================
+
+def comparer(resultats, reference, tolerance):
+    """Lister les régressions de p95 et de débit au-delà de la tolérance"""
+    regressions = []
+    for route, mesure in resultats['routes'].items():
+        precedent = reference.get('routes', {}).get(route)
+        if not precedent:
+            continue
+        p95, p95_ref = mesure['latence_ms']['p95'], precedent['latence_ms']['p95']
+        if p95 and p95_ref and p95 > p95_ref * (1 + tolerance):
+            regressions.append(f'{route}: p95 {p95_ref} ms -> {p95} ms')
+        debit, debit_ref = mesure['debit_rps'], precedent['debit_rps']
+        if debit and debit_ref and debit < debit_ref * (1 - tolerance):
+            regressions.append(f'{route}: débit {debit_ref} -> {debit} req/s')
+        if mesure['erreurs'] > precedent['erreurs']:
+            regressions.append(f"{route}: erreurs {precedent['erreurs']} -> {mesure['erreurs']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Banc de charge des routes Flask Incidents')
+    parser.add_argument('--incidents', type=int, default=10000,
+                        help='Nombre d\'incidents en base (1000 à 1000000)')
+    parser.add_argument('--concurrence', type=int, default=8, help='Clients simultanés')
+    parser.add_argument('--requetes', type=int, default=1000, help='Requêtes par route')
+    parser.add_argument('--echauffement', type=int, default=50, help='Requêtes non mesurées par route')
+    parser.add_argument('--routes', default=','.join(ROUTES), help='Routes testées, séparées par des virgules')
+    parser.add_argument('--database-url', help='URL SQLAlchemy de la base (défaut : SQLite temporaire)')
+    parser.add_argument('--cache', default='lru', choices=('lru', 'aucun'), help='CACHE_BACKEND du serveur')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='Workers gunicorn (défaut 0 : serveur de développement, un processus)')
+    parser.add_argument('--graine', type=int, default=1, help='Graine des tirages aléatoires')
+    parser.add_argument('--sortie', help='Fichier JSON des résultats (défaut : sortie standard)')
+    parser.add_argument('--reference', help='Résultats JSON précédents à comparer')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Dégradation tolérée (0.2 = 20 %%)')
+    parser.add_argument('--serveur', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serveur:
+        lancer_serveur(args.port)
+        return 0
+
+    routes = [route.strip() for route in args.routes.split(',') if route.strip()]
+    for route in routes:
+        if route not in ROUTES:
+            parser.error(f'Route inconnue: {route} (choix : {", ".join(ROUTES)})')
+    # Les écritures en dernier : elles invalident le cache des lectures
+    routes.sort(key=ROUTES.index)
+
+    with tempfile.TemporaryDirectory() as dossier:
+        url = args.database_url or f"sqlite:///{os.path.join(dossier, 'charge.db')}"
+        print("🏋️  BANC DE CHARGE FLASK INCIDENTS", file=sys.stderr)
+        print("=" * 60, file=sys.stderr)
+        print(f"📥 Préparation de {args.incidents} incidents...", file=sys.stderr)
+        debut = time.perf_counter()
+        total = peupler_base(url, args.incidents)
+        print(f"✅ {total} incidents en base ({time.perf_counter() - debut:.1f} s)", file=sys.stderr)
+
+        port = port_libre()
+        serveur = demarrer_serveur(url, port, args.cache, args.workers)
+        try:
+            resultats_routes = {}
+            for route in routes:
+                if args.echauffement:
+                    executer_scenario(port, route, args.echauffement, args.concurrence, total, args.graine)
+                print(f"🚀 {route}: {args.requetes} requêtes, {args.concurrence} clients...", file=sys.stderr)
+                resultats_routes[route] = executer_scenario(port, route, args.requetes, args.concurrence,
+                                                            total, args.graine)
+                resultats_routes[route]['memoire_serveur'] = memoire_processus(serveur.pid)
+                latence = resultats_routes[route]['latence_ms']
+                print(f"   p50 {latence['p50']} ms | p95 {latence['p95']} ms | p99 {latence['p99']} ms | "
+                      f"{resultats_routes[route]['debit_rps']} req/s | "
+                      f"{resultats_routes[route]['erreurs']} erreurs", file=sys.stderr)
+            memoire = memoire_processus(serveur.pid)
+        finally:
+            serveur.terminate()
+            serveur.wait(timeout=10)
+
+    resultats = {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'configuration': {
+            'incidents': total,
+            'concurrence': args.concurrence,
+            'requetes_par_route': args.requetes,
+            'base': url.split(':', 1)[0] if args.database_url else 'sqlite',
+            'cache': args.cache,
+            'workers': args.workers,
+            'cpus': os.cpu_count(),
+            'python': platform.python_version(),
+            'plateforme': platform.platform()
+        },
+        'routes': resultats_routes,
+        'memoire_serveur': memoire
+    }
+
+    texte = json.dumps(resultats, indent=2, ensure_ascii=False)
+    if args.sortie:
+        with open(args.sortie, 'w', encoding='utf-8') as fichier:
+            fichier.write(texte + '\n')
+        print(f"💾 Résultats écrits dans {args.sortie}", file=sys.stderr)
+    else:
+        print(texte)
+
+    if args.reference:
+        with open(args.reference, encoding='utf-8') as fichier:
+            regressions = comparer(resultats, json.load(fichier), args.tolerance)
+        if regressions:
+            print("❌ Régressions détectées :", file=sys.stderr)
+            for regression in regressions:
+                print(f"   - {regression}", file=sys.stderr)
+            return 1
+        print(f"✅ Aucune régression au-delà de {args.tolerance:.0%}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+⏱️ Microbenchmark de la sérialisation des listes d'incidents
+Flask Incidents Réseau - Version Azure
+
+Compare, sur une base SQLite jetable, le chemin historique (objets ORM
+hydratés + to_dict() + encodeur JSON standard) au chemin rapide des listes
+et de l'export (lignes Core + lignes_en_dicts() + orjson), et vérifie que
+les deux produisent exactement les mêmes incidents.
+
+    python bench_serialisation.py --lignes 50000 --repetitions 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import insert, select
+
+import app as application
+from json_rapide import FournisseurJSONRapide, orjson
+
+
+def peupler(app, nombre):
+    """Insérer ``nombre`` incidents de test"""
+    debut = datetime(2025, 1, 1)
+    with app.app_context():
+        application.db.create_all()
+        with application.db.engine.begin() as connexion:
+            for lot in range(0, nombre, 10000):
+                connexion.execute(insert(application.Incident.__table__), [{
+                    'titre': f'Incident réseau n°{numero}',
+                    'severite': application.SEVERITES[numero % len(application.SEVERITES)],
+                    'date_incident': debut + timedelta(minutes=7 * numero)
+                } for numero in range(lot, min(lot + 10000, nombre))])
+
+
+def chronometrer(fonction, repetitions):
+    """Médiane des durées d'exécution (ms) et dernier résultat"""
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        resultat = fonction()
+        durees.append((time.perf_counter() - debut) * 1000)
+    return statistics.median(durees), resultat
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Microbenchmark de la sérialisation des incidents')
+    parser.add_argument('--lignes', type=int, default=20000, help='Nombre d\'incidents sérialisés')
+    parser.add_argument('--repetitions', type=int, default=5, help='Mesures par variante (médiane)')
+    parser.add_argument('--json', action='store_true', help='Résultats au format JSON')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as dossier:
+        app = application.create_app({
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(dossier, 'bench.db')}"
+        })
+        peupler(app, args.lignes)
+        standard = DefaultJSONProvider(app)
+        rapide = FournisseurJSONRapide(app) if orjson else None
+        ordre = (application.Incident.date_incident.desc(), application.Incident.id.desc())
+
+        with app.app_context():
+            session = application.db.session
+
+            def orm_to_dict():
+                incidents = session.execute(select(application.Incident).order_by(*ordre)).scalars().all()
+                dictionnaires = [incident.to_dict() for incident in incidents]
+                session.expunge_all()
+                return dictionnaires
+
+            def core_lignes():
+                return application.lignes_en_dicts(
+                    session.execute(select(*application.COLONNES_LISTE).order_by(*ordre)))
+
+            mesures = {}
+            mesures['lecture_orm_to_dict'], reference = chronometrer(orm_to_dict, args.repetitions)
+            mesures['lecture_core_lignes'], rapides = chronometrer(core_lignes, args.repetitions)
+            assert rapides == reference, 'Le chemin rapide ne produit pas les mêmes incidents que to_dict()'
+
+            mesures['encodage_json_standard'], texte = chronometrer(
+                lambda: standard.dumps(reference), args.repetitions)
+            if rapide:
+                mesures['encodage_orjson'], texte_rapide = chronometrer(
+                    lambda: rapide.dumps(reference), args.repetitions)
+                assert json.loads(texte_rapide) == json.loads(texte)
+
+        with app.app_context():
+            application.db.engine.dispose()
+
+    total_avant = mesures['lecture_orm_to_dict'] + mesures['encodage_json_standard']
+    total_apres = mesures['lecture_core_lignes'] + mesures.get('encodage_orjson', mesures['encodage_json_standard'])
+    resultats = {
+        'lignes': args.lignes,
+        'repetitions': args.repetitions,
+        'orjson': rapide is not None,
+        'mediane_ms': {nom: round(duree, 2) for nom, duree in mesures.items()},
+        'total_ms': {'avant': round(total_avant, 2), 'apres': round(total_apres, 2)},
+        'gain': round(total_avant / total_apres, 2)
+    }
+
+    if args.json:
+        print(json.dumps(resultats, indent=2))
+        return 0
+
+    print("⏱️  MICROBENCHMARK DE LA SÉRIALISATION DES INCIDENTS")
+    print("=" * 60)
+    print(f"📊 {args.lignes} incidents, médiane de {args.repetitions} mesures")
+    for nom, duree in resultats['mediane_ms'].items():
+        print(f"   {nom:<28} {duree:>10.2f} ms")
+    print("-" * 60)
+    print(f"🐢 ORM + to_dict() + json : {resultats['total_ms']['avant']:.2f} ms")
+    print(f"⚡ Core + lignes + {'orjson' if rapide else 'json'} : {resultats['total_ms']['apres']:.2f} ms")
+    print(f"🚀 Gain : x{resultats['gain']}")
+    print("✅ Sortie identique à to_dict()")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
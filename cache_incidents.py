@@ -0,0 +1,142 @@
+"""
+🗄️ Cache de lecture des incidents
+Flask Incidents Réseau - Version Azure
+
+Cache read-through pour les lectures d'incidents (liste, détail) avec
+backends interchangeables et compteurs de dimensionnement.
+
+Le cache est local au processus : l'invalidation après une écriture est
+immédiate dans le worker qui écrit, les autres workers voient la nouvelle
+donnée au plus tard après l'expiration du TTL. Une valeur calculée pendant
+l'invalidation de son espace n'est pas mémorisée : elle peut avoir été lue
+avant l'écriture.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+# Valeur renvoyée par get() lorsqu'une clé est absente ou expirée
+MANQUANT = object()
+
+
+class CacheNul:
+    """Backend sans cache : chaque lecture va en base"""
+
+    def get(self, cle):
+        return MANQUANT
+
+    def set(self, cle, valeur):
+        pass
+
+    def invalider(self, espace):
+        pass
+
+    def vider(self):
+        pass
+
+    def stats(self):
+        return {'backend': 'aucun'}
+
+    def generation(self, espace):
+        """(nombre d'invalidations, instant monotonic de la dernière) d'un espace de noms"""
+        return 0, None
+
+    def lire_ou_calculer(self, cle, calcul, quarantaine=0.0):
+        """Lire une valeur en cache ou la calculer puis la mémoriser
+
+        La valeur n'est pas mémorisée si son espace a été invalidé pendant le
+        calcul, ni moins de ``quarantaine`` secondes après la dernière
+        invalidation (lecture d'un réplica qui n'a peut-être pas encore reçu
+        l'écriture).
+        """
+        valeur = self.get(cle)
+        if valeur is MANQUANT:
+            avant, _ = self.generation(cle[0])
+            valeur = calcul()
+            apres, invalide_le = self.generation(cle[0])
+            if apres == avant and (invalide_le is None or time.monotonic() - invalide_le >= quarantaine):
+                self.set(cle, valeur)
+        return valeur
+
+
+class CacheLRU(CacheNul):
+    """Cache LRU en mémoire du processus, borné en taille et avec TTL
+
+    Les clés sont des tuples dont le premier élément est l'espace de noms
+    (``'liste'``, ``'detail'``...), ce qui permet d'invalider un espace entier.
+    """
+
+    def __init__(self, taille_max=1024, ttl=30.0):
+        self.taille_max = taille_max
+        self.ttl = ttl
+        self._entrees = OrderedDict()
+        self._generations = {}  # espace -> (nombre d'invalidations, instant de la dernière)
+        self._verrou = threading.Lock()
+        self._compteurs = {'hits': 0, 'misses': 0, 'evictions': 0,
+                           'expirations': 0, 'invalidations': 0}
+
+    def get(self, cle):
+        with self._verrou:
+            entree = self._entrees.get(cle)
+            if entree is None:
+                self._compteurs['misses'] += 1
+                return MANQUANT
+
+            expiration, valeur = entree
+            if expiration < time.monotonic():
+                del self._entrees[cle]
+                self._compteurs['expirations'] += 1
+                self._compteurs['misses'] += 1
+                return MANQUANT
+
+            self._entrees.move_to_end(cle)
+            self._compteurs['hits'] += 1
+            return valeur
+
+    def set(self, cle, valeur):
+        with self._verrou:
+            self._entrees[cle] = (time.monotonic() + self.ttl, valeur)
+            self._entrees.move_to_end(cle)
+            while len(self._entrees) > self.taille_max:
+                self._entrees.popitem(last=False)
+                self._compteurs['evictions'] += 1
+
+    def generation(self, espace):
+        with self._verrou:
+            return self._generations.get(espace, (0, None))
+
+    def invalider(self, espace):
+        """Supprimer toutes les entrées d'un espace de noms"""
+        with self._verrou:
+            numero, _ = self._generations.get(espace, (0, None))
+            self._generations[espace] = (numero + 1, time.monotonic())
+            cles = [cle for cle in self._entrees if cle[0] == espace]
+            for cle in cles:
+                del self._entrees[cle]
+            self._compteurs['invalidations'] += len(cles)
+
+    def vider(self):
+        with self._verrou:
+            self._entrees.clear()
+
+    def stats(self):
+        with self._verrou:
+            lectures = self._compteurs['hits'] + self._compteurs['misses']
+            return {
+                'backend': 'lru',
+                'taille': len(self._entrees),
+                'taille_max': self.taille_max,
+                'ttl_secondes': self.ttl,
+                **self._compteurs,
+                'taux_succes': round(self._compteurs['hits'] / lectures, 4) if lectures else None
+            }
+
+
+def creer_cache(backend='lru', taille_max=1024, ttl=30.0):
+    """Créer le backend de cache demandé par la configuration"""
+    if backend == 'lru':
+        return CacheLRU(taille_max=taille_max, ttl=ttl)
+    if backend == 'aucun':
+        return CacheNul()
+    raise ValueError(f"Backend de cache inconnu: {backend}")
@@ -0,0 +1,76 @@
+"""
+🗜️ Compression négociée des réponses
+Flask Incidents Réseau - Version Azure
+
+Les réponses HTML et JSON dépassant un seuil de taille sont compressées en
+brotli (si le module est installé) ou gzip, selon l'en-tête Accept-Encoding
+du client. Ne sont pas touchées : les réponses déjà encodées (ressources de
+/assets/), les réponses en flux (export, SSE), les 304 et les réponses sans
+corps.
+"""
+
+import gzip
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Types compressés à la volée (CSS / JS sont précompressés sous /assets/)
+TYPES_COMPRESSIBLES = ('text/html', 'application/json', 'text/plain')
+
+
+class CompressionReponses:
+    """Compression gzip / brotli des réponses d'une application Flask
+
+    Niveaux modérés (gzip 6, brotli 4) : la compression est faite à chaque
+    requête, contrairement aux ressources statiques compressées une fois.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.seuil = app.config['COMPRESSION_SEUIL']
+        self.niveau_gzip = app.config['COMPRESSION_NIVEAU_GZIP']
+        self.niveau_brotli = app.config['COMPRESSION_NIVEAU_BROTLI']
+        self.encodages = ('br', 'gzip') if brotli is not None else ('gzip',)
+        app.after_request(self.compresser)
+        app.extensions['compression_reponses'] = self
+
+    def _compresser_corps(self, corps, encodage):
+        if encodage == 'br':
+            return brotli.compress(corps, quality=self.niveau_brotli)
+        return gzip.compress(corps, compresslevel=self.niveau_gzip, mtime=0)
+
+    def compresser(self, reponse):
+        """Compresser la réponse si son type, sa taille et le client le permettent"""
+        if (reponse.mimetype not in TYPES_COMPRESSIBLES
+                or reponse.status_code < 200 or reponse.status_code in (204, 206, 304)
+                or reponse.direct_passthrough or reponse.is_streamed
+                or 'Content-Encoding' in reponse.headers):
+            return reponse
+
+        # La représentation dépend de l'en-tête du client, même quand elle n'est pas compressée
+        reponse.vary.add('Accept-Encoding')
+        encodage = request.accept_encodings.best_match(self.encodages)
+        if encodage is None or request.method == 'HEAD':
+            return reponse
+
+        corps = reponse.get_data()
+        if len(corps) < self.seuil:
+            return reponse
+        compresse = self._compresser_corps(corps, encodage)
+        if len(compresse) >= len(corps):
+            return reponse
+
+        reponse.set_data(compresse)
+        reponse.headers['Content-Encoding'] = encodage
+        # Même contenu, octets différents : l'ETag devient faible (comparaison If-None-Match faible)
+        etag, faible = reponse.get_etag()
+        if etag and not faible:
+            reponse.set_etag(etag, weak=True)
+        return reponse
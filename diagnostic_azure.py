@@ -2,24 +2,66 @@
 🔧 Diagnostic complet Azure SQL Database
 Flask Incidents Réseau - Version Azure
 
-Ce script effectue tous les tests de diagnostic pour Azure SQL Database
+Ce script effectue tous les tests de diagnostic pour Azure SQL Database.
+Les vérifications indépendantes (réseau, pyodbc, SQLAlchemy) s'exécutent en
+parallèle : le diagnostic dure le temps de la plus lente.
+
+Le mode ``--bench`` mesure les latences de la connexion sur N itérations
+dans M threads et écrit un résultat JSON comparable entre régions et
+niveaux de service :
+
+    python diagnostic_azure.py --bench --iterations 50 --threads 4 --etiquette westeurope-S2 --sortie bench.json
 """
 
+import argparse
+import io
+import json
 import os
+import platform
+import socket
 import sys
+import threading
 import time
-import pyodbc
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from sqlalchemy import create_engine, text
+from sqlalchemy import column, create_engine, select, table, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.pool import NullPool
+
+from mesures import resume_latences
+
+try:
+    import pyodbc
+except ImportError:
+    pyodbc = None  # signalé par check_pyodbc_drivers()
 
 # Charger les variables d'environnement depuis le fichier .env
+# (messages sur stderr : la sortie standard du mode --bench est du JSON)
 try:
     from dotenv import load_dotenv
     load_dotenv()
-    print("🔧 Variables d'environnement chargées depuis .env")
+    print("🔧 Variables d'environnement chargées depuis .env", file=sys.stderr)
 except ImportError:
-    print("⚠️  python-dotenv non installé, utilisation des variables système uniquement")
+    print("⚠️  python-dotenv non installé, utilisation des variables système uniquement", file=sys.stderr)
+
+# Phases mesurées par le mode --bench
+PHASES = ('tcp', 'connexion_neuve', 'checkout_pool', 'requete_incidents')
+
+def url_azure_sqlalchemy():
+    """URL SQLAlchemy d'Azure SQL à partir des variables d'environnement"""
+    server = os.getenv('AZURE_SQL_SERVER')
+    database = os.getenv('AZURE_SQL_DATABASE')
+    username = os.getenv('AZURE_SQL_USERNAME')
+    password = os.getenv('AZURE_SQL_PASSWORD')
+    
+    return (
+        f"mssql+pyodbc://{username}:{password}@{server}/{database}"
+        f"?driver=ODBC+Driver+18+for+SQL+Server"
+        f"&Encrypt=yes"
+        f"&TrustServerCertificate=no"
+        f"&Connection+Timeout=30"
+    )
 
 def print_banner():
     """Affiche la bannière de diagnostic"""
@@ -65,6 +107,10 @@ def check_pyodbc_drivers():
     print("🔍 2. VÉRIFICATION DES DRIVERS ODBC")
     print("-" * 50)
     
+    if pyodbc is None:
+        print("❌ Module pyodbc non importable (pip install pyodbc, gestionnaire ODBC du système)")
+        return False, None
+    
     try:
         drivers = pyodbc.drivers()
         print(f"📊 {len(drivers)} driver(s) ODBC trouvé(s):")
@@ -142,18 +188,7 @@ def test_sqlalchemy_connection():
     print("🔍 4. TEST DE CONNEXION SQLALCHEMY")
     print("-" * 50)
     
-    server = os.getenv('AZURE_SQL_SERVER')
-    database = os.getenv('AZURE_SQL_DATABASE')
-    username = os.getenv('AZURE_SQL_USERNAME')
-    password = os.getenv('AZURE_SQL_PASSWORD')
-    
-    connection_string = (
-        f"mssql+pyodbc://{username}:{password}@{server}/{database}"
-        f"?driver=ODBC+Driver+18+for+SQL+Server"
-        f"&Encrypt=yes"
-        f"&TrustServerCertificate=no"
-        f"&Connection+Timeout=30"
-    )
+    connection_string = url_azure_sqlalchemy()
     
     try:
         print("📡 Création du moteur SQLAlchemy...")
@@ -202,8 +237,6 @@ def test_azure_connectivity():
     server_name = server.split('.')[0] if '.' in server else server
     
     try:
-        import socket
-        
         print(f"🌐 Test de résolution DNS: {server}")
         
         # Résolution DNS
@@ -243,18 +276,7 @@ def test_database_operations():
     print("🔍 6. TEST DES OPÉRATIONS DE BASE DE DONNÉES")
     print("-" * 50)
     
-    server = os.getenv('AZURE_SQL_SERVER')
-    database = os.getenv('AZURE_SQL_DATABASE')
-    username = os.getenv('AZURE_SQL_USERNAME')
-    password = os.getenv('AZURE_SQL_PASSWORD')
-    
-    connection_string = (
-        f"mssql+pyodbc://{username}:{password}@{server}/{database}"
-        f"?driver=ODBC+Driver+18+for+SQL+Server"
-        f"&Encrypt=yes"
-        f"&TrustServerCertificate=no"
-        f"&Connection+Timeout=30"
-    )
+    connection_string = url_azure_sqlalchemy()
     
     try:
         engine = create_engine(connection_string)
@@ -360,9 +382,210 @@ def generate_report(results):
     
     print("=" * 80)
 
+# ========================================
+# EXÉCUTION PARALLÈLE DES VÉRIFICATIONS
+# ========================================
+
+class SortieParThread:
+    """sys.stdout qui met de côté les print() de chaque vérification parallèle"""
+    
+    def __init__(self, sortie):
+        self.sortie = sortie
+        self.local = threading.local()
+    
+    def write(self, texte):
+        tampon = getattr(self.local, 'tampon', None)
+        return (tampon if tampon is not None else self.sortie).write(texte)
+    
+    def flush(self):
+        self.sortie.flush()
+    
+    def __getattr__(self, nom):
+        return getattr(self.sortie, nom)
+
+def executer_en_parallele(verifications):
+    """Lancer des vérifications indépendantes ensemble, afficher leurs sorties dans l'ordre
+    
+    Renvoie la liste des résultats, dans l'ordre de ``verifications``.
+    """
+    sortie = sys.stdout
+    capture = SortieParThread(sortie)
+    
+    def executer(verification):
+        capture.local.tampon = io.StringIO()
+        try:
+            return verification(), capture.local.tampon.getvalue()
+        finally:
+            capture.local.tampon = None
+    
+    sys.stdout = capture
+    try:
+        with ThreadPoolExecutor(max_workers=len(verifications)) as executeur:
+            futures = [executeur.submit(executer, verification) for verification in verifications]
+            resultats = []
+            for future in futures:
+                resultat, texte = future.result()
+                sortie.write(texte + "\n")
+                sortie.flush()
+                resultats.append(resultat)
+    finally:
+        sys.stdout = sortie
+    return resultats
+
+# ========================================
+# MODE --bench : LATENCES PAR PHASE
+# ========================================
+
+def requete_incidents(limite=50):
+    """Première page de /api/incidents (tri date décroissante, id)"""
+    incidents = table('incidents', column('id'), column('titre'), column('severite'), column('date_incident'))
+    return (select(incidents)
+            .order_by(incidents.c.date_incident.desc(), incidents.c.id.desc())
+            .limit(limite))
+
+def cible_tcp(url):
+    """(hôte, port) du serveur SQL, None pour une base sans réseau (SQLite)"""
+    if not url.host:
+        return None
+    hote, _, port = url.host.partition(',')
+    return hote, int(port or url.port or 1433)
+
+def mesurer_latences(url, iterations, threads, echauffement):
+    """Mesurer chaque phase ``iterations`` fois dans chacun des ``threads`` threads
+    
+    Renvoie ({phase: [durées en secondes]}, {phase: [erreurs]}).
+    """
+    cible = cible_tcp(url)
+    # Connexion neuve à chaque mesure (login complet) contre pool réutilisé, comme l'application
+    moteur_direct = create_engine(url, poolclass=NullPool)
+    moteur_pool = create_engine(url, pool_size=threads, max_overflow=0, pool_pre_ping=True)
+    requete = requete_incidents()
+    durees = {phase: [] for phase in PHASES}
+    erreurs = {phase: [] for phase in PHASES}
+    verrou = threading.Lock()
+    depart = threading.Barrier(threads)
+    
+    def iteration(mesures, echecs):
+        def mesurer(phase, fonction):
+            debut = time.perf_counter()
+            try:
+                resultat = fonction()
+            except Exception as e:
+                echecs[phase].append(f"{type(e).__name__}: {e}"[:200])
+                return None
+            mesures[phase].append(time.perf_counter() - debut)
+            return resultat
+        
+        if cible:
+            sock = mesurer('tcp', lambda: socket.create_connection(cible, timeout=10))
+            if sock:
+                sock.close()
+        connexion = mesurer('connexion_neuve', moteur_direct.connect)
+        if connexion:
+            connexion.close()
+        connexion = mesurer('checkout_pool', moteur_pool.connect)
+        if connexion:
+            with connexion:
+                mesurer('requete_incidents', lambda: connexion.execute(requete).fetchall())
+    
+    def client():
+        # Échauffement : pool rempli, DNS et plans en cache, mesures jetées
+        for _ in range(echauffement):
+            iteration({phase: [] for phase in PHASES}, {phase: [] for phase in PHASES})
+        depart.wait()
+        mesures = {phase: [] for phase in PHASES}
+        echecs = {phase: [] for phase in PHASES}
+        for _ in range(iterations):
+            iteration(mesures, echecs)
+        with verrou:
+            for phase in PHASES:
+                durees[phase].extend(mesures[phase])
+                erreurs[phase].extend(echecs[phase])
+    
+    try:
+        clients = [threading.Thread(target=client) for _ in range(threads)]
+        for thread in clients:
+            thread.start()
+        for thread in clients:
+            thread.join()
+    finally:
+        moteur_direct.dispose()
+        moteur_pool.dispose()
+    return durees, erreurs
+
+def bench(args):
+    """Mode --bench : percentiles par phase, résultat JSON"""
+    url = make_url(args.database_url or url_azure_sqlalchemy())
+    if not args.database_url:
+        missing_vars = [var for var in ('AZURE_SQL_SERVER', 'AZURE_SQL_DATABASE', 'AZURE_SQL_USERNAME',
+                                        'AZURE_SQL_PASSWORD') if not os.getenv(var)]
+        if missing_vars:
+            print(f"❌ Variables manquantes: {', '.join(missing_vars)}", file=sys.stderr)
+            return 1
+    
+    print(f"⏱️  BENCH {url.get_backend_name()} {url.host or url.database}: "
+          f"{args.iterations} itérations × {args.threads} threads", file=sys.stderr)
+    debut = time.perf_counter()
+    durees, erreurs = mesurer_latences(url, args.iterations, args.threads, args.echauffement)
+    duree_totale = time.perf_counter() - debut
+    
+    phases = {}
+    for phase in PHASES:
+        if phase == 'tcp' and cible_tcp(url) is None:
+            phases[phase] = None
+            continue
+        phases[phase] = {
+            **resume_latences(durees[phase]),
+            'erreurs': len(erreurs[phase]),
+            'exemples_erreurs': sorted(set(erreurs[phase]))[:3]
+        }
+        latence = phases[phase]
+        print(f"   {phase}: p50 {latence['p50']} ms | p95 {latence['p95']} ms | p99 {latence['p99']} ms | "
+              f"{latence['erreurs']} erreurs", file=sys.stderr)
+    
+    resultats = {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'etiquette': args.etiquette,
+        'serveur': url.host or url.database,
+        'base': url.get_backend_name(),
+        'configuration': {
+            'iterations': args.iterations,
+            'threads': args.threads,
+            'echauffement': args.echauffement,
+            'python': platform.python_version(),
+            'plateforme': platform.platform()
+        },
+        'duree_secondes': round(duree_totale, 3),
+        'phases': phases
+    }
+    
+    texte = json.dumps(resultats, indent=2, ensure_ascii=False)
+    if args.sortie:
+        with open(args.sortie, 'w', encoding='utf-8') as fichier:
+            fichier.write(texte + "\n")
+        print(f"💾 Résultats écrits dans {args.sortie}", file=sys.stderr)
+    else:
+        print(texte)
+    return 0 if not any(erreurs.values()) else 1
+
 def main():
     """Fonction principale de diagnostic"""
+    parser = argparse.ArgumentParser(description='Diagnostic Azure SQL Database')
+    parser.add_argument('--bench', action='store_true',
+                        help='Mesurer les latences (TCP, connexion neuve, checkout, requête) en JSON')
+    parser.add_argument('--iterations', type=int, default=20, help='Mesures par thread (--bench)')
+    parser.add_argument('--threads', type=int, default=4, help='Threads simultanés (--bench)')
+    parser.add_argument('--echauffement', type=int, default=2, help='Itérations non mesurées par thread (--bench)')
+    parser.add_argument('--database-url', help='URL SQLAlchemy mesurée (--bench, défaut : variables AZURE_SQL_*)')
+    parser.add_argument('--etiquette', help='Libellé du résultat, par exemple région et niveau de service')
+    parser.add_argument('--sortie', help='Fichier JSON des résultats (défaut : sortie standard)')
+    args = parser.parse_args()
+    
+    if args.bench:
+        return bench(args)
+    
     print_banner()
+    debut = time.perf_counter()
     
     results = {}
     
@@ -388,20 +611,13 @@ def main():
         print("=" * 80)
         return
     
-    # Test 3: Connectivité réseau
-    network_ok = test_azure_connectivity()
+    # Tests 3 à 5 en parallèle : connectivité réseau, connexion basique, connexion SQLAlchemy
+    network_ok, (basic_ok, basic_time), (sqlalchemy_ok, sqlalchemy_time) = executer_en_parallele(
+        [test_azure_connectivity, test_basic_connection, test_sqlalchemy_connection]
+    )
     results["Connectivité réseau"] = network_ok
-    print()
-    
-    # Test 4: Connexion basique
-    basic_ok, basic_time = test_basic_connection()
     results["Connexion pyodbc"] = basic_ok
-    print()
-    
-    # Test 5: Connexion SQLAlchemy
-    sqlalchemy_ok, sqlalchemy_time = test_sqlalchemy_connection()
     results["Connexion SQLAlchemy"] = sqlalchemy_ok
-    print()
     
     # Test 6: Opérations de base de données
     if basic_ok and sqlalchemy_ok:
@@ -413,10 +629,11 @@ def main():
     
     # Génération du rapport final
     generate_report(results)
+    print(f"⏱️  Diagnostic terminé en {time.perf_counter() - debut:.1f}s")
 
 if __name__ == "__main__":
     try:
-        main()
+        sys.exit(main())
     except KeyboardInterrupt:
         print("\n\n⏹️  Diagnostic interrompu par l'utilisateur")
     except Exception as e:
@@ -0,0 +1,161 @@
+"""
+🔌 Disjoncteur des connexions Azure SQL
+Flask Incidents Réseau - Version Azure
+
+Quand Azure SQL est injoignable, chaque checkout bloque jusqu'au timeout de
+connexion (30 s par défaut) et immobilise un thread du serveur. Le
+disjoncteur compte les échecs consécutifs : au-delà du seuil il s'ouvre et
+les checkouts échouent immédiatement, puis une seule connexion de test est
+autorisée après le délai d'ouverture pour vérifier le rétablissement.
+
+Les erreurs transitoires d'Azure SQL (bascule, base en cours de
+redémarrage, limitation) sont réessayées avec un délai aléatoire croissant.
+Un serveur injoignable (08001, login timeout) ne l'est pas : chaque essai
+attendrait de nouveau AZURE_CONNECTION_TIMEOUT avant que le disjoncteur ne
+compte l'échec.
+"""
+
+import random
+import re
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy.exc import TimeoutError as TimeoutPool
+
+FERME = 'ferme'
+OUVERT = 'ouvert'
+DEMI_OUVERT = 'demi-ouvert'
+
+# Codes d'erreur natifs Azure SQL documentés comme transitoires (réessayer) ; pas 10060
+# (délai de connexion TCP dépassé) : l'essai suivant attendrait aussi longtemps
+CODES_TRANSITOIRES = {'40613', '40197', '40501', '40540', '40143', '49918', '49919', '49920',
+                      '4060', '4221', '10928', '10929', '10053', '10054', '233', '64'}
+# SQLSTATE ODBC de perte d'une connexion établie
+ETATS_TRANSITOIRES = {'08S01'}
+# Serveur injoignable, login ou requête hors délai : jamais réessayés, quel que soit le code natif
+ETATS_NON_REESSAYES = {'08001', 'HYT00', 'HYT01'}
+
+# Positions du driver : ('08S01', '[08S01] [Microsoft][ODBC Driver 18 for SQL Server]... (10054) (SQLDriverConnect)')
+MOTIF_ETAT = re.compile(r"[\[']([0-9A-Z]{5})[\]']")
+MOTIF_CODE_NATIF = re.compile(r'\((\d{2,5})\)')
+
+
+class DisjoncteurOuvert(Exception):
+    """Checkout refusé sans contacter la base (disjoncteur ouvert)"""
+
+
+def erreur_transitoire(erreur):
+    """L'erreur de connexion mérite-t-elle un nouvel essai immédiat ?
+
+    SQLSTATE et code natif ne sont lus qu'aux positions où le driver les
+    place (``[08S01]``, ``(40613)``), pas dans le texte libre du message.
+    """
+    message = str(erreur)
+    etats = set(MOTIF_ETAT.findall(message))
+    if etats & ETATS_NON_REESSAYES or 'timeout expired' in message.lower():
+        return False
+    codes = set(MOTIF_CODE_NATIF.findall(message))
+    return bool(codes & CODES_TRANSITOIRES or etats & ETATS_TRANSITOIRES)
+
+
+class Disjoncteur:
+    """Disjoncteur fermé / ouvert / demi-ouvert avec nouvels essais espacés
+
+    ``seuil`` échecs consécutifs ouvrent le disjoncteur pour ``delai_ouverture``
+    secondes. Chaque appel est tenté au plus ``tentatives`` fois si l'erreur
+    est transitoire, avec une pause tirée entre 0 et
+    ``min(delai_max, delai_base * 2**essai)`` (full jitter).
+    """
+
+    def __init__(self, seuil=5, delai_ouverture=30.0, tentatives=3, delai_base=0.2, delai_max=2.0):
+        self.seuil = seuil
+        self.delai_ouverture = delai_ouverture
+        self.tentatives = tentatives
+        self.delai_base = delai_base
+        self.delai_max = delai_max
+        self._verrou = threading.Lock()
+        self._etat = FERME
+        self._echecs_consecutifs = 0
+        self._ouvert_jusqua = 0.0
+        self._essai_en_cours = False
+        self._derniere_erreur = None
+        self._change_le = datetime.now()
+        self._compteurs = {'ouvertures': 0, 'refus': 0, 'nouveaux_essais': 0}
+
+    def _changer_etat(self, etat):
+        self._etat = etat
+        self._change_le = datetime.now()
+
+    def _autoriser(self):
+        """Autoriser un appel, renvoie True s'il s'agit de la connexion de test"""
+        with self._verrou:
+            if self._etat == FERME:
+                return False
+            if self._etat == OUVERT and time.monotonic() >= self._ouvert_jusqua:
+                self._changer_etat(DEMI_OUVERT)
+            if self._etat == DEMI_OUVERT and not self._essai_en_cours:
+                self._essai_en_cours = True
+                return True
+            self._compteurs['refus'] += 1
+            restant = max(0.0, self._ouvert_jusqua - time.monotonic())
+        raise DisjoncteurOuvert(f'Azure SQL indisponible (disjoncteur ouvert après {self.seuil} échecs, '
+                                f'nouvel essai dans {restant:.0f} s) : {self._derniere_erreur}')
+
+    def _succes(self):
+        with self._verrou:
+            self._echecs_consecutifs = 0
+            self._essai_en_cours = False
+            if self._etat != FERME:
+                self._changer_etat(FERME)
+
+    def _echec(self, erreur):
+        with self._verrou:
+            self._echecs_consecutifs += 1
+            self._derniere_erreur = f'{type(erreur).__name__}: {erreur}'[:300]
+            if self._etat == DEMI_OUVERT or self._echecs_consecutifs >= self.seuil:
+                if self._etat != OUVERT:
+                    self._compteurs['ouvertures'] += 1
+                self._changer_etat(OUVERT)
+                self._ouvert_jusqua = time.monotonic() + self.delai_ouverture
+            self._essai_en_cours = False
+
+    def appeler(self, fonction):
+        """Appeler ``fonction`` (checkout) à travers le disjoncteur"""
+        essai_de_test = self._autoriser()
+        # La connexion de test n'est tentée qu'une fois : un échec rouvre le disjoncteur
+        tentatives = 1 if essai_de_test else self.tentatives
+        for essai in range(tentatives):
+            try:
+                resultat = fonction()
+            except TimeoutPool:
+                # Pool saturé : la base répond, ce n'est pas une panne
+                with self._verrou:
+                    self._essai_en_cours = False
+                raise
+            except Exception as erreur:
+                if essai + 1 < tentatives and erreur_transitoire(erreur):
+                    with self._verrou:
+                        self._compteurs['nouveaux_essais'] += 1
+                    time.sleep(random.uniform(0, min(self.delai_max, self.delai_base * 2 ** essai)))
+                    continue
+                self._echec(erreur)
+                raise
+            self._succes()
+            return resultat
+
+    def etat(self):
+        """État du disjoncteur (affiché par /azure-status)"""
+        with self._verrou:
+            etat = {
+                'etat': self._etat,
+                'echecs_consecutifs': self._echecs_consecutifs,
+                'seuil': self.seuil,
+                'delai_ouverture_secondes': self.delai_ouverture,
+                'depuis': self._change_le.isoformat(timespec='seconds'),
+                'derniere_erreur': self._derniere_erreur,
+                **self._compteurs
+            }
+            if self._etat == OUVERT:
+                etat['nouvel_essai_dans_secondes'] = round(max(0.0, self._ouvert_jusqua - time.monotonic()), 1)
+        return etat
@@ -0,0 +1,311 @@
+"""
+📝 Écriture différée des incidents (group commit)
+Flask Incidents Réseau - Version Azure
+
+Les créations sont acceptées dans une file bornée du processus puis écrites
+en base par un thread unique, par lots (une transaction par lot) dès que le
+lot est plein ou que le délai d'attente est écoulé. Pendant une rafale
+d'incidents, une seule connexion écrit au lieu d'un commit par requête.
+
+Chaque création acceptée est d'abord ajoutée (fsync) à un fichier de spool
+local : après un arrêt brutal, le processus suivant rejoue les créations qui
+n'étaient pas encore en base. La garantie est « au moins une fois » : un
+arrêt entre le commit d'un lot et son marquage dans le spool le rejoue.
+"""
+
+import glob
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from metriques import BORNES_DUREE, BORNES_NOMBRE, Compteur, Histogramme, valeurs_instantanees
+
+
+class FilePleine(Exception):
+    """La file d'écriture est restée pleine pendant tout le délai d'attente"""
+
+
+def encoder_ligne(numero, valeurs):
+    """Ligne du spool pour une création (dates au format ISO)"""
+    return json.dumps({'n': numero, 'valeurs': {
+        cle: valeur.isoformat() if isinstance(valeur, datetime) else valeur
+        for cle, valeur in valeurs.items()
+    }}, ensure_ascii=False) + '\n'
+
+
+def decoder_valeurs(valeurs):
+    """Valeurs d'une création relue dans le spool"""
+    if valeurs.get('date_incident'):
+        valeurs['date_incident'] = datetime.fromisoformat(valeurs['date_incident'])
+    return valeurs
+
+
+def processus_actif(pid):
+    """Le processus ``pid`` existe-t-il encore ?"""
+    if os.name == 'nt':
+        # Pas de signal 0 sous Windows (serveur de développement mono-processus)
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def lire_spool(chemin):
+    """Créations d'un spool non encore marquées comme écrites en base"""
+    creations, ecrit_jusqua = {}, 0
+    with open(chemin, encoding='utf-8') as fichier:
+        for texte in fichier:
+            try:
+                ligne = json.loads(texte)
+            except ValueError:
+                break  # dernière ligne tronquée par l'arrêt : jamais acquittée
+            if 'commit' in ligne:
+                ecrit_jusqua = max(ecrit_jusqua, ligne['commit'])
+            else:
+                creations[ligne['n']] = decoder_valeurs(ligne['valeurs'])
+    return [valeurs for numero, valeurs in sorted(creations.items()) if numero > ecrit_jusqua]
+
+
+class FileEcriture:
+    """File d'écriture bornée avec spool local et écrivain par lots
+
+    ``ecrire_lot(lignes)`` insère une liste de dictionnaires en une
+    transaction ; ``apres_lot(lignes)`` est appelé après chaque lot écrit
+    (invalidation des caches, statistiques...). Le spool d'un processus est
+    ``dossier/ecriture-<pid>.ndjson``.
+
+    Un lot en échec est réessayé avec une pause croissante, sauf pour les
+    exceptions de ``erreurs_definitives`` (contrainte violée...) : ses
+    créations sont alors réécrites une à une pour n'abandonner que la fautive.
+    """
+
+    def __init__(self, ecrire_lot, dossier, apres_lot=None, taille_max=1000, taille_lot=100,
+                 delai=0.05, attente_max=2.0, erreurs_definitives=()):
+        self.ecrire_lot = ecrire_lot
+        self.dossier = dossier
+        self.apres_lot = apres_lot
+        self.taille_max = taille_max
+        self.taille_lot = taille_lot
+        self.delai = delai
+        self.attente_max = attente_max
+        self.erreurs_definitives = erreurs_definitives
+        self._a_isoler = 0  # créations de tête à écrire une à une après une erreur définitive
+        self._condition = threading.Condition()
+        self._en_attente = deque()  # (numero, valeurs, acceptée le), retirées une fois en base
+        self._numero = 0
+        self._spool = None
+        self._thread = None
+        self._pid = None
+        self._compteurs = {'acceptees': 0, 'ecrites': 0, 'refusees': 0, 'echecs': 0,
+                           'abandonnees': 0, 'rejouees': 0}
+
+        self.taille_lots = Histogramme('incidents_ecriture_lot_taille',
+                                       'Nombre de créations par lot écrit', (), BORNES_NOMBRE + (200, 500, 1000))
+        self.duree_lots = Histogramme('incidents_ecriture_lot_duree_secondes',
+                                      'Durée de l\'écriture d\'un lot (transaction comprise)', (), BORNES_DUREE)
+        self.attente = Histogramme('incidents_ecriture_attente_secondes',
+                                   'Délai entre l\'acceptation d\'une création et son écriture en base',
+                                   (), BORNES_DUREE)
+        self.operations = Compteur('incidents_ecriture_operations_total',
+                                   'Créations acceptées, écrites, refusées (file pleine), abandonnées '
+                                   'et lots en échec',
+                                   ('type',))
+
+    # ----- démarrage, reprise après arrêt -----
+
+    def demarrer(self):
+        """Ouvrir le spool, rejouer les spools orphelins et démarrer l'écrivain"""
+        if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+            return
+        with self._condition:
+            # Après un fork, le thread et le spool du parent n'appartiennent pas à l'enfant
+            if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._en_attente.clear()
+            self._numero = 0
+            os.makedirs(self.dossier, exist_ok=True)
+            chemin = os.path.join(self.dossier, f'ecriture-{self._pid}.ndjson')
+            reprises, reclames = self._reprendre_orphelins()
+            self._spool = open(chemin, 'a', encoding='utf-8')
+            for valeurs in reprises:
+                self._ajouter_au_spool(valeurs)
+            self._spool.flush()
+            os.fsync(self._spool.fileno())
+            # Les créations reprises sont dans notre spool : les anciens peuvent disparaître
+            for reclame in reclames:
+                os.remove(reclame)
+            self._compteurs['rejouees'] += len(reprises)
+            self._thread = threading.Thread(target=self._boucle, name='ecriture-incidents', daemon=True)
+            self._thread.start()
+            self._condition.notify_all()
+        if reprises:
+            print(f"📝 Écriture différée: {len(reprises)} création(s) du spool rejouée(s)")
+
+    def _reprendre_orphelins(self):
+        """Réclamer et lire les spools laissés par des processus arrêtés"""
+        reprises, reclames = [], []
+        for chemin in sorted(glob.glob(os.path.join(self.dossier, 'ecriture-*.ndjson'))):
+            # ecriture-<pid>.ndjson ou ecriture-<pid>-reprise-<suffixe>.ndjson
+            try:
+                pid = int(os.path.basename(chemin)[len('ecriture-'):-len('.ndjson')].split('-')[0])
+            except ValueError:
+                continue
+            # Un spool à notre propre pid vient forcément d'un processus précédent
+            if pid != self._pid and processus_actif(pid):
+                continue
+            reclame = os.path.join(self.dossier, f'ecriture-{self._pid}-reprise-{os.urandom(4).hex()}.ndjson')
+            try:
+                os.rename(chemin, reclame)  # un seul worker reprend chaque spool
+            except OSError:
+                continue
+            reprises.extend(lire_spool(reclame))
+            reclames.append(reclame)
+        return reprises, reclames
+
+    # ----- production -----
+
+    def _ajouter_au_spool(self, valeurs):
+        self._numero += 1
+        self._spool.write(encoder_ligne(self._numero, valeurs))
+        self._en_attente.append((self._numero, valeurs, time.monotonic()))
+
+    def ajouter(self, valeurs):
+        """Accepter une création : durable dans le spool au retour
+
+        Bloque tant que la file est pleine, au plus ``attente_max`` secondes,
+        puis lève ``FilePleine``.
+        """
+        self.demarrer()
+        with self._condition:
+            limite = time.monotonic() + self.attente_max
+            while len(self._en_attente) >= self.taille_max:
+                restant = limite - time.monotonic()
+                if restant <= 0:
+                    self._compteurs['refusees'] += 1
+                    self.operations.incrementer(('refusee',))
+                    raise FilePleine(f'File d\'écriture pleine ({self.taille_max} créations en attente)')
+                self._condition.wait(restant)
+            self._ajouter_au_spool(valeurs)
+            self._spool.flush()
+            os.fsync(self._spool.fileno())
+            self._compteurs['acceptees'] += 1
+            self.operations.incrementer(('acceptee',))
+            self._condition.notify_all()
+
+    # ----- écrivain -----
+
+    def _prochain_lot(self):
+        """Attendre un lot plein ou le délai écoulé depuis la plus ancienne création"""
+        with self._condition:
+            while not self._en_attente:
+                self._condition.wait()
+            if self._a_isoler:
+                return [self._en_attente[0]]
+            echeance = self._en_attente[0][2] + self.delai
+            while len(self._en_attente) < self.taille_lot:
+                restant = echeance - time.monotonic()
+                if restant <= 0:
+                    break
+                self._condition.wait(restant)
+            return [self._en_attente[index] for index in range(min(self.taille_lot, len(self._en_attente)))]
+
+    def _acquitter(self, lot, compteur='ecrites'):
+        """Retirer un lot écrit (ou abandonné) de la file et le marquer dans le spool"""
+        with self._condition:
+            self._a_isoler = max(0, self._a_isoler - len(lot))
+            for _ in lot:
+                self._en_attente.popleft()
+            if self._en_attente:
+                self._spool.write(json.dumps({'commit': lot[-1][0]}) + '\n')
+                self._spool.flush()
+            else:
+                # Plus rien en attente : le spool repart de zéro
+                self._spool.seek(0)
+                self._spool.truncate()
+            os.fsync(self._spool.fileno())
+            self._compteurs[compteur] += len(lot)
+            self._condition.notify_all()
+
+    def _boucle(self):
+        pause = self.delai
+        while True:
+            lot = self._prochain_lot()
+            lignes = [valeurs for _, valeurs, _ in lot]
+            debut = time.perf_counter()
+            try:
+                self.ecrire_lot(lignes)
+            except self.erreurs_definitives as e:
+                if len(lot) > 1:
+                    self._a_isoler = len(lot)
+                else:
+                    print(f"❌ Écriture différée: création abandonnée ({e}): {lignes[0]}")
+                    self.operations.incrementer(('abandonnee',))
+                    self._acquitter(lot, 'abandonnees')
+                continue
+            except Exception as e:
+                # Le lot reste en tête de file et dans le spool : nouvel essai après une pause
+                self._compteurs['echecs'] += 1
+                self.operations.incrementer(('echec',))
+                print(f"⚠️  Écriture différée: lot de {len(lignes)} création(s) non écrit ({e})")
+                time.sleep(pause)
+                pause = min(pause * 2 or 0.1, 30.0)
+                continue
+            pause = self.delai
+
+            fin = time.perf_counter()
+            self.duree_lots.observer((), fin - debut)
+            self.taille_lots.observer((), len(lot))
+            maintenant = time.monotonic()
+            for _, _, acceptee in lot:
+                self.attente.observer((), maintenant - acceptee)
+            self.operations.incrementer(('ecrite',), len(lot))
+            self._acquitter(lot)
+
+            if self.apres_lot:
+                try:
+                    self.apres_lot(lignes)
+                except Exception as e:
+                    print(f"⚠️  Écriture différée: mise à jour après le lot impossible ({e})")
+
+    # ----- observation -----
+
+    def vider(self, timeout=10.0):
+        """Attendre que toutes les créations acceptées soient en base"""
+        limite = time.monotonic() + timeout
+        with self._condition:
+            while self._en_attente:
+                restant = limite - time.monotonic()
+                if restant <= 0:
+                    return False
+                self._condition.wait(restant)
+        return True
+
+    def stats(self):
+        with self._condition:
+            en_attente = len(self._en_attente)
+            compteurs = dict(self._compteurs)
+        return {
+            'en_attente': en_attente,
+            'taille_max': self.taille_max,
+            'taille_lot': self.taille_lot,
+            'delai_secondes': self.delai,
+            **compteurs
+        }
+
+    def lignes_metriques(self):
+        """Métriques de la file au format Prometheus (pour /metrics)"""
+        yield from self.taille_lots.lignes()
+        yield from self.duree_lots.lignes()
+        yield from self.attente.lignes()
+        yield from self.operations.lignes()
+        yield from valeurs_instantanees('incidents_ecriture_file_profondeur',
+                                        'Créations acceptées pas encore écrites en base', 'gauge',
+                                        {((), ()): self.stats()['en_attente']})
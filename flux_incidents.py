@@ -0,0 +1,143 @@
+"""
+📡 Diffusion en temps réel des nouveaux incidents (Server-Sent Events)
+Flask Incidents Réseau - Version Azure
+
+Un diffuseur par processus : un seul thread interroge la base pour les
+incidents dont l'id dépasse le dernier diffusé, puis distribue chaque
+incident dans la file de tous les abonnés. Le coût en base ne dépend donc
+pas du nombre de tableaux de bord connectés. Sans abonné, rien n'est lu :
+le premier abonné suivant repart du dernier id de la table (les clients
+rattrapent eux-mêmes leur retard avec Last-Event-ID ou ``?depuis=``).
+"""
+
+import os
+import queue
+import threading
+
+# Marqueur placé dans la file d'un abonné pour terminer son flux
+FERME = object()
+
+
+class Abonnement:
+    """File d'événements bornée d'un client connecté au flux"""
+
+    def __init__(self, taille_max):
+        self.file = queue.Queue(maxsize=taille_max)
+
+    def attendre(self, timeout):
+        """Prochain événement, ou None si rien n'arrive avant le timeout"""
+        try:
+            return self.file.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class DiffuseurIncidents:
+    """Fan-out des nouveaux incidents vers tous les abonnés du processus
+
+    ``source(dernier_id)`` renvoie les incidents (dictionnaires avec ``id``)
+    créés après ``dernier_id`` ; ``dernier_id_initial()`` renvoie l'id le
+    plus récent au démarrage.
+    """
+
+    def __init__(self, source, dernier_id_initial, intervalle=2.0, taille_file=100):
+        self.source = source
+        self.dernier_id_initial = dernier_id_initial
+        self.intervalle = intervalle
+        self.taille_file = taille_file
+        self._abonnes = set()
+        self._verrou = threading.Lock()
+        # Sérialise la relecture du dernier id par les premiers abonnés et les lectures du thread
+        self._verrou_lecture = threading.Lock()
+        self._reveil = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._dernier_id = None
+
+    def abonner(self):
+        """Inscrire un nouvel abonné et démarrer le thread de lecture si besoin
+
+        Premier abonné : le dernier id diffusé est relu avant l'inscription,
+        sinon toutes les insertions faites sans abonné (import en masse)
+        rempliraient sa file et le déconnecteraient aussitôt.
+        """
+        self._demarrer()
+        abonnement = Abonnement(self.taille_file)
+        with self._verrou_lecture:
+            if not self.nombre_abonnes():
+                try:
+                    self._dernier_id = self.dernier_id_initial() or 0
+                except Exception as e:
+                    print(f"⚠️  Diffuseur d'incidents: dernier id illisible ({e})")
+            with self._verrou:
+                self._abonnes.add(abonnement)
+        return abonnement
+
+    def desabonner(self, abonnement):
+        with self._verrou:
+            self._abonnes.discard(abonnement)
+
+    def nombre_abonnes(self):
+        with self._verrou:
+            return len(self._abonnes)
+
+    def reveiller(self):
+        """Déclencher une lecture immédiate (après une écriture locale)"""
+        self._reveil.set()
+
+    def publier(self, incidents):
+        """Distribuer des incidents à tous les abonnés
+
+        Un abonné dont la file est pleine (client trop lent) est déconnecté :
+        il se reconnectera avec Last-Event-ID et rattrapera son retard.
+        """
+        with self._verrou:
+            abonnes = list(self._abonnes)
+        for abonnement in abonnes:
+            try:
+                for incident in incidents:
+                    abonnement.file.put_nowait(incident)
+            except queue.Full:
+                self.desabonner(abonnement)
+                self._fermer(abonnement)
+
+    def _fermer(self, abonnement):
+        """Vider la file d'un abonné et y placer le marqueur de fin"""
+        try:
+            while True:
+                abonnement.file.get_nowait()
+        except queue.Empty:
+            pass
+        abonnement.file.put_nowait(FERME)
+
+    def _demarrer(self):
+        if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+            return
+        with self._verrou:
+            # Après un fork, le thread du parent n'existe pas dans l'enfant
+            if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._boucle, name='diffuseur-incidents', daemon=True)
+            self._thread.start()
+
+    def _boucle(self):
+        while True:
+            try:
+                with self._verrou_lecture:
+                    if self._dernier_id is None:
+                        self._dernier_id = self.dernier_id_initial() or 0
+                    elif self.nombre_abonnes():
+                        self.lire_nouveautes()
+            except Exception as e:
+                print(f"⚠️  Diffuseur d'incidents: lecture impossible ({e})")
+            self._reveil.wait(self.intervalle)
+            self._reveil.clear()
+
+    def lire_nouveautes(self):
+        """Lire les incidents créés depuis la dernière lecture et les publier"""
+        incidents = self.source(self._dernier_id)
+        while incidents:
+            self._dernier_id = max(incident['id'] for incident in incidents)
+            self.publier(incidents)
+            incidents = self.source(self._dernier_id)
@@ -0,0 +1,104 @@
+"""
+🦄 Configuration gunicorn (production)
+Flask Incidents Réseau - Version Azure
+
+Plusieurs processus (un par cœur disponible) de plusieurs threads chacun :
+les processus contournent le GIL pour le rendu des pages et la
+sérialisation, les threads recouvrent les attentes d'Azure SQL. Chaque flux
+SSE ouvert (/api/incidents/stream) garde un thread ; ``GUNICORN_WORKER_CLASS=gevent``
+n'y consacre qu'une greenlet, au prix d'appels pyodbc bloquants pour tout
+le worker. L'application est chargée une fois dans le maître (``preload_app``) puis
+partagée par les workers ; les pools de connexions hérités du fork sont
+abandonnés dans chaque worker (moteur_azure.py).
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Toutes les valeurs se surchargent par variables d'environnement
+(GUNICORN_WORKERS, GUNICORN_WORKER_CLASS, GUNICORN_BIND...).
+"""
+
+import math
+import os
+
+
+def nombre_cpu():
+    """Cœurs réellement utilisables par ce processus (affinité et quota de conteneur compris)"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        # cgroup v2 (conteneurs, App Service Linux) : « quota période » ou « max période »
+        with open('/sys/fs/cgroup/cpu.max') as fichier:
+            quota, periode = fichier.read().split()
+        if quota != 'max':
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(periode))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+# ========================================
+# PROCESSUS ET THREADS
+# ========================================
+
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', '5003')}")
+
+# Un worker par cœur : chacun a son pool (AZURE_POOL_SIZE + AZURE_POOL_MAX_OVERFLOW connexions)
+# et ses threads de fond, le nombre de connexions Azure SQL de l'instance croît avec les workers
+workers = int(os.environ.get('GUNICORN_WORKERS', nombre_cpu()))
+
+# 'gthread' (défaut) ou 'gevent' (sur option)
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+if worker_class == 'gevent':
+    # Patch avant l'import de l'application (preload_app). pyodbc n'est pas patché : une requête SQL,
+    # ou un login Azure SQL qui attend AZURE_CONNECTION_TIMEOUT, bloque tout le worker (requêtes,
+    # battements SSE, threads de fond). À réserver aux déploiements validés par bench_charge.py
+    from gevent import monkey
+    monkey.patch_all()
+    # Connexions simultanées par worker, abonnés SSE compris
+    worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', '1000'))
+else:
+    # Un thread par requête, flux SSE compris ; pas plus de threads que de connexions du pool
+    threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+
+# Application importée une fois dans le maître, avant le fork
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'yes') == 'yes'
+
+# ========================================
+# DÉLAIS
+# ========================================
+
+# Worker sans signe de vie pendant ce délai : redémarré par le maître
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '60'))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', '5'))
+
+# Recycler les workers après N requêtes (0 : jamais), avec un décalage pour ne pas les redémarrer ensemble
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '0'))
+max_requests_jitter = max_requests // 10
+
+# Fichier de battement des workers en mémoire : un disque lent de conteneur ne bloque pas le maître
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+accesslog = os.environ.get('GUNICORN_ACCESSLOG') or None
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOGLEVEL', 'info')
+
+
+# ========================================
+# HOOKS
+# ========================================
+
+def when_ready(server):
+    concurrence = (f"{worker_connections} connexion(s)" if worker_class == 'gevent'
+                   else f"{threads} thread(s)")
+    server.log.info(f"🚀 Flask Incidents Azure : {workers} worker(s) {worker_class} × {concurrence} sur {bind} "
+                    f"({nombre_cpu()} cœur(s) disponibles)")
+
+
+def post_fork(server, worker):
+    # Les pools hérités du maître sont déjà abandonnés (os.register_at_fork dans moteur_azure.py) ;
+    # sonde, instantané, flux SSE... démarrent leurs threads à la première requête du worker
+    server.log.info(f"👷 Worker {worker.pid} prêt")
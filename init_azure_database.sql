@@ -21,7 +21,7 @@ BEGIN
         description NVARCHAR(1000),
         date_incident DATETIME2 NOT NULL DEFAULT GETDATE(),
         date_creation DATETIME2 NOT NULL DEFAULT GETDATE(),
-        date_modification DATETIME2 NOT NULL DEFAULT GETDATE()
+        date_modification DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME()
     )
     
     PRINT '✅ Table incidents créée avec succès !'
@@ -44,7 +44,7 @@ BEGIN
     BEGIN
         SET NOCOUNT ON
         UPDATE incidents 
-        SET date_modification = GETDATE()
+        SET date_modification = SYSUTCDATETIME()
         FROM incidents i
         INNER JOIN inserted ins ON i.id = ins.id
     END
@@ -110,6 +110,39 @@ BEGIN
     PRINT '✅ Index créé pour optimiser les requêtes !'
 END
 
+-- Index du flux de changements /api/incidents/changes (seek sur date_modification, id)
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_incidents_date_modification')
+BEGIN
+    PRINT '🔍 Création de l''index du flux de changements...'
+    CREATE NONCLUSTERED INDEX IX_incidents_date_modification
+    ON incidents (date_modification, id)
+    
+    PRINT '✅ Index du flux de changements créé !'
+END
+
+-- Index plein texte pour /api/incidents/search (titre + description, en français)
+IF FULLTEXTSERVICEPROPERTY('IsFullTextInstalled') = 1
+   AND NOT EXISTS (SELECT * FROM sys.fulltext_indexes WHERE object_id = OBJECT_ID('incidents'))
+BEGIN
+    PRINT '🔎 Création de l''index plein texte...'
+
+    IF NOT EXISTS (SELECT * FROM sys.fulltext_catalogs WHERE name = 'ftc_incidents')
+        CREATE FULLTEXT CATALOG ftc_incidents WITH ACCENT_SENSITIVITY = OFF
+
+    -- La clé primaire n'est pas nommée : retrouver son nom généré
+    DECLARE @cle_primaire SYSNAME
+    SELECT @cle_primaire = name FROM sys.indexes
+    WHERE object_id = OBJECT_ID('incidents') AND is_primary_key = 1
+
+    EXEC ('
+    CREATE FULLTEXT INDEX ON incidents (titre LANGUAGE 1036, description LANGUAGE 1036)
+    KEY INDEX ' + @cle_primaire + ' ON ftc_incidents
+    WITH CHANGE_TRACKING AUTO
+    ')
+
+    PRINT '✅ Index plein texte créé !'
+END
+
 -- Statistiques finales
 PRINT ''
 PRINT '🎉 ==============================================='
@@ -119,6 +152,7 @@ PRINT '📊 Base de données : ' + DB_NAME()
 PRINT '📋 Table incidents : OK'
 PRINT '🔄 Trigger mise à jour : OK'
 PRINT '🔍 Index performance : OK'
+PRINT '🔎 Index plein texte : ' + CASE WHEN EXISTS (SELECT * FROM sys.fulltext_indexes WHERE object_id = OBJECT_ID('incidents')) THEN 'OK' ELSE 'non disponible (recherche en mémoire)' END
 PRINT '📊 Données exemple : ' + CAST((SELECT COUNT(*) FROM incidents) AS VARCHAR(10)) + ' incidents'
 PRINT ''
 PRINT '🚀 Votre application Flask peut maintenant se connecter à Azure SQL Database !'
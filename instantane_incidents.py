@@ -0,0 +1,163 @@
+"""
+💾 Instantané local des incidents récents
+Flask Incidents Réseau - Version Azure
+
+Copie des incidents les plus récents dans un fichier SQLite local, mise à
+jour incrémentalement depuis Azure SQL par un thread du processus. Quand la
+base principale est injoignable ou trop lente, les routes de lecture
+servent cet instantané, marqué comme périmé, au lieu d'échouer.
+
+La table locale a le même nom et les mêmes colonnes que la table
+principale : les requêtes de pagination et de filtre s'y exécutent telles
+quelles. Le premier rafraîchissement ne lit que les ``taille_max`` incidents
+les plus récents ; les incidents n'étant jamais modifiés, les suivants ne
+lisent que les ids supérieurs au dernier id de la table à ce moment-là.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import Column, MetaData, String, Table, create_engine, delete, func, insert, inspect, select
+
+
+class InstantaneLocal:
+    """Instantané SQLite des ``taille_max`` incidents les plus récents
+
+    ``source(dernier_id, limite)`` renvoie, dans l'ordre des ids, les
+    incidents (dictionnaires de toutes les colonnes de ``table``) créés
+    après ``dernier_id`` ; ``amorce(limite)`` renvoie le dernier id de la
+    table et ses ``limite`` incidents les plus récents. L'instantané est utilisable tant que son dernier
+    rafraîchissement réussi date de moins de ``obsolescence_max`` secondes.
+    """
+
+    def __init__(self, source, amorce, chemin, table, taille_max=5000, intervalle=30.0,
+                 obsolescence_max=3600.0, taille_lot=1000):
+        self.source = source
+        self.amorce = amorce
+        self.chemin = chemin
+        self.taille_max = taille_max
+        self.intervalle = intervalle
+        self.obsolescence_max = obsolescence_max
+        self.taille_lot = taille_lot
+        self.metadata = MetaData()
+        self.table = table.to_metadata(self.metadata)
+        self.proprietes = Table('instantane_proprietes', self.metadata,
+                                Column('cle', String(50), primary_key=True),
+                                Column('valeur', String(50), nullable=False))
+        self._verrou = threading.Lock()
+        self._moteur = None
+        self._thread = None
+        self._pid = None
+        self._dernier_id = 0
+        self._rafraichi_le = None
+        self._derniere_erreur = None
+
+    def demarrer(self):
+        """Ouvrir le fichier local et démarrer le rafraîchissement dans ce processus"""
+        if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+            return
+        with self._verrou:
+            # Après un fork, ni le thread ni les connexions SQLite du parent ne sont utilisables
+            if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            dossier = os.path.dirname(self.chemin)
+            if dossier:
+                os.makedirs(dossier, exist_ok=True)
+            self._moteur = create_engine(f'sqlite:///{self.chemin}')
+            with self._moteur.connect() as connexion:
+                # WAL : les lectures des requêtes ne sont pas bloquées par le rafraîchissement
+                connexion.exec_driver_sql('PRAGMA journal_mode=WAL')
+            inspecteur = inspect(self._moteur)
+            colonnes = ({colonne['name'] for colonne in inspecteur.get_columns(self.table.name)}
+                        if inspecteur.has_table(self.table.name) else set())
+            if colonnes and colonnes != set(self.table.c.keys()):
+                # Colonnes ajoutées à la table principale depuis la création du fichier : tout recopier
+                self.metadata.drop_all(self._moteur)
+                self._dernier_id = 0
+                self._rafraichi_le = None
+            self.metadata.create_all(self._moteur)
+            # Un instantané déjà sur disque reste servable après un redémarrage pendant une panne
+            self._lire_proprietes()
+            self._thread = threading.Thread(target=self._boucle, name='instantane-incidents', daemon=True)
+            self._thread.start()
+
+    def _boucle(self):
+        while True:
+            try:
+                self.rafraichir()
+                self._derniere_erreur = None
+            except Exception as e:
+                if self._derniere_erreur is None:
+                    print(f"⚠️  Instantané local: rafraîchissement impossible ({e})")
+                self._derniere_erreur = f'{type(e).__name__}: {e}'[:300]
+            time.sleep(self.intervalle)
+
+    def _lire_proprietes(self):
+        with self._moteur.connect() as connexion:
+            proprietes = dict(connexion.execute(select(self.proprietes.c.cle, self.proprietes.c.valeur)).all())
+        if 'dernier_id' in proprietes:
+            self._dernier_id = max(self._dernier_id, int(proprietes['dernier_id']))
+        if 'rafraichi_le' in proprietes:
+            self._rafraichi_le = datetime.fromisoformat(proprietes['rafraichi_le'])
+
+    def rafraichir(self):
+        """Copier les incidents créés depuis le dernier rafraîchissement"""
+        # Le fichier est partagé par les workers : repartir de ce que les autres ont déjà copié
+        self._lire_proprietes()
+        dernier_id, recents = self._dernier_id, []
+        if not dernier_id:
+            # Fichier vide : les plus récents seulement, pas toute la table principale
+            dernier_id, recents = self.amorce(self.taille_max)
+        lignes = self.source(dernier_id, self.taille_lot)
+        with self._moteur.begin() as connexion:
+            if recents:
+                connexion.execute(insert(self.table).prefix_with('OR REPLACE'), recents)
+            while lignes:
+                connexion.execute(insert(self.table).prefix_with('OR REPLACE'), lignes)
+                dernier_id = lignes[-1]['id']
+                lignes = self.source(dernier_id, self.taille_lot) if len(lignes) == self.taille_lot else []
+
+            # Ne garder que les plus récents, dans l'ordre de la pagination
+            a_garder = (select(self.table.c.id)
+                        .order_by(self.table.c.date_incident.desc(), self.table.c.id.desc())
+                        .limit(self.taille_max))
+            connexion.execute(delete(self.table).where(self.table.c.id.not_in(a_garder)))
+
+            maintenant = datetime.now()
+            connexion.execute(insert(self.proprietes).prefix_with('OR REPLACE'), [
+                {'cle': 'dernier_id', 'valeur': str(max(dernier_id, self._dernier_id))},
+                {'cle': 'rafraichi_le', 'valeur': maintenant.isoformat()}
+            ])
+        self._dernier_id = max(dernier_id, self._dernier_id)
+        self._rafraichi_le = maintenant
+
+    def age(self):
+        """Secondes écoulées depuis le dernier rafraîchissement réussi (None si jamais)"""
+        if self._rafraichi_le is None:
+            return None
+        return (datetime.now() - self._rafraichi_le).total_seconds()
+
+    def utilisable(self):
+        """L'instantané est-il assez récent pour être servi ?"""
+        age = self.age()
+        return self._moteur is not None and age is not None and age <= self.obsolescence_max
+
+    def connexion(self):
+        """Connexion en lecture sur le fichier local (à utiliser avec ``with``)"""
+        return self._moteur.connect()
+
+    def etat(self):
+        """Marqueur joint aux réponses servies depuis l'instantané"""
+        age = self.age()
+        with self._moteur.connect() as connexion:
+            nombre = connexion.execute(select(func.count()).select_from(self.table)).scalar()
+        return {
+            'rafraichi_le': self._rafraichi_le.isoformat(timespec='seconds') if self._rafraichi_le else None,
+            'age_secondes': round(age, 1) if age is not None else None,
+            'obsolescence_max_secondes': self.obsolescence_max,
+            'incidents': nombre,
+            'derniere_erreur': self._derniere_erreur
+        }
@@ -0,0 +1,141 @@
+"""
+🔑 Jetons Azure AD des connexions Azure SQL
+Flask Incidents Réseau - Version Azure
+
+Authentification par identité managée ou principal de service : le driver
+ODBC reçoit un jeton d'accès (attribut SQL_COPT_SS_ACCESS_TOKEN) à chaque
+nouvelle connexion, au lieu d'un utilisateur et d'un mot de passe.
+
+Le jeton est mis en cache dans le processus et partagé par tous les
+moteurs (primaire, réplica). Un thread le renouvelle ``marge`` secondes
+avant son expiration : les connexions du pool lisent le jeton en mémoire
+et n'attendent le fournisseur d'identité que s'il n'y a encore aucun jeton
+valide (tout premier checkout du processus, panne prolongée d'Azure AD).
+"""
+
+import os
+import struct
+import threading
+import time
+from datetime import datetime
+
+# Attribut pré-connexion du driver ODBC SQL Server (msodbcsql.h)
+SQL_COPT_SS_ACCESS_TOKEN = 1256
+
+# Portée des jetons acceptés par Azure SQL Database
+PORTEE_AZURE_SQL = 'https://database.windows.net/.default'
+
+# Un jeton expirant dans moins de VALIDITE_MINIMALE secondes n'est plus présenté au serveur
+VALIDITE_MINIMALE = 30.0
+
+
+def structure_jeton(jeton):
+    """Jeton au format attendu par le driver ODBC : longueur (4 octets little-endian) puis UTF-16-LE"""
+    brut = jeton.encode('utf-16-le')
+    return struct.pack('<I', len(brut)) + brut
+
+
+class CacheJetons:
+    """Jeton d'accès du processus, renouvelé en arrière-plan avant expiration
+
+    ``credential`` est un objet azure-identity (ManagedIdentityCredential,
+    ClientSecretCredential...) ou tout objet dont ``get_token(portee)``
+    renvoie un objet ``token`` / ``expires_on`` (secondes depuis l'epoch).
+    Après un échec, le renouvellement est retenté toutes les
+    ``delai_erreur`` secondes tant que le jeton courant reste valide.
+    """
+
+    def __init__(self, credential, portee=PORTEE_AZURE_SQL, marge=300.0, delai_erreur=10.0):
+        self.credential = credential
+        self.portee = portee
+        self.marge = marge
+        self.delai_erreur = delai_erreur
+        self._verrou = threading.Lock()
+        # Un seul appel au fournisseur à la fois, les autres threads réutilisent son résultat
+        self._verrou_obtention = threading.Lock()
+        self._jeton = None  # (texte, expiration en secondes depuis l'epoch)
+        self._thread = None
+        self._pid = None
+        self._renouvele_le = None
+        self._derniere_erreur = None
+        self._compteurs = {'obtentions': 0, 'echecs': 0, 'connexions_en_attente': 0}
+
+    def demarrer(self):
+        """Démarrer le renouvellement dans ce processus (premier jeton demandé aussitôt)"""
+        if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+            return
+        with self._verrou:
+            # Après un fork, le thread du parent n'existe pas dans l'enfant (le jeton hérité reste valable)
+            if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._boucle, name='jetons-azure', daemon=True)
+            self._thread.start()
+
+    def _valide(self, marge):
+        jeton = self._jeton
+        return jeton is not None and time.time() < jeton[1] - marge
+
+    def _renouveler(self, marge):
+        """Obtenir un jeton si le jeton courant expire dans moins de ``marge`` secondes"""
+        with self._verrou_obtention:
+            if self._valide(marge):
+                return  # renouvelé par un autre thread pendant l'attente du verrou
+            try:
+                acces = self.credential.get_token(self.portee)
+            except Exception as e:
+                with self._verrou:
+                    self._compteurs['echecs'] += 1
+                    self._derniere_erreur = f'{type(e).__name__}: {e}'[:300]
+                raise
+            with self._verrou:
+                self._jeton = (acces.token, float(acces.expires_on))
+                self._renouvele_le = time.time()
+                self._compteurs['obtentions'] += 1
+                self._derniere_erreur = None
+
+    def _boucle(self):
+        while True:
+            jeton = self._jeton
+            attente = jeton[1] - self.marge - time.time() if jeton else 0
+            if attente > 0:
+                time.sleep(attente)
+                continue
+            try:
+                self._renouveler(self.marge)
+            except Exception as e:
+                print(f"⚠️  Jeton Azure AD: renouvellement impossible ({e})")
+                time.sleep(self.delai_erreur)
+                continue
+            if not self._valide(self.marge):
+                # Jeton resservi par le cache du fournisseur, déjà dans la marge : redemander plus tard
+                time.sleep(self.delai_erreur)
+
+    def jeton(self):
+        """Jeton courant ; le fournisseur n'est appelé ici que s'il n'y en a pas de valide"""
+        self.demarrer()
+        if not self._valide(VALIDITE_MINIMALE):
+            with self._verrou:
+                self._compteurs['connexions_en_attente'] += 1
+            self._renouveler(VALIDITE_MINIMALE)
+        return self._jeton[0]
+
+    def attributs_connexion(self):
+        """``attrs_before`` pyodbc d'une nouvelle connexion"""
+        return {SQL_COPT_SS_ACCESS_TOKEN: structure_jeton(self.jeton())}
+
+    def etat(self):
+        """État du jeton (affiché par /azure-status), sans le jeton lui-même"""
+        with self._verrou:
+            jeton = self._jeton
+            return {
+                'portee': self.portee,
+                'expire_le': (datetime.fromtimestamp(jeton[1]).isoformat(timespec='seconds')
+                              if jeton else None),
+                'expire_dans_secondes': round(jeton[1] - time.time(), 1) if jeton else None,
+                'renouvele_le': (datetime.fromtimestamp(self._renouvele_le).isoformat(timespec='seconds')
+                                 if self._renouvele_le else None),
+                'marge_secondes': self.marge,
+                'derniere_erreur': self._derniere_erreur,
+                **self._compteurs
+            }
@@ -0,0 +1,59 @@
+"""
+⚡ Encodage JSON rapide (orjson, optionnel)
+Flask Incidents Réseau - Version Azure
+
+Fournisseur JSON Flask qui encode avec orjson lorsqu'il est installé. La
+sortie reste celle du fournisseur par défaut (clés triées, dates au format
+HTTP), sans l'échappement ASCII des caractères accentués.
+"""
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FournisseurJSONRapide(DefaultJSONProvider):
+    """Fournisseur JSON Flask encodant avec orjson
+
+    Les types qu'orjson ne traite pas à l'identique de Flask (dates,
+    ``Decimal``, ``UUID``, dataclasses) passent par ``default``, comme avec
+    le fournisseur par défaut. Le décodage reste celui de la bibliothèque
+    standard.
+    """
+
+    def _options(self, indent=None):
+        options = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        indent = kwargs.pop('indent', None)
+        kwargs.pop('separators', None)
+        if kwargs:
+            # Options propres au module json (cls, ensure_ascii...) : encodeur standard
+            return super().dumps(obj, indent=indent, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options(indent)).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        corps = orjson.dumps(obj, default=self.default,
+                             option=self._options(indent) | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(corps, mimetype=self.mimetype)
+
+
+def installer_json(app, backend='auto'):
+    """Choisir l'encodeur JSON de l'application ('auto', 'orjson' ou 'standard')"""
+    if backend == 'standard':
+        return
+    if backend not in ('auto', 'orjson'):
+        raise ValueError(f"Backend JSON inconnu: {backend}")
+    if orjson is None:
+        if backend == 'orjson':
+            raise ValueError("Backend JSON 'orjson' demandé mais orjson n'est pas installé")
+        return
+    app.json = FournisseurJSONRapide(app)
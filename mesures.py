@@ -0,0 +1,31 @@
+"""
+📏 Outils de mesure
+Flask Incidents Réseau - Version Azure
+
+Percentiles et résumés de latences partagés par la télémétrie de l'application.
+"""
+
+
+def percentile(valeurs_triees, p):
+    """Percentile p (0-100) d'une liste déjà triée"""
+    if not valeurs_triees:
+        return None
+    index = min(len(valeurs_triees) - 1, int(round(p / 100 * (len(valeurs_triees) - 1))))
+    return valeurs_triees[index]
+
+
+def resume_latences(durees):
+    """Résumer des durées en secondes (moyenne, p50, p95, p99, max) en millisecondes"""
+    valeurs = sorted(durees)
+
+    def en_ms(valeur):
+        return round(valeur * 1000, 3) if valeur is not None else None
+
+    return {
+        'echantillons': len(valeurs),
+        'moyenne': en_ms(sum(valeurs) / len(valeurs)) if valeurs else None,
+        'p50': en_ms(percentile(valeurs, 50)),
+        'p95': en_ms(percentile(valeurs, 95)),
+        'p99': en_ms(percentile(valeurs, 99)),
+        'max': en_ms(valeurs[-1]) if valeurs else None
+    }
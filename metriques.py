@@ -0,0 +1,234 @@
+"""
+📈 Métriques par route au format Prometheus
+Flask Incidents Réseau - Version Azure
+
+Des hooks Flask (début et fin de requête) et des événements SQLAlchemy
+(exécution des instructions SQL) accumulent, pour chaque requête HTTP, sa
+durée, son nombre d'instructions SQL, le temps passé en SQL et l'attente
+de connexion au pool. Les valeurs sont agrégées par route dans des
+histogrammes exposés sur /metrics.
+
+Surcoût : deux appels à perf_counter() par instruction SQL et quelques
+incréments sous verrou par requête.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from flask import request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from pool_azure import PoolInstrumente
+
+# Bornes des histogrammes (secondes) et des nombres d'instructions SQL
+BORNES_DUREE = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BORNES_NOMBRE = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def echapper(valeur):
+    """Échapper une valeur de label Prometheus"""
+    return str(valeur).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def formater_labels(noms, valeurs):
+    if not noms:
+        return ''
+    return '{' + ','.join(f'{nom}="{echapper(valeur)}"' for nom, valeur in zip(noms, valeurs)) + '}'
+
+
+def formater_nombre(valeur):
+    if valeur == float('inf'):
+        return '+Inf'
+    return repr(float(valeur)) if isinstance(valeur, float) else str(valeur)
+
+
+class Histogramme:
+    """Histogramme Prometheus à bornes fixes, une série par combinaison de labels"""
+
+    def __init__(self, nom, aide, labels, bornes):
+        self.nom = nom
+        self.aide = aide
+        self.labels = labels
+        self.bornes = bornes
+        self._series = {}
+        self._verrou = threading.Lock()
+
+    def observer(self, valeurs_labels, valeur):
+        position = bisect_left(self.bornes, valeur)
+        with self._verrou:
+            serie = self._series.get(valeurs_labels)
+            if serie is None:
+                serie = self._series[valeurs_labels] = [[0] * (len(self.bornes) + 1), 0.0, 0]
+            serie[0][position] += 1
+            serie[1] += valeur
+            serie[2] += 1
+
+    def lignes(self):
+        with self._verrou:
+            series = {labels: (list(comptes), somme, total)
+                      for labels, (comptes, somme, total) in self._series.items()}
+
+        yield f'# HELP {self.nom} {self.aide}'
+        yield f'# TYPE {self.nom} histogram'
+        for valeurs_labels, (comptes, somme, total) in sorted(series.items()):
+            cumul = 0
+            for borne, compte in zip(self.bornes + (float('inf'),), comptes):
+                cumul += compte
+                labels = formater_labels(self.labels + ('le',), valeurs_labels + (formater_nombre(borne),))
+                yield f'{self.nom}_bucket{labels} {cumul}'
+            labels = formater_labels(self.labels, valeurs_labels)
+            yield f'{self.nom}_sum{labels} {formater_nombre(somme)}'
+            yield f'{self.nom}_count{labels} {total}'
+
+
+class Compteur:
+    """Compteur Prometheus, une série par combinaison de labels"""
+
+    def __init__(self, nom, aide, labels):
+        self.nom = nom
+        self.aide = aide
+        self.labels = labels
+        self._series = {}
+        self._verrou = threading.Lock()
+
+    def incrementer(self, valeurs_labels, valeur=1):
+        with self._verrou:
+            self._series[valeurs_labels] = self._series.get(valeurs_labels, 0) + valeur
+
+    def lignes(self):
+        with self._verrou:
+            series = dict(self._series)
+        yield f'# HELP {self.nom} {self.aide}'
+        yield f'# TYPE {self.nom} counter'
+        for valeurs_labels, valeur in sorted(series.items()):
+            yield f'{self.nom}{formater_labels(self.labels, valeurs_labels)} {valeur}'
+
+
+def valeurs_instantanees(nom, aide, type_metrique, valeurs):
+    """Lignes d'une métrique lue à l'exposition (``gauge`` ou ``counter``)
+
+    ``valeurs`` associe ``(noms_labels, valeurs_labels)`` à une valeur.
+    """
+    yield f'# HELP {nom} {aide}'
+    yield f'# TYPE {nom} {type_metrique}'
+    for (noms, valeurs_labels), valeur in valeurs.items():
+        yield f'{nom}{formater_labels(noms, valeurs_labels)} {formater_nombre(valeur)}'
+
+
+# ========================================
+# COLLECTE PAR REQUÊTE
+# ========================================
+
+# Accumulateur de la requête HTTP en cours. Une variable de contexte plutôt
+# que flask.g : les requêtes SQL faites sous un app_context() imbriqué
+# (index de recherche, diffuseur) restent attribuées à la requête, et les
+# threads d'arrière-plan n'en ont pas.
+_requete_courante = ContextVar('metriques_requete_courante', default=None)
+
+
+def _avant_instruction(connexion, curseur, instruction, parametres, contexte, executemany):
+    if contexte is not None:
+        contexte._debut_metriques = time.perf_counter()
+
+
+def _apres_instruction(connexion, curseur, instruction, parametres, contexte, executemany):
+    debut = getattr(contexte, '_debut_metriques', None)
+    accumulateur = _requete_courante.get()
+    if debut is None or accumulateur is None:
+        return
+    accumulateur['sql_instructions'] += 1
+    accumulateur['sql_duree'] += time.perf_counter() - debut
+
+
+def _apres_checkout(attente):
+    accumulateur = _requete_courante.get()
+    if accumulateur is not None:
+        accumulateur['checkout_attente'] += attente
+
+
+_verrou_installation = threading.Lock()
+_installe = False
+
+
+def installer_ecoute_sql():
+    """Écouter les instructions SQL de tous les moteurs (y compris ceux créés plus tard)"""
+    global _installe
+    with _verrou_installation:
+        if _installe:
+            return
+        event.listen(Engine, 'before_cursor_execute', _avant_instruction)
+        event.listen(Engine, 'after_cursor_execute', _apres_instruction)
+        PoolInstrumente.observateurs.append(_apres_checkout)
+        _installe = True
+
+
+class MetriquesRequetes:
+    """Métriques HTTP et SQL par route d'une application Flask
+
+    La durée mesurée va jusqu'à la fin de la vue : pour les réponses en flux
+    (export, SSE), c'est le temps jusqu'au premier octet.
+    """
+
+    def __init__(self, app=None):
+        self.duree = Histogramme('incidents_http_requete_duree_secondes',
+                                 'Durée des requêtes HTTP par route',
+                                 ('route',), BORNES_DUREE)
+        self.requetes = Compteur('incidents_http_requetes_total',
+                                 'Requêtes HTTP par route, méthode et code de statut',
+                                 ('route', 'methode', 'statut'))
+        self.sql_instructions = Histogramme('incidents_sql_instructions_par_requete',
+                                            'Nombre d\'instructions SQL par requête HTTP',
+                                            ('route',), BORNES_NOMBRE)
+        self.sql_duree = Histogramme('incidents_sql_duree_secondes',
+                                     'Temps passé en SQL par requête HTTP',
+                                     ('route',), BORNES_DUREE)
+        self.checkout_attente = Histogramme('incidents_pool_attente_checkout_secondes',
+                                            'Attente de connexion au pool par requête HTTP',
+                                            ('route',), BORNES_DUREE)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        installer_ecoute_sql()
+        app.before_request(self._debut_requete)
+        app.after_request(self._fin_requete)
+        app.teardown_request(self._enregistrer)
+        app.extensions['metriques'] = self
+
+    def _debut_requete(self):
+        _requete_courante.set({'debut': time.perf_counter(), 'sql_instructions': 0, 'sql_duree': 0.0,
+                               'checkout_attente': 0.0, 'statut': 500})
+
+    def _fin_requete(self, reponse):
+        accumulateur = _requete_courante.get()
+        if accumulateur is not None:
+            accumulateur['statut'] = reponse.status_code
+        return reponse
+
+    def _enregistrer(self, exception=None):
+        accumulateur = _requete_courante.get()
+        if accumulateur is None:
+            return
+        _requete_courante.set(None)
+        duree = time.perf_counter() - accumulateur['debut']
+        # Nom de la vue sans le préfixe du blueprint (incidents.index -> index)
+        route = (request.endpoint or 'inconnue').rpartition('.')[2]
+        labels = (route,)
+        self.duree.observer(labels, duree)
+        self.requetes.incrementer((route, request.method, str(accumulateur['statut'])))
+        self.sql_instructions.observer(labels, accumulateur['sql_instructions'])
+        self.sql_duree.observer(labels, accumulateur['sql_duree'])
+        self.checkout_attente.observer(labels, accumulateur['checkout_attente'])
+
+    def exposer(self, supplementaires=()):
+        """Texte d'exposition Prometheus (format 0.0.4)"""
+        lignes = []
+        for metrique in (self.duree, self.requetes, self.sql_instructions,
+                         self.sql_duree, self.checkout_attente):
+            lignes.extend(metrique.lignes())
+        for bloc in supplementaires:
+            lignes.extend(bloc)
+        return '\n'.join(lignes) + '\n'
@@ -0,0 +1,125 @@
+"""
+⚙️ Moteurs SQLAlchemy différés
+Flask Incidents Réseau - Version Azure
+
+Extension Flask-SQLAlchemy dont les moteurs sont créés au premier accès :
+importer l'application ou appeler create_app() ne construit ni chaîne de
+connexion, ni moteur, et ne charge pas le driver ODBC.
+
+Les moteurs sont aussi sûrs vis-à-vis de fork() : dans un processus enfant
+(workers gunicorn avec preload_app, uWSGI...), les pools hérités du parent
+sont abandonnés et chaque worker ouvre ses propres connexions ODBC.
+"""
+
+import os
+import threading
+
+from flask import current_app
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+
+
+def resoudre(valeur, *args):
+    """Appeler la valeur si c'est une fonction, la renvoyer telle quelle sinon"""
+    return valeur(*args) if callable(valeur) else valeur
+
+
+class SQLAlchemyDiffere(SQLAlchemy):
+    """Flask-SQLAlchemy avec création paresseuse des moteurs
+
+    ``SQLALCHEMY_DATABASE_URI`` et les entrées de ``SQLALCHEMY_BINDS`` peuvent
+    être des fonctions sans argument ; ``SQLALCHEMY_ENGINE_OPTIONS`` peut être
+    une fonction recevant l'URL résolue. Elles ne sont appelées qu'au premier
+    accès à ``db.engines`` (première requête SQL).
+
+    L'option ``attributs_connexion``, propre à cette extension, est une
+    fonction appelée à chaque nouvelle connexion DBAPI : le dictionnaire
+    renvoyé est passé au driver en ``attrs_before`` (jeton Azure AD).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._verrou_moteurs = threading.Lock()
+        if hasattr(os, 'register_at_fork'):
+            # Absent sous Windows : pas de fork, serveur de développement mono-processus
+            os.register_at_fork(after_in_child=self.apres_fork)
+
+    def apres_fork(self):
+        """Abandonner, dans le processus enfant, les connexions héritées du parent
+
+        ``dispose(close=False)`` remplace chaque pool par un pool vide sans
+        fermer les connexions du parent (elles lui appartiennent toujours) :
+        le worker ouvre les siennes à sa première requête.
+        """
+        # Un verrou pris par un thread du parent au moment du fork ne serait jamais relâché
+        self._verrou_moteurs = threading.Lock()
+        for moteurs in list(self._app_engines.values()):
+            for moteur in moteurs.values():
+                moteur.dispose(close=False)
+
+    def init_app(self, app):
+        """Enregistrer l'extension sur l'application, sans créer de moteur"""
+        if 'sqlalchemy' in app.extensions:
+            raise RuntimeError("Une instance SQLAlchemy est déjà enregistrée sur cette application")
+
+        app.extensions['sqlalchemy'] = self
+        app.teardown_appcontext(self._teardown_session)
+
+        app.config.setdefault('SQLALCHEMY_DATABASE_URI', None)
+        app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {})
+        app.config.setdefault('SQLALCHEMY_ECHO', False)
+        app.config.setdefault('SQLALCHEMY_BINDS', {})
+        app.config.setdefault('SQLALCHEMY_TRACK_MODIFICATIONS', False)
+
+        self._make_metadata(None)
+        for cle in app.config['SQLALCHEMY_BINDS']:
+            self._make_metadata(cle)
+
+    @property
+    def engines(self):
+        app = current_app._get_current_object()
+        moteurs = self._app_engines.get(app)
+        if moteurs is None:
+            with self._verrou_moteurs:
+                moteurs = self._app_engines.get(app)
+                if moteurs is None:
+                    moteurs = self._creer_moteurs(app)
+                    self._app_engines[app] = moteurs
+        return moteurs
+
+    def _creer_moteurs(self, app):
+        """Construire les moteurs de toutes les binds de l'application"""
+        config = app.config
+        definitions = dict(config['SQLALCHEMY_BINDS'])
+        if config['SQLALCHEMY_DATABASE_URI'] is not None:
+            definitions[None] = config['SQLALCHEMY_DATABASE_URI']
+        if None not in definitions:
+            raise RuntimeError("SQLALCHEMY_DATABASE_URI doit être défini")
+
+        moteurs = {}
+        for cle, definition in definitions.items():
+            definition = resoudre(definition)
+            options = self._engine_options.copy()
+            if isinstance(definition, dict):
+                options.update(definition)
+            else:
+                options.update(resoudre(config['SQLALCHEMY_ENGINE_OPTIONS'], definition))
+                options['url'] = definition
+
+            options.setdefault('echo', config['SQLALCHEMY_ECHO'])
+            options.setdefault('echo_pool', config['SQLALCHEMY_ECHO'])
+            self._apply_driver_defaults(options, app)
+            moteurs[cle] = self._make_engine(cle, options, app)
+        return moteurs
+
+    def _make_engine(self, cle, options, app):
+        """Créer un moteur, avec le hook de connexion ``attributs_connexion`` s'il est demandé"""
+        # create_engine() refuserait cette option : elle est retirée avant
+        attributs_connexion = options.pop('attributs_connexion', None)
+        moteur = super()._make_engine(cle, options, app)
+        if attributs_connexion is not None:
+            @event.listens_for(moteur, 'do_connect')
+            def ajouter_attributs(dialecte, enregistrement, arguments, parametres):
+                parametres['attrs_before'] = {**parametres.get('attrs_before', {}), **attributs_connexion()}
+        return moteur
+
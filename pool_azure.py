@@ -0,0 +1,79 @@
+"""
+🏊 Pool de connexions instrumenté
+Flask Incidents Réseau - Version Azure
+
+QueuePool SQLAlchemy qui mesure le temps d'attente de chaque checkout,
+pour dimensionner le pool à partir de /pool-stats, et peut faire passer
+chaque checkout par un disjoncteur (disjoncteur_azure.py).
+"""
+
+import threading
+import time
+from collections import deque
+
+from sqlalchemy.pool import QueuePool
+
+from mesures import resume_latences
+
+
+class PoolInstrumente(QueuePool):
+    """QueuePool qui enregistre la durée d'attente de chaque checkout"""
+
+    # Fonctions appelées avec chaque durée d'attente (métriques par requête HTTP)
+    observateurs = []
+
+    # Disjoncteur des checkouts, fixé par PoolInstrumente.avec()
+    disjoncteur = None
+
+    @classmethod
+    def avec(cls, disjoncteur):
+        """Classe de pool dont les checkouts passent par ``disjoncteur``
+
+        create_engine() ne transmet pas d'argument supplémentaire au pool :
+        le disjoncteur est porté par une sous-classe, que recreate() conserve.
+        """
+        return type(cls.__name__, (cls,), {'disjoncteur': disjoncteur})
+
+    def __init__(self, *args, fenetre_mesures=1000, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._attentes = deque(maxlen=fenetre_mesures)
+        self._verrou_mesures = threading.Lock()
+        self._checkouts = 0
+        self._echecs = 0
+
+    def connect(self):
+        debut = time.perf_counter()
+        try:
+            if self.disjoncteur is None:
+                connexion = super().connect()
+            else:
+                connexion = self.disjoncteur.appeler(super().connect)
+        except Exception:
+            with self._verrou_mesures:
+                self._echecs += 1
+            raise
+        attente = time.perf_counter() - debut
+        with self._verrou_mesures:
+            self._checkouts += 1
+            self._attentes.append(attente)
+        for observateur in self.observateurs:
+            observateur(attente)
+        return connexion
+
+    def stats(self):
+        """Photographie de l'état du pool et des temps d'attente"""
+        with self._verrou_mesures:
+            attentes = list(self._attentes)
+            checkouts, echecs = self._checkouts, self._echecs
+
+        return {
+            'taille': self.size(),
+            'connexions_utilisees': self.checkedout(),
+            'connexions_inactives': self.checkedin(),
+            'connexions_overflow': max(self.overflow(), 0),
+            'max_overflow': self._max_overflow,
+            'timeout_secondes': self._timeout,
+            'checkouts': checkouts,
+            'checkouts_echoues': echecs,
+            'attente_checkout_ms': resume_latences(attentes)
+        }
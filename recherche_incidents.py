@@ -0,0 +1,170 @@
+"""
+🔎 Recherche plein texte des incidents
+Flask Incidents Réseau - Version Azure
+
+Index inversé en mémoire (titre + description) pour les déploiements locaux
+et SQLite, et construction des requêtes CONTAINSTABLE pour l'index plein
+texte SQL Server lorsqu'il existe. Les deux moteurs ont la même sémantique :
+chaque terme de la requête est un préfixe (``pan`` trouve « panne »), tous
+les termes doivent être présents.
+"""
+
+import bisect
+import math
+import re
+import threading
+import unicodedata
+
+# Mots vides ignorés à l'indexation et à la recherche
+MOTS_VIDES = frozenset("""
+    au aux avec ce ces dans de des du elle en et eux il je la le les leur lui ma mais me
+    meme mes moi mon ne nos notre nous on ou par pas pour qu que qui sa se ses son sur ta
+    te tes toi ton tu un une vos votre vous est sont ete etre
+""".split())
+
+MOTIF_MOT = re.compile(r'\w+')
+
+
+def normaliser(texte):
+    """Minuscules sans accents"""
+    decompose = unicodedata.normalize('NFKD', texte.lower())
+    return ''.join(c for c in decompose if not unicodedata.combining(c))
+
+
+def tokeniser(texte):
+    """Découper un texte en termes indexables"""
+    if not texte:
+        return []
+    return [mot for mot in MOTIF_MOT.findall(normaliser(texte))
+            if len(mot) > 1 and mot not in MOTS_VIDES]
+
+
+def condition_fulltext(requete):
+    """Condition CONTAINSTABLE : tous les termes, en préfixe (``"panne*" AND "dns*"``)
+
+    Chaîne vide si la requête ne contient que des mots vides : CONTAINSTABLE
+    la refuse, l'appelant ne doit pas interroger la base.
+    """
+    termes = tokeniser(requete)
+    return ' AND '.join(f'"{terme}*"' for terme in termes)
+
+
+class IndexInverse:
+    """Index inversé en mémoire, classement BM25
+
+    ``source(dernier_id)`` renvoie, par ordre d'id croissant, un lot de
+    tuples ``(id, titre, description)`` créés après ``dernier_id``.
+    Chaque terme pointe vers ``{id_incident: occurrences}`` ; une recherche
+    intersecte les listes en partant de la plus courte, si bien que le coût
+    dépend du nombre de documents contenant les termes, pas de la taille de
+    la table. Un terme de la requête est un préfixe : les termes indexés
+    qui le prolongent sont trouvés par bisection dans le vocabulaire trié.
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, source):
+        self.source = source
+        self._postings = {}
+        self._vocabulaire = []  # termes indexés, triés
+        self._nouveaux_termes = []  # pas encore fusionnés dans le vocabulaire
+        self._longueurs = {}
+        self._longueur_totale = 0
+        self._dernier_id = None
+        self._verrou = threading.RLock()
+        self._verrou_synchronisation = threading.Lock()
+
+    def __len__(self):
+        return len(self._longueurs)
+
+    def indexer(self, identifiant, *textes):
+        """Ajouter un document (ignoré s'il est déjà indexé, ou avant le premier chargement)"""
+        termes = [terme for texte in textes for terme in tokeniser(texte)]
+        with self._verrou:
+            if self._dernier_id is None or identifiant in self._longueurs:
+                return
+            for terme in termes:
+                documents = self._postings.get(terme)
+                if documents is None:
+                    documents = self._postings[terme] = {}
+                    self._nouveaux_termes.append(terme)
+                documents[identifiant] = documents.get(identifiant, 0) + 1
+            self._longueurs[identifiant] = len(termes)
+            self._longueur_totale += len(termes)
+
+    def synchroniser(self):
+        """Indexer les incidents créés depuis la dernière synchronisation
+
+        Le premier appel charge toute la table ; les suivants ne lisent que
+        les ids supérieurs au dernier synchronisé (insertions en masse,
+        écritures des autres workers). Les documents déjà indexés par
+        ``indexer`` sont ignorés.
+        """
+        with self._verrou_synchronisation:
+            with self._verrou:
+                if self._dernier_id is None:
+                    self._dernier_id = 0
+                dernier_id = self._dernier_id
+            documents = self.source(dernier_id)
+            while documents:
+                for identifiant, *textes in documents:
+                    self.indexer(identifiant, *textes)
+                dernier_id = documents[-1][0]
+                documents = self.source(dernier_id)
+            with self._verrou:
+                self._dernier_id = dernier_id
+
+    def _documents_prefixe(self, prefixe):
+        """``{id_incident: occurrences}`` de tous les termes commençant par ``prefixe``"""
+        if self._nouveaux_termes:
+            # Liste presque triée : le tri fusionne les nouveaux termes en temps linéaire
+            self._vocabulaire.extend(self._nouveaux_termes)
+            self._vocabulaire.sort()
+            self._nouveaux_termes = []
+        debut = bisect.bisect_left(self._vocabulaire, prefixe)
+        fin = bisect.bisect_left(self._vocabulaire, prefixe + '\U0010ffff', debut)
+        if fin - debut == 1:
+            return self._postings[self._vocabulaire[debut]]
+        documents = {}
+        for terme in self._vocabulaire[debut:fin]:
+            for identifiant, occurrences in self._postings[terme].items():
+                documents[identifiant] = documents.get(identifiant, 0) + occurrences
+        return documents
+
+    def rechercher(self, requete):
+        """Ids des documents contenant tous les termes (en préfixe), triés par score décroissant
+
+        Renvoie une liste de couples ``(id, score)``.
+        """
+        termes = list(dict.fromkeys(tokeniser(requete)))
+        if not termes:
+            return []
+
+        with self._verrou:
+            listes = []
+            for terme in termes:
+                documents = self._documents_prefixe(terme)
+                if not documents:
+                    return []
+                listes.append((terme, documents))
+            listes.sort(key=lambda element: len(element[1]))
+
+            candidats = set(listes[0][1])
+            for _, documents in listes[1:]:
+                candidats.intersection_update(documents)
+                if not candidats:
+                    return []
+
+            nombre_documents = len(self._longueurs)
+            longueur_moyenne = self._longueur_totale / nombre_documents
+            scores = {}
+            for _, documents in listes:
+                idf = math.log(1 + (nombre_documents - len(documents) + 0.5) / (len(documents) + 0.5))
+                for identifiant in candidats:
+                    frequence = documents[identifiant]
+                    norme = 1 - self.B + self.B * self._longueurs[identifiant] / longueur_moyenne
+                    scores[identifiant] = scores.get(identifiant, 0.0) + \
+                        idf * frequence * (self.K1 + 1) / (frequence + self.K1 * norme)
+
+        return sorted(scores.items(), key=lambda element: (-element[1], -element[0]))
@@ -0,0 +1,131 @@
+"""
+🗂️ Ressources statiques à empreinte de contenu
+Flask Incidents Réseau - Version Azure
+
+Les fichiers de static/ sont servis sous /assets/ avec un nom contenant
+l'empreinte de leur contenu (css/incidents.css -> css/incidents.3f2a9c1b0d.css) :
+ils peuvent être mis en cache indéfiniment par les navigateurs et un CDN
+(Cache-Control: immutable), une nouvelle version changeant d'URL. Les
+variantes gzip et brotli sont compressées une fois, au chargement.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+
+from flask import Response, abort, current_app, request, url_for
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Types compressés (les images et polices le sont déjà)
+EXTENSIONS_COMPRESSIBLES = ('.css', '.js', '.svg', '.json', '.txt', '.html', '.map')
+
+CACHE_IMMUABLE = 'public, max-age=31536000, immutable'
+
+
+class Ressource:
+    """Contenu d'un fichier statique et ses variantes précompressées"""
+
+    def __init__(self, chemin, contenu):
+        self.empreinte = hashlib.sha256(contenu).hexdigest()[:10]
+        racine, extension = os.path.splitext(chemin)
+        self.nom = f'{racine}.{self.empreinte}{extension}'
+        self.mimetype = mimetypes.guess_type(chemin)[0] or 'application/octet-stream'
+        self.variantes = {'identity': contenu}
+
+        if extension in EXTENSIONS_COMPRESSIBLES:
+            compresses = {'gzip': gzip.compress(contenu, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                compresses['br'] = brotli.compress(contenu, quality=11)
+            for encodage, variante in compresses.items():
+                if len(variante) < len(contenu):
+                    self.variantes[encodage] = variante
+
+
+class RessourcesStatiques:
+    """Manifeste des ressources de static/ et route /assets/<nom à empreinte>
+
+    Le manifeste est calculé au premier accès. En mode debug, il est recalculé
+    dès qu'un fichier change, pour que les modifications soient visibles sans
+    redémarrer ; le mode est lu à chaque accès, la configuration et
+    FLASK_DEBUG pouvant encore le changer après ``init_app``.
+    """
+
+    def __init__(self, app=None):
+        self._verrou = threading.Lock()
+        self._par_source = {}
+        self._par_nom = {}
+        self._signature = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.dossier = app.static_folder
+        app.add_url_rule('/assets/<path:nom>', 'ressource', self.servir)
+        app.add_template_global(self.url, 'ressource')
+        app.extensions['ressources_statiques'] = self
+
+    def _fichiers(self):
+        for dossier, _, fichiers in os.walk(self.dossier):
+            for fichier in fichiers:
+                chemin = os.path.join(dossier, fichier)
+                yield os.path.relpath(chemin, self.dossier).replace(os.sep, '/'), chemin
+
+    def _signature_fichiers(self):
+        return tuple(sorted((relatif, os.stat(chemin).st_mtime_ns) for relatif, chemin in self._fichiers()))
+
+    def _charger(self):
+        """Lire static/ et construire le manifeste (source -> ressource)"""
+        signature = self._signature_fichiers()
+        par_source = {}
+        for relatif, chemin in self._fichiers():
+            with open(chemin, 'rb') as fichier:
+                par_source[relatif] = Ressource(relatif, fichier.read())
+        self._par_source = par_source
+        self._par_nom = {ressource.nom: ressource for ressource in par_source.values()}
+        self._signature = signature
+
+    def _perime(self):
+        return self._signature is None or (current_app.debug and self._signature != self._signature_fichiers())
+
+    def _manifeste(self):
+        if self._perime():
+            with self._verrou:
+                if self._perime():
+                    self._charger()
+        return self._par_source, self._par_nom
+
+    def url(self, source):
+        """URL à empreinte d'un fichier de static/ (fonction ``ressource()`` des templates)"""
+        par_source, _ = self._manifeste()
+        ressource = par_source.get(source)
+        if ressource is None:
+            raise KeyError(f'Ressource statique inconnue: {source}')
+        return url_for('ressource', nom=ressource.nom)
+
+    def servir(self, nom):
+        """Servir une ressource, dans la meilleure variante acceptée par le client"""
+        _, par_nom = self._manifeste()
+        ressource = par_nom.get(nom)
+        if ressource is None:
+            # Empreinte inconnue (ancienne version) : ne jamais servir un autre contenu sous ce nom
+            abort(404)
+
+        encodage = 'identity'
+        for candidat in ('br', 'gzip'):
+            if candidat in ressource.variantes and request.accept_encodings[candidat]:
+                encodage = candidat
+                break
+
+        reponse = Response(ressource.variantes[encodage], mimetype=ressource.mimetype)
+        if encodage != 'identity':
+            reponse.headers['Content-Encoding'] = encodage
+        reponse.headers['Cache-Control'] = CACHE_IMMUABLE
+        reponse.headers['Vary'] = 'Accept-Encoding'
+        reponse.set_etag(f'{ressource.empreinte}-{encodage}')
+        return reponse.make_conditional(request)
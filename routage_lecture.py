@@ -0,0 +1,225 @@
+"""
+🔀 Routage des lectures vers un réplica Azure SQL
+Flask Incidents Réseau - Version Azure
+
+Les vues de lecture (décorateur ``lecture_seule``) exécutent leurs requêtes
+sur le moteur ``lecture`` de SQLALCHEMY_BINDS, par exemple une connexion
+``ApplicationIntent=ReadOnly`` vers un réplica géographique. Les écritures
+restent sur le primaire, ainsi que les lectures d'un client qui vient
+d'écrire (cookie de quelques secondes, pour qu'il voie sa propre écriture).
+
+Un thread par processus compare le dernier id du réplica à celui du
+primaire : un réplica injoignable ou en retard au-delà du seuil est écarté
+jusqu'à la mesure suivante. Une vue dont une requête échoue sur le réplica
+est rejouée sur le primaire.
+
+Les entrées du cache de lecture sont séparées par moteur (``source_cache``) :
+une page lue sur le réplica n'est jamais resservie comme lecture du
+primaire, et un client épinglé au primaire lit hors cache.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from functools import wraps
+
+from flask import current_app, has_request_context, request, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, func, select
+
+# Cookie posé après une écriture : les lectures du client restent sur le primaire
+COOKIE_PRIMAIRE = 'lecture_primaire'
+
+_lecture = ContextVar('routage_lecture', default=False)
+_echec_replica = ContextVar('routage_echec_replica', default=False)
+
+
+class SessionRoutee(Session):
+    """Session Flask-SQLAlchemy qui lit sur le réplica dans les vues de lecture"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and _lecture.get():
+            routage = current_app.extensions.get('routage_lecture')
+            if routage is not None and routage.replica_disponible():
+                return routage.moteur_replica()
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class RoutageLecture:
+    """Choix du moteur des lectures et surveillance du réplica
+
+    ``colonne_version`` (clé primaire croissante) sert à estimer le retard :
+    c'est le temps écoulé depuis que le primaire a dépassé le dernier id du
+    réplica.
+    """
+
+    def __init__(self, db, colonne_version, app=None):
+        self.db = db
+        self.colonne_version = colonne_version
+        self._verrou = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._moteur = None
+        self._disponible = True
+        self._retard = 0.0
+        self._observations = deque(maxlen=1000)  # (instant, dernier id du primaire)
+        self._mesure_le = None
+        self._derniere_erreur = None
+        self._compteurs = {'lectures_replica': 0, 'replis_primaire': 0, 'echecs_replica': 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.intervalle = app.config['LECTURE_INTERVALLE']
+        self.retard_max = app.config['LECTURE_RETARD_MAX']
+        self.coherence = app.config['LECTURE_COHERENCE']
+        app.after_request(self._apres_requete)
+        app.extensions['routage_lecture'] = self
+
+    # ----- moteur du réplica -----
+
+    def moteur_replica(self):
+        """Moteur ``lecture`` (créé au premier accès, avec l'écoute de ses erreurs)"""
+        moteur = self.db.engines['lecture']
+        if moteur is not self._moteur:
+            with self._verrou:
+                if moteur is not self._moteur:
+                    event.listen(moteur, 'handle_error', self._erreur_replica)
+                    self._moteur = moteur
+        return moteur
+
+    def _erreur_replica(self, contexte):
+        """Erreur SQL ou de connexion sur le réplica : l'écarter jusqu'à la prochaine mesure"""
+        with self._verrou:
+            self._disponible = False
+            self._derniere_erreur = f'{type(contexte.original_exception).__name__}: {contexte.original_exception}'[:300]
+            self._compteurs['echecs_replica'] += 1
+        _echec_replica.set(True)
+
+    def replica_disponible(self):
+        return self._disponible and self._retard <= self.retard_max
+
+    def source_cache(self):
+        """Moteur des lectures en cours pour les clés de cache : 'replica', 'primaire' ou None
+
+        None : client qui vient d'écrire, ses lectures ne passent pas par le
+        cache (une entrée d'un autre worker ne contient pas encore son écriture).
+        """
+        if has_request_context() and request.cookies.get(COOKIE_PRIMAIRE):
+            return None
+        if _lecture.get() and self.replica_disponible():
+            return 'replica'
+        return 'primaire'
+
+    # ----- mesure du retard -----
+
+    def demarrer(self):
+        """Démarrer la mesure du réplica dans ce processus"""
+        if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+            return
+        with self._verrou:
+            # Après un fork, le thread du parent n'existe pas dans l'enfant
+            if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._boucle, name='routage-lecture', daemon=True)
+            self._thread.start()
+
+    def _boucle(self):
+        while True:
+            self.mesurer()
+            time.sleep(self.intervalle)
+
+    def _dernier_id(self, moteur):
+        with moteur.connect() as connexion:
+            return connexion.execute(select(func.max(self.colonne_version))).scalar() or 0
+
+    def mesurer(self):
+        """Comparer les derniers ids du primaire et du réplica"""
+        with self.app.app_context():
+            maintenant = time.monotonic()
+            try:
+                self._observations.append((maintenant, self._dernier_id(self.db.engines[None])))
+            except Exception:
+                pass  # primaire injoignable : le réplica reste servable s'il répond
+            try:
+                dernier_id_replica = self._dernier_id(self.moteur_replica())
+            except Exception as e:
+                with self._verrou:
+                    self._disponible = False
+                    self._derniere_erreur = f'{type(e).__name__}: {e}'[:300]
+                return
+
+        # Retard : depuis quand le primaire a-t-il un id que le réplica n'a pas encore ?
+        retard = 0.0
+        for instant, dernier_id_primaire in self._observations:
+            if dernier_id_primaire > dernier_id_replica:
+                retard = maintenant - instant
+                break
+        with self._verrou:
+            self._disponible = True
+            self._retard = retard
+            self._mesure_le = time.time()
+
+    # ----- requêtes HTTP -----
+
+    def _apres_requete(self, reponse):
+        """Après une écriture réussie, garder le client sur le primaire quelques secondes"""
+        if request.method not in ('GET', 'HEAD', 'OPTIONS') and reponse.status_code < 400:
+            reponse.set_cookie(COOKIE_PRIMAIRE, '1', max_age=int(self.coherence), httponly=True, samesite='Lax')
+        return reponse
+
+    def executer(self, vue, args, kwargs):
+        """Exécuter une vue de lecture sur le réplica, puis sur le primaire si le réplica échoue"""
+        self.demarrer()
+        if request.cookies.get(COOKIE_PRIMAIRE) or not self.replica_disponible():
+            with self._verrou:
+                self._compteurs['replis_primaire'] += 1
+            return vue(*args, **kwargs)
+
+        jeton_lecture, jeton_echec = _lecture.set(True), _echec_replica.set(False)
+        try:
+            reponse = vue(*args, **kwargs)
+            echec = _echec_replica.get()
+        finally:
+            _lecture.reset(jeton_lecture)
+            _echec_replica.reset(jeton_echec)
+        if not echec:
+            with self._verrou:
+                self._compteurs['lectures_replica'] += 1
+            return reponse
+
+        # Vue rejouée sur le primaire, sans la session ni les messages de la tentative
+        self.db.session.remove()
+        if '_flashes' in session:
+            session.pop('_flashes')
+        with self._verrou:
+            self._compteurs['replis_primaire'] += 1
+        return vue(*args, **kwargs)
+
+    def etat(self):
+        """État du réplica (affiché par /azure-status)"""
+        with self._verrou:
+            return {
+                'disponible': self.replica_disponible(),
+                'retard_secondes': round(self._retard, 1),
+                'retard_max_secondes': self.retard_max,
+                'mesure_le': (time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self._mesure_le))
+                              if self._mesure_le else None),
+                'derniere_erreur': self._derniere_erreur,
+                **self._compteurs
+            }
+
+
+def lecture_seule(vue):
+    """Décorateur des vues de lecture : requêtes SQL routées vers le réplica s'il est configuré"""
+    @wraps(vue)
+    def enveloppe(*args, **kwargs):
+        routage = current_app.extensions.get('routage_lecture')
+        if routage is None:
+            return vue(*args, **kwargs)
+        return routage.executer(vue, args, kwargs)
+    return enveloppe
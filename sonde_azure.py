@@ -0,0 +1,112 @@
+"""
+🩺 Sonde de santé Azure SQL en arrière-plan
+Flask Incidents Réseau - Version Azure
+
+Un seul thread par processus mesure la connexion à intervalle fixe ; les
+routes de diagnostic répondent depuis le dernier état mesuré, sans requête SQL.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from mesures import resume_latences
+
+
+class SondeSante:
+    """Sonde de santé périodique, partagée par tous les threads du processus
+
+    ``verifier`` est appelée et chronométrée à chaque mesure (typiquement un
+    ``SELECT 1``) ; ``informations`` (optionnelle) complète l'état avec des
+    détails non chronométrés, comme le nombre d'incidents. Plus coûteuses,
+    elles ne sont relues que toutes les ``intervalle_informations`` secondes.
+    """
+
+    def __init__(self, verifier, informations=None, intervalle=15.0, fenetre=120,
+                 intervalle_informations=300.0):
+        self.verifier = verifier
+        self.informations = informations
+        self.intervalle = intervalle
+        self.intervalle_informations = intervalle_informations
+        self._informations_le = None
+        self._latences = deque(maxlen=fenetre)
+        self._verrou = threading.Lock()
+        self._arret = threading.Event()
+        self._premiere_mesure = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._etat = {'statut': 'EN_ATTENTE', 'mesure_le': None, 'latence_ms': None,
+                      'erreur': None, 'details': {}}
+
+    def demarrer(self):
+        """Démarrer le thread de mesure s'il ne tourne pas dans ce processus"""
+        if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+            return
+        with self._verrou:
+            # Après un fork, le thread du parent n'existe pas dans l'enfant
+            if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._arret.clear()
+            self._thread = threading.Thread(target=self._boucle, name='sonde-sante-azure', daemon=True)
+            self._thread.start()
+
+    def arreter(self):
+        """Arrêter le thread de mesure"""
+        self._arret.set()
+        if self._thread:
+            self._thread.join(timeout=self.intervalle)
+
+    def _boucle(self):
+        while not self._arret.is_set():
+            self.mesurer()
+            self._arret.wait(self.intervalle)
+
+    def mesurer(self):
+        """Effectuer une mesure et mettre à jour l'état partagé"""
+        debut = time.perf_counter()
+        try:
+            self.verifier()
+            latence, erreur = time.perf_counter() - debut, None
+        except Exception as e:
+            latence, erreur = None, str(e)
+
+        details = None
+        if erreur is None and self.informations and (
+                self._informations_le is None
+                or time.monotonic() - self._informations_le >= self.intervalle_informations):
+            try:
+                details = self.informations()
+                self._informations_le = time.monotonic()
+            except Exception:
+                details = None
+
+        with self._verrou:
+            if latence is not None:
+                self._latences.append(latence)
+            self._etat = {
+                'statut': 'OK' if erreur is None else 'ERREUR',
+                'mesure_le': datetime.now().isoformat(timespec='seconds'),
+                'latence_ms': round(latence * 1000, 3) if latence is not None else None,
+                'erreur': erreur,
+                'details': details if details is not None else self._etat['details']
+            }
+        self._premiere_mesure.set()
+
+    def derniere_mesure(self):
+        """Statut et latence (ms) de la dernière mesure, sans démarrer la sonde"""
+        with self._verrou:
+            return self._etat['statut'], self._etat['latence_ms']
+
+    def etat(self, attente_initiale=5.0):
+        """Dernier état mesuré et distribution récente des latences"""
+        self.demarrer()
+        self._premiere_mesure.wait(attente_initiale)
+        with self._verrou:
+            return {
+                **self._etat,
+                'intervalle_secondes': self.intervalle,
+                'distribution_latence_ms': resume_latences(self._latences)
+            }
@@ -0,0 +1,87 @@
+// Gestion du preview de sévérité
+document.getElementById('severite').addEventListener('change', function() {
+    const preview = document.getElementById('severitePreview');
+    const value = this.value;
+
+    if (value) {
+        preview.textContent = value;
+        preview.className = 'severity-preview severity-' + value.toLowerCase();
+        preview.style.display = 'inline-block';
+    } else {
+        preview.style.display = 'none';
+    }
+});
+
+// Compteurs de caractères
+function setupCharCounter(inputId, counterId, maxLength) {
+    const input = document.getElementById(inputId);
+    const counter = document.getElementById(counterId);
+
+    function updateCounter() {
+        const length = input.value.length;
+        counter.textContent = length + '/' + maxLength;
+
+        if (length > maxLength * 0.8) {
+            counter.style.color = '#f39c12';
+        }
+        if (length > maxLength * 0.9) {
+            counter.style.color = '#e74c3c';
+        }
+        if (length <= maxLength * 0.8) {
+            counter.style.color = '#6c757d';
+        }
+    }
+
+    input.addEventListener('input', updateCounter);
+    updateCounter(); // Initialiser
+}
+
+setupCharCounter('titre', 'titreCounter', 200);
+setupCharCounter('description', 'descCounter', 1000);
+
+// Validation du formulaire
+document.getElementById('incidentForm').addEventListener('submit', function(e) {
+    const titre = document.getElementById('titre').value.trim();
+    const severite = document.getElementById('severite').value;
+
+    if (!titre) {
+        alert('⚠️ Le titre de l\'incident est obligatoire !');
+        e.preventDefault();
+        document.getElementById('titre').focus();
+        return;
+    }
+
+    if (!severite) {
+        alert('⚠️ Veuillez sélectionner un niveau de sévérité !');
+        e.preventDefault();
+        document.getElementById('severite').focus();
+        return;
+    }
+
+    // Confirmation avant envoi
+    if (!confirm('Êtes-vous sûr de vouloir enregistrer cet incident dans Azure SQL Database ?')) {
+        e.preventDefault();
+    }
+});
+
+// Animation d'entrée
+document.addEventListener('DOMContentLoaded', function() {
+    const elements = document.querySelectorAll('.azure-info, .form-section');
+    elements.forEach((el, index) => {
+        el.style.opacity = '0';
+        el.style.transform = 'translateY(20px)';
+        setTimeout(() => {
+            el.style.transition = 'all 0.6s ease';
+            el.style.opacity = '1';
+            el.style.transform = 'translateY(0)';
+        }, index * 200);
+    });
+});
+
+// Initialiser le preview de sévérité si une valeur est déjà sélectionnée
+document.addEventListener('DOMContentLoaded', function() {
+    const severiteSelect = document.getElementById('severite');
+    if (severiteSelect.value) {
+        severiteSelect.dispatchEvent(new Event('change'));
+    }
+});
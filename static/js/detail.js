@@ -0,0 +1,13 @@
+// Animation d'entrée
+document.addEventListener('DOMContentLoaded', function() {
+    const elements = document.querySelectorAll('.incident-header, .description-section, .azure-info');
+    elements.forEach((el, index) => {
+        el.style.opacity = '0';
+        el.style.transform = 'translateY(20px)';
+        setTimeout(() => {
+            el.style.transition = 'all 0.6s ease';
+            el.style.opacity = '1';
+            el.style.transform = 'translateY(0)';
+        }, index * 200);
+    });
+});
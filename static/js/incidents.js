@@ -0,0 +1,59 @@
+// Vérification périodique du statut Azure
+setInterval(async function() {
+    try {
+        const response = await fetch('/test-azure');
+        const status = await response.json();
+
+        const statusElement = document.querySelector('.azure-status-info span');
+        if (status.azure_sql_test === 'SUCCESS') {
+            statusElement.innerHTML = '<strong>Statut Azure SQL:</strong> ✅ Connecté et opérationnel';
+        } else {
+            statusElement.innerHTML = '<strong>Statut Azure SQL:</strong> ⚠️ Problème de connexion';
+        }
+    } catch (error) {
+        console.log('Vérification Azure SQL échouée:', error);
+    }
+}, 30000); // Vérification toutes les 30 secondes
+
+// Nouveaux incidents poussés par le serveur (Server-Sent Events), sur la
+// première page non filtrée : la grille porte alors l'URL du flux (data-flux)
+function creerCarteIncident(incident) {
+    const carte = document.createElement('div');
+    carte.className = 'incident-card';
+    carte.dataset.id = incident.id;
+
+    const titre = document.createElement('div');
+    titre.className = 'incident-title';
+    titre.textContent = incident.titre;
+
+    const meta = document.createElement('div');
+    meta.className = 'incident-meta';
+    const severite = document.createElement('span');
+    severite.className = 'severity severity-' + incident.severite.toLowerCase();
+    severite.textContent = incident.severite;
+    const date = document.createElement('span');
+    date.className = 'date';
+    date.textContent = incident.date_incident;
+    meta.append(severite, date);
+
+    const lien = document.createElement('a');
+    lien.className = 'view-detail';
+    lien.href = '/incident/' + incident.id;
+    lien.textContent = 'Voir détails →';
+
+    carte.append(titre, meta, lien);
+    return carte;
+}
+
+const grilleIncidents = document.querySelector('.incidents-grid');
+if (grilleIncidents && grilleIncidents.dataset.flux) {
+    const fluxIncidents = new EventSource(grilleIncidents.dataset.flux);
+    fluxIncidents.addEventListener('incident', function(evenement) {
+        const incident = JSON.parse(evenement.data);
+        // Carte déjà présente (rendue par la page ou reçue avant une reconnexion)
+        if (grilleIncidents.querySelector('.incident-card[data-id="' + incident.id + '"]')) {
+            return;
+        }
+        grilleIncidents.prepend(creerCarteIncident(incident));
+    });
+}
@@ -0,0 +1,107 @@
+"""
+📊 Statistiques des incidents maintenues incrémentalement
+Flask Incidents Réseau - Version Azure
+
+Compteurs par sévérité et histogrammes horaires / journaliers gardés en
+mémoire : chaque écriture les met à jour, et une réconciliation périodique
+les recalcule depuis la table (écritures des autres workers, dérives).
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+
+def cle_heure(date):
+    """Clé de l'histogramme horaire : début de l'heure"""
+    return date.strftime('%Y-%m-%dT%H:00')
+
+
+def cle_jour(date):
+    """Clé de l'histogramme journalier : date du jour"""
+    return date.strftime('%Y-%m-%d')
+
+
+class AgregatsIncidents:
+    """Agrégats des incidents, lus sans rebalayer la table
+
+    ``source(debut_heures, debut_jours)`` recalcule en base les trois
+    dictionnaires ``(par_severite, par_heure, par_jour)`` ; les histogrammes ne
+    couvrent que les ``heures`` dernières heures et les ``jours`` derniers jours.
+    """
+
+    def __init__(self, source, intervalle_reconciliation=300.0, heures=168, jours=90):
+        self.source = source
+        self.intervalle_reconciliation = intervalle_reconciliation
+        self.heures = heures
+        self.jours = jours
+        self._verrou = threading.Lock()
+        self._verrou_reconciliation = threading.Lock()
+        self._par_severite = {}
+        self._par_heure = {}
+        self._par_jour = {}
+        self._reconcilie_le = None
+        self._reconcilie_monotonic = None
+
+    def _debuts_fenetres(self):
+        maintenant = datetime.now()
+        debut_heures = maintenant.replace(minute=0, second=0, microsecond=0) - timedelta(hours=self.heures - 1)
+        debut_jours = maintenant.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=self.jours - 1)
+        return debut_heures, debut_jours
+
+    def enregistrer(self, severite, date_incident):
+        """Prendre en compte un incident qui vient d'être écrit"""
+        with self._verrou:
+            if self._reconcilie_le is None:
+                return  # pas encore chargé : la première réconciliation le comptera
+            self._par_severite[severite] = self._par_severite.get(severite, 0) + 1
+            self._par_heure[cle_heure(date_incident)] = self._par_heure.get(cle_heure(date_incident), 0) + 1
+            self._par_jour[cle_jour(date_incident)] = self._par_jour.get(cle_jour(date_incident), 0) + 1
+
+    def reconcilier(self):
+        """Recalculer les agrégats depuis la table source"""
+        debut_heures, debut_jours = self._debuts_fenetres()
+        par_severite, par_heure, par_jour = self.source(debut_heures, debut_jours)
+        with self._verrou:
+            self._par_severite = dict(par_severite)
+            self._par_heure = dict(par_heure)
+            self._par_jour = dict(par_jour)
+            self._reconcilie_le = datetime.now()
+            self._reconcilie_monotonic = time.monotonic()
+
+    def _reconcilier_si_perime(self):
+        """Réconcilier au premier accès puis après chaque intervalle
+
+        Une seule requête à la fois recalcule ; les autres servent les
+        agrégats courants, sauf au tout premier chargement.
+        """
+        if self._reconcilie_monotonic is None:
+            with self._verrou_reconciliation:
+                if self._reconcilie_monotonic is None:
+                    self.reconcilier()
+            return
+
+        if time.monotonic() - self._reconcilie_monotonic < self.intervalle_reconciliation:
+            return
+        if self._verrou_reconciliation.acquire(blocking=False):
+            try:
+                self.reconcilier()
+            finally:
+                self._verrou_reconciliation.release()
+
+    def photo(self):
+        """Agrégats courants, histogrammes limités à leur fenêtre"""
+        self._reconcilier_si_perime()
+        debut_heures, debut_jours = self._debuts_fenetres()
+        min_heure, min_jour = cle_heure(debut_heures), cle_jour(debut_jours)
+        with self._verrou:
+            return {
+                'total': sum(self._par_severite.values()),
+                'par_severite': dict(sorted(self._par_severite.items())),
+                'par_heure': [{'debut': cle, 'nombre': nombre}
+                              for cle, nombre in sorted(self._par_heure.items()) if cle >= min_heure],
+                'par_jour': [{'debut': cle, 'nombre': nombre}
+                             for cle, nombre in sorted(self._par_jour.items()) if cle >= min_jour],
+                'fenetre': {'heures': self.heures, 'jours': self.jours},
+                'reconcilie_le': self._reconcilie_le.isoformat(timespec='seconds')
+            }
@@ -0,0 +1,104 @@
+"""
+🧪 Test du cache de lecture des incidents
+Flask Incidents Réseau - Version Azure
+
+Vérifie sans base le TTL, l'éviction LRU, l'invalidation par espace de
+noms et la non-mémorisation d'une valeur calculée pendant une invalidation.
+"""
+
+import sys
+import time
+
+from cache_incidents import MANQUANT, CacheLRU, CacheNul, creer_cache
+
+
+def test_ttl():
+    """Une entrée expirée est relue en base"""
+    cache = CacheLRU(taille_max=10, ttl=0.05)
+    cache.set(('detail', 1), 'a')
+    assert cache.get(('detail', 1)) == 'a'
+    time.sleep(0.1)
+    assert cache.get(('detail', 1)) is MANQUANT
+    stats = cache.stats()
+    assert stats['expirations'] == 1 and stats['hits'] == 1 and stats['misses'] == 1, stats
+
+
+def test_eviction_lru():
+    """La taille est bornée et l'entrée la moins récemment lue part en premier"""
+    cache = CacheLRU(taille_max=2, ttl=60)
+    cache.set(('detail', 1), 'a')
+    cache.set(('detail', 2), 'b')
+    cache.get(('detail', 1))
+    cache.set(('detail', 3), 'c')
+    assert cache.get(('detail', 2)) is MANQUANT
+    assert cache.get(('detail', 1)) == 'a' and cache.get(('detail', 3)) == 'c'
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['taille'] == 2
+
+
+def test_invalidation_par_espace():
+    """invalider() ne vide que l'espace de noms demandé"""
+    cache = CacheLRU(taille_max=10, ttl=60)
+    cache.set(('liste', 50), 'page')
+    cache.set(('detail', 1), 'a')
+    cache.invalider('liste')
+    assert cache.get(('liste', 50)) is MANQUANT
+    assert cache.get(('detail', 1)) == 'a'
+    assert cache.generation('liste')[0] == 1 and cache.generation('detail') == (0, None)
+    assert cache.stats()['invalidations'] == 1
+
+
+def test_calcul_pendant_invalidation():
+    """Une valeur calculée pendant l'invalidation de son espace n'est pas mémorisée"""
+    cache = CacheLRU(taille_max=10, ttl=60)
+
+    def calcul():
+        cache.invalider('liste')
+        return 'ancienne page'
+
+    assert cache.lire_ou_calculer(('liste', 50), calcul) == 'ancienne page'
+    assert cache.get(('liste', 50)) is MANQUANT
+    assert cache.lire_ou_calculer(('liste', 50), lambda: 'page') == 'page'
+    assert cache.get(('liste', 50)) == 'page'
+
+
+def test_quarantaine():
+    """Pas de mémorisation moins de ``quarantaine`` secondes après une invalidation"""
+    cache = CacheLRU(taille_max=10, ttl=60)
+    cache.invalider('liste')
+    cache.lire_ou_calculer(('liste', 50), lambda: 'page', quarantaine=0.05)
+    assert cache.get(('liste', 50)) is MANQUANT
+    time.sleep(0.1)
+    cache.lire_ou_calculer(('liste', 50), lambda: 'page', quarantaine=0.05)
+    assert cache.get(('liste', 50)) == 'page'
+
+
+def test_sans_cache():
+    """Le backend 'aucun' recalcule à chaque lecture"""
+    cache = creer_cache('aucun')
+    assert isinstance(cache, CacheNul) and not isinstance(cache, CacheLRU)
+    appels = []
+    for _ in range(2):
+        cache.lire_ou_calculer(('detail', 1), lambda: appels.append(1))
+    assert len(appels) == 2
+    try:
+        creer_cache('redis')
+        assert False, 'backend inconnu accepté'
+    except ValueError:
+        pass
+
+
+if __name__ == "__main__":
+    print("🧪 TEST DU CACHE DES INCIDENTS")
+    print("=" * 60)
+    echecs = 0
+    for test in (test_ttl, test_eviction_lru, test_invalidation_par_espace,
+                 test_calcul_pendant_invalidation, test_quarantaine, test_sans_cache):
+        try:
+            test()
+            print(f"✅ {test.__doc__}")
+        except AssertionError as e:
+            echecs += 1
+            print(f"❌ {test.__doc__}: {e}")
+    print("=" * 60)
+    sys.exit(1 if echecs else 0)
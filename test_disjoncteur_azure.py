@@ -0,0 +1,99 @@
+"""
+🧪 Test du disjoncteur et des erreurs transitoires Azure SQL
+Flask Incidents Réseau - Version Azure
+
+Messages au format de pyodbc (SQLSTATE, texte du driver, code natif entre
+parenthèses) : seules les erreurs transitoires d'Azure SQL sont
+réessayées, un serveur injoignable échoue dès le premier essai.
+"""
+
+import sys
+
+from disjoncteur_azure import OUVERT, Disjoncteur, DisjoncteurOuvert, erreur_transitoire
+
+PILOTE = '[Microsoft][ODBC Driver 18 for SQL Server]'
+
+
+def erreur_pyodbc(etat, texte, code=None):
+    """Exception au format de pyodbc.Error"""
+    natif = f' ({code})' if code else ''
+    return Exception(etat, f'[{etat}] {PILOTE}{texte}{natif} (SQLDriverConnect)')
+
+
+def test_erreurs_transitoires():
+    """Bascule, limitation et perte de connexion sont réessayées"""
+    assert erreur_transitoire(erreur_pyodbc(
+        '42000', "[SQL Server]Database 'incidents' on server 'azure' is not currently available.", 40613))
+    assert erreur_transitoire(erreur_pyodbc('42000', '[SQL Server]The service is currently busy.', 40501))
+    assert erreur_transitoire(erreur_pyodbc('08S01', 'TCP Provider: An existing connection was forcibly closed', 10054))
+    assert erreur_transitoire(erreur_pyodbc('08S01', 'Communication link failure'))
+
+
+def test_serveur_injoignable_non_reessaye():
+    """08001 et les login timeouts échouent immédiatement"""
+    assert not erreur_transitoire(erreur_pyodbc('08001', 'TCP Provider: Error code 0x2749', 10060))
+    assert not erreur_transitoire(erreur_pyodbc('08001', 'TCP Provider: connection reset', 10054))
+    assert not erreur_transitoire(erreur_pyodbc('HYT00', 'Login timeout expired'))
+    assert not erreur_transitoire(Exception('Login timeout expired'))
+
+
+def test_nombres_du_texte_ignores():
+    """Un nombre hors de la position du code natif n'est pas un code transitoire"""
+    assert not erreur_transitoire(Exception('unable to open database file /data/64/db'))
+    assert not erreur_transitoire(erreur_pyodbc('28000', "[SQL Server]Login failed for user 233.", 18456))
+    assert not erreur_transitoire(Exception('ETAT1 40613 10054'))
+
+
+def test_checkout_injoignable_un_seul_essai():
+    """Serveur injoignable : un seul essai par checkout, l'échec est compté aussitôt"""
+    disjoncteur = Disjoncteur(seuil=2, tentatives=3, delai_base=0.0)
+    appels = []
+
+    def connecter():
+        appels.append(1)
+        raise erreur_pyodbc('HYT00', 'Login timeout expired')
+
+    for _ in range(2):
+        try:
+            disjoncteur.appeler(connecter)
+        except Exception:
+            pass
+    assert len(appels) == 2, appels
+    assert disjoncteur.etat()['etat'] == OUVERT
+    try:
+        disjoncteur.appeler(connecter)
+        assert False, 'le disjoncteur ouvert aurait dû refuser le checkout'
+    except DisjoncteurOuvert:
+        pass
+    assert len(appels) == 2
+
+
+def test_checkout_transitoire_reessaye():
+    """Erreur transitoire puis succès : pas d'échec compté"""
+    disjoncteur = Disjoncteur(tentatives=3, delai_base=0.0)
+    erreurs = [erreur_pyodbc('42000', '[SQL Server]Database is not currently available.', 40613)]
+
+    def connecter():
+        if erreurs:
+            raise erreurs.pop()
+        return 'connexion'
+
+    assert disjoncteur.appeler(connecter) == 'connexion'
+    etat = disjoncteur.etat()
+    assert etat['nouveaux_essais'] == 1 and etat['echecs_consecutifs'] == 0, etat
+
+
+if __name__ == "__main__":
+    print("🧪 TEST DU DISJONCTEUR AZURE SQL")
+    print("=" * 60)
+    echecs = 0
+    for test in (test_erreurs_transitoires, test_serveur_injoignable_non_reessaye, test_nombres_du_texte_ignores,
+                 test_checkout_injoignable_un_seul_essai, test_checkout_transitoire_reessaye):
+        try:
+            test()
+            print(f"✅ {test.__doc__}")
+        except AssertionError as e:
+            echecs += 1
+            print(f"❌ {test.__doc__}: {e}")
+    print("=" * 60)
+    sys.exit(1 if echecs else 0)
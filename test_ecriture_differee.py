@@ -0,0 +1,143 @@
+"""
+🧪 Test de l'écriture différée des incidents
+Flask Incidents Réseau - Version Azure
+
+Vérifie sans base, avec un ecrire_lot en mémoire et un spool dans un
+dossier temporaire, le format du spool, le regroupement par lots, le
+refus quand la file est pleine et la reprise d'un spool après un arrêt.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+from datetime import datetime
+
+from ecriture_differee import FileEcriture, FilePleine, decoder_valeurs, encoder_ligne, lire_spool
+
+
+class BaseFactice:
+    """ecrire_lot en mémoire, bloquable pour simuler une base lente"""
+
+    def __init__(self):
+        self.lots = []
+        self.ouverte = threading.Event()
+        self.ouverte.set()
+
+    def ecrire_lot(self, lignes):
+        self.ouverte.wait(5)
+        self.lots.append([valeurs['titre'] for valeurs in lignes])
+
+
+def test_encodage_spool():
+    """Une création relue dans le spool garde sa date"""
+    date = datetime(2024, 3, 5, 14, 37, 12)
+    ligne = encoder_ligne(3, {'titre': 'Panne é', 'date_incident': date})
+    assert ligne.endswith('\n') and 'é' in ligne
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, 'spool.ndjson')
+        with open(chemin, 'w', encoding='utf-8') as fichier:
+            fichier.write(ligne)
+        assert lire_spool(chemin) == [{'titre': 'Panne é', 'date_incident': date}]
+    assert decoder_valeurs({'titre': 'x', 'date_incident': None}) == {'titre': 'x', 'date_incident': None}
+
+
+def test_lire_spool():
+    """Seules les créations après le dernier commit sont rejouées, ligne tronquée exclue"""
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, 'spool.ndjson')
+        with open(chemin, 'w', encoding='utf-8') as fichier:
+            for numero in (1, 2, 3):
+                fichier.write(encoder_ligne(numero, {'titre': f'i{numero}'}))
+            fichier.write('{"commit": 2}\n')
+            fichier.write(encoder_ligne(4, {'titre': 'i4'}))
+            fichier.write('{"n": 5, "vale')
+        assert [valeurs['titre'] for valeurs in lire_spool(chemin)] == ['i3', 'i4']
+
+
+def test_ecriture_par_lots():
+    """Les créations accumulées pendant une écriture partent dans un même lot"""
+    base = BaseFactice()
+    with tempfile.TemporaryDirectory() as dossier:
+        file = FileEcriture(base.ecrire_lot, dossier, taille_lot=10, delai=0.01)
+        base.ouverte.clear()
+        file.ajouter({'titre': 'i0'})
+        for numero in range(1, 6):
+            file.ajouter({'titre': f'i{numero}'})
+        base.ouverte.set()
+        assert file.vider(5)
+        assert [titre for lot in base.lots for titre in lot] == [f'i{n}' for n in range(6)], base.lots
+        assert len(base.lots) <= 2, base.lots
+        assert file.stats()['ecrites'] == 6
+        # Tout est en base : le spool est vide
+        assert os.path.getsize(os.path.join(dossier, f'ecriture-{os.getpid()}.ndjson')) == 0
+
+
+def test_file_pleine():
+    """Une file pleine bloque au plus attente_max puis lève FilePleine"""
+    base = BaseFactice()
+    with tempfile.TemporaryDirectory() as dossier:
+        file = FileEcriture(base.ecrire_lot, dossier, taille_max=2, taille_lot=1, delai=0.01, attente_max=0.1)
+        base.ouverte.clear()
+        file.ajouter({'titre': 'i1'})
+        file.ajouter({'titre': 'i2'})
+        try:
+            file.ajouter({'titre': 'i3'})
+            assert False, 'création acceptée avec une file pleine'
+        except FilePleine:
+            pass
+        assert file.stats()['refusees'] == 1
+        base.ouverte.set()
+        assert file.vider(5)
+        assert base.lots == [['i1'], ['i2']], base.lots
+
+
+def test_reprise_du_spool():
+    """Les créations non écrites d'un spool orphelin sont rejouées au démarrage"""
+    base = BaseFactice()
+    with tempfile.TemporaryDirectory() as dossier:
+        # Spool à notre propre pid : laissé par un processus précédent
+        with open(os.path.join(dossier, f'ecriture-{os.getpid()}.ndjson'), 'w', encoding='utf-8') as fichier:
+            fichier.write(encoder_ligne(1, {'titre': 'ecrite'}))
+            fichier.write('{"commit": 1}\n')
+            fichier.write(encoder_ligne(2, {'titre': 'perdue'}))
+        file = FileEcriture(base.ecrire_lot, dossier, delai=0.01)
+        file.demarrer()
+        assert file.vider(5)
+        assert base.lots == [['perdue']], base.lots
+        assert file.stats()['rejouees'] == 1
+        assert os.listdir(dossier) == [f'ecriture-{os.getpid()}.ndjson'], os.listdir(dossier)
+
+
+def test_erreur_definitive():
+    """Une création fautive est abandonnée seule, les autres du lot sont écrites"""
+    base = BaseFactice()
+
+    def ecrire_lot(lignes):
+        if any(valeurs['titre'] == 'fautive' for valeurs in lignes):
+            raise ValueError('contrainte violée')
+        base.ecrire_lot(lignes)
+
+    with tempfile.TemporaryDirectory() as dossier:
+        file = FileEcriture(ecrire_lot, dossier, taille_lot=10, delai=0.05, erreurs_definitives=(ValueError,))
+        for titre in ('i1', 'fautive', 'i2'):
+            file.ajouter({'titre': titre})
+        assert file.vider(5)
+        assert [titre for lot in base.lots for titre in lot] == ['i1', 'i2'], base.lots
+        assert file.stats()['abandonnees'] == 1
+
+
+if __name__ == "__main__":
+    print("🧪 TEST DE L'ÉCRITURE DIFFÉRÉE")
+    print("=" * 60)
+    echecs = 0
+    for test in (test_encodage_spool, test_lire_spool, test_ecriture_par_lots, test_file_pleine,
+                 test_reprise_du_spool, test_erreur_definitive):
+        try:
+            test()
+            print(f"✅ {test.__doc__}")
+        except AssertionError as e:
+            echecs += 1
+            print(f"❌ {test.__doc__}: {e}")
+    print("=" * 60)
+    sys.exit(1 if echecs else 0)
@@ -0,0 +1,87 @@
+"""
+🧪 Test du diffuseur d'incidents (Server-Sent Events)
+Flask Incidents Réseau - Version Azure
+
+Vérifie avec une source en mémoire, sans base, qu'un premier abonné ne
+reçoit pas les incidents insérés pendant qu'aucun client n'écoutait, et
+qu'il reçoit bien les suivants.
+"""
+
+import sys
+import threading
+
+from flux_incidents import FERME, DiffuseurIncidents
+
+
+class TableFactice:
+    """Incidents numérotés, lus par lots comme incidents_crees_apres()"""
+
+    def __init__(self):
+        self.ids = []
+        self.lectures = 0
+        self._verrou = threading.Lock()
+
+    def inserer(self, nombre):
+        with self._verrou:
+            debut = self.ids[-1] + 1 if self.ids else 1
+            self.ids.extend(range(debut, debut + nombre))
+
+    def source(self, dernier_id, limite=500):
+        with self._verrou:
+            self.lectures += 1
+            return [{'id': identifiant} for identifiant in self.ids if identifiant > dernier_id][:limite]
+
+    def dernier_id(self):
+        with self._verrou:
+            return self.ids[-1] if self.ids else None
+
+
+def creer_diffuseur(table):
+    # Intervalle long : les lectures ne sont déclenchées que par reveiller() / lire_nouveautes()
+    return DiffuseurIncidents(table.source, table.dernier_id, intervalle=3600, taille_file=100)
+
+
+def test_import_sans_abonne():
+    """Un import en masse sans abonné ne remplit pas la file du premier abonné suivant"""
+    table = TableFactice()
+    table.inserer(10)
+    diffuseur = creer_diffuseur(table)
+    diffuseur.desabonner(diffuseur.abonner())
+
+    table.inserer(1000)
+    abonnement = diffuseur.abonner()
+    lectures = table.lectures
+    table.inserer(1)
+    diffuseur.lire_nouveautes()
+
+    evenement = abonnement.attendre(1)
+    assert evenement is not FERME, 'abonné déconnecté dès son arrivée'
+    assert evenement == {'id': 1011}, evenement
+    # Seule la nouveauté est relue, pas l'arriéré de l'import
+    assert table.lectures - lectures == 2, table.lectures - lectures
+
+
+def test_client_lent_deconnecte():
+    """Un abonné dont la file déborde reçoit FERME"""
+    table = TableFactice()
+    diffuseur = creer_diffuseur(table)
+    abonnement = diffuseur.abonner()
+    table.inserer(150)
+    diffuseur.lire_nouveautes()
+    assert abonnement.attendre(1) is FERME
+    assert diffuseur.nombre_abonnes() == 0
+
+
+if __name__ == "__main__":
+    print("🧪 TEST DU DIFFUSEUR D'INCIDENTS")
+    print("=" * 60)
+    echecs = 0
+    for test in (test_import_sans_abonne, test_client_lent_deconnecte):
+        try:
+            test()
+            print(f"✅ {test.__doc__}")
+        except AssertionError as e:
+            echecs += 1
+            print(f"❌ {test.__doc__}: {e}")
+    print("=" * 60)
+    sys.exit(1 if echecs else 0)
@@ -0,0 +1,96 @@
+"""
+🧪 Test de l'ingestion en masse /api/incidents/bulk
+Flask Incidents Réseau - Version Azure
+
+Vérifie sur une base SQLite locale la validation en une passe, le
+découpage en lots (une transaction chacun), les résultats par ligne et les
+codes de réponse (201, 207, 400, 413).
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+from sqlalchemy import func, select
+
+import app as application
+
+
+def creer_application(dossier, **configuration):
+    app = application.create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(dossier, 'bulk.db')}",
+        'INSTANTANE_ACTIF': False,
+        **configuration
+    })
+    with app.app_context():
+        application.db.create_all()
+    return app
+
+
+def nombre_incidents(app):
+    with app.app_context():
+        nombre = application.db.session.execute(select(func.count(application.Incident.id))).scalar()
+        application.db.engine.dispose()
+    return nombre
+
+
+def test_tableau_json_partiel():
+    """Lignes invalides rejetées avec leurs erreurs, les autres insérées (207)"""
+    with tempfile.TemporaryDirectory() as dossier:
+        app = creer_application(dossier)
+        reponse = app.test_client().post('/api/incidents/bulk', json=[
+            {'titre': 'Panne routeur', 'severite': 'Critique', 'date_incident': '2025-09-20T14:30:00'},
+            {'titre': '', 'severite': 'Critique'},
+            {'titre': 'Latence', 'severite': 'Inconnue'},
+            'pas un objet',
+            {'titre': 'Coupure fibre', 'description': 'Chantier'}
+        ])
+        assert reponse.status_code == 207, reponse.status_code
+        corps = reponse.get_json()
+        assert (corps['recus'], corps['inseres'], corps['rejetes']) == (5, 2, 3), corps
+        assert [resultat['statut'] for resultat in corps['resultats']] == \
+            ['insere', 'rejete', 'rejete', 'rejete', 'insere']
+        assert corps['resultats'][1]['erreurs'] == ['Le titre est obligatoire']
+        assert nombre_incidents(app) == 2
+
+
+def test_ndjson_par_lots():
+    """NDJSON découpé en lots de BULK_TAILLE_LOT, une transaction chacun (201)"""
+    with tempfile.TemporaryDirectory() as dossier:
+        app = creer_application(dossier, BULK_TAILLE_LOT=2)
+        corps = '\n'.join(json.dumps({'titre': f'Incident {numero}', 'severite': 'Faible'})
+                          for numero in range(5)) + '\n\n'
+        reponse = app.test_client().post('/api/incidents/bulk', data=corps,
+                                         content_type='application/x-ndjson')
+        assert reponse.status_code == 201, reponse.get_data(as_text=True)
+        lots = reponse.get_json()['lots']
+        assert [(lot['taille'], lot['statut']) for lot in lots] == [(2, 'commit'), (2, 'commit'), (1, 'commit')]
+        assert [lot['lignes'] for lot in lots] == [[0, 1], [2, 3], [4, 4]]
+        assert nombre_incidents(app) == 5
+
+
+def test_corps_refuses():
+    """Corps qui n'est pas un tableau (400) ou trop de lignes (413), rien n'est inséré"""
+    with tempfile.TemporaryDirectory() as dossier:
+        app = creer_application(dossier, BULK_MAX_LIGNES=2)
+        client = app.test_client()
+        assert client.post('/api/incidents/bulk', json={'titre': 'Seul'}).status_code == 400
+        reponse = client.post('/api/incidents/bulk', json=[{'titre': f'I{numero}'} for numero in range(3)])
+        assert reponse.status_code == 413, reponse.status_code
+        assert nombre_incidents(app) == 0
+
+
+if __name__ == "__main__":
+    print("🧪 TEST DE L'INGESTION EN MASSE")
+    print("=" * 60)
+    echecs = 0
+    for test in (test_tableau_json_partiel, test_ndjson_par_lots, test_corps_refuses):
+        try:
+            test()
+            print(f"✅ {test.__doc__}")
+        except AssertionError as e:
+            echecs += 1
+            print(f"❌ {test.__doc__}: {e}")
+    print("=" * 60)
+    sys.exit(1 if echecs else 0)
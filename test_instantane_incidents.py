@@ -0,0 +1,141 @@
+"""
+🧪 Test de l'instantané local des incidents
+Flask Incidents Réseau - Version Azure
+
+Vérifie avec une table principale en mémoire, et l'instantané dans un
+dossier temporaire, l'amorce par les incidents les plus récents, la suite
+par id, la limite de taille et l'obsolescence.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, select
+
+from instantane_incidents import InstantaneLocal
+
+TABLE = Table('incidents', MetaData(),
+              Column('id', Integer, primary_key=True),
+              Column('titre', String(200)),
+              Column('date_incident', DateTime))
+
+
+class TableFactice:
+    """Table principale : incidents numérotés, un par minute"""
+
+    def __init__(self, nombre):
+        self.lignes = []
+        self.inserer(nombre)
+
+    def inserer(self, nombre):
+        debut = self.lignes[-1]['id'] + 1 if self.lignes else 1
+        for identifiant in range(debut, debut + nombre):
+            self.lignes.append({'id': identifiant, 'titre': f'i{identifiant}',
+                                'date_incident': datetime(2024, 1, 1) + timedelta(minutes=identifiant)})
+
+    def source(self, dernier_id, limite):
+        return [ligne for ligne in self.lignes if ligne['id'] > dernier_id][:limite]
+
+    def amorce(self, limite):
+        return self.lignes[-1]['id'], self.lignes[-limite:]
+
+
+def creer_instantane(dossier, table, **options):
+    instantane = InstantaneLocal(table.source, table.amorce, os.path.join(dossier, 'instantane.db'), TABLE,
+                                 intervalle=3600, **options)
+    debut = datetime.now()
+    instantane.demarrer()
+    # Attendre le premier rafraîchissement du thread : les suivants sont déclenchés par le test
+    limite = time.monotonic() + 5
+    while ((instantane._rafraichi_le is None or instantane._rafraichi_le < debut)
+           and instantane._derniere_erreur is None and time.monotonic() < limite):
+        time.sleep(0.01)
+    return instantane
+
+
+def ids(instantane):
+    with instantane.connexion() as connexion:
+        return connexion.execute(select(TABLE.c.id).order_by(TABLE.c.id)).scalars().all()
+
+
+def test_amorce_puis_suite():
+    """Le premier rafraîchissement ne copie que les plus récents, les suivants continuent par id"""
+    table = TableFactice(50)
+    with tempfile.TemporaryDirectory() as dossier:
+        instantane = creer_instantane(dossier, table, taille_max=10, taille_lot=3)
+        try:
+            assert ids(instantane) == list(range(41, 51)), ids(instantane)
+            table.inserer(7)
+            instantane.rafraichir()
+            # Plusieurs lots de taille_lot, puis seuls les taille_max plus récents restent
+            assert ids(instantane) == list(range(48, 58)), ids(instantane)
+            assert instantane.etat()['incidents'] == 10
+        finally:
+            instantane._moteur.dispose()
+
+
+def test_reprise_du_fichier():
+    """Un instantané rouvert continue après le dernier id déjà copié"""
+    table = TableFactice(5)
+    with tempfile.TemporaryDirectory() as dossier:
+        instantane = creer_instantane(dossier, table)
+        instantane._moteur.dispose()
+        table.inserer(2)
+        appels = []
+        amorce = table.amorce
+        table.amorce = lambda limite: appels.append(limite) or amorce(limite)
+        instantane = creer_instantane(dossier, table)
+        try:
+            assert ids(instantane) == list(range(1, 8)), ids(instantane)
+            assert appels == [], 'amorce relue alors que le fichier était déjà rempli'
+        finally:
+            instantane._moteur.dispose()
+
+
+def test_obsolescence():
+    """L'instantané n'est plus servi au-delà de obsolescence_max"""
+    table = TableFactice(5)
+    with tempfile.TemporaryDirectory() as dossier:
+        instantane = creer_instantane(dossier, table, obsolescence_max=0.05)
+        try:
+            assert instantane.utilisable() and instantane.age() < 0.05
+            time.sleep(0.1)
+            assert not instantane.utilisable()
+            assert instantane.etat()['age_secondes'] >= 0.1
+        finally:
+            instantane._moteur.dispose()
+
+
+def test_jamais_rafraichi():
+    """Sans rafraîchissement réussi, l'instantané n'est pas utilisable"""
+    table = TableFactice(5)
+
+    def source_en_panne(dernier_id, limite):
+        raise ConnectionError('base injoignable')
+
+    table.source = source_en_panne
+    with tempfile.TemporaryDirectory() as dossier:
+        instantane = creer_instantane(dossier, table)
+        try:
+            assert instantane.age() is None and not instantane.utilisable()
+            assert 'base injoignable' in instantane.etat()['derniere_erreur']
+        finally:
+            instantane._moteur.dispose()
+
+
+if __name__ == "__main__":
+    print("🧪 TEST DE L'INSTANTANÉ LOCAL")
+    print("=" * 60)
+    echecs = 0
+    for test in (test_amorce_puis_suite, test_reprise_du_fichier, test_obsolescence, test_jamais_rafraichi):
+        try:
+            test()
+            print(f"✅ {test.__doc__}")
+        except AssertionError as e:
+            echecs += 1
+            print(f"❌ {test.__doc__}: {e}")
+    print("=" * 60)
+    sys.exit(1 if echecs else 0)
@@ -0,0 +1,171 @@
+"""
+🧪 Test du cache de jetons Azure AD
+Flask Incidents Réseau - Version Azure
+
+Vérifie avec un credential factice, sans réseau ni driver ODBC, que le
+jeton est partagé par les threads, renouvelé en arrière-plan avant son
+expiration et passé au driver à chaque nouvelle connexion
+(``attrs_before``).
+"""
+
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from collections import namedtuple
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+
+import app as application
+from jeton_azure import SQL_COPT_SS_ACCESS_TOKEN, CacheJetons, structure_jeton
+
+AccesFactice = namedtuple('AccesFactice', 'token expires_on')
+
+
+class CredentialFactice:
+    """get_token() d'azure-identity : jetons numérotés valables ``duree`` secondes"""
+
+    def __init__(self, duree=3600, attente=0.0):
+        self.duree = duree
+        self.attente = attente
+        self.appels = 0
+        self.panne = None
+        self._verrou = threading.Lock()
+
+    def get_token(self, *portees):
+        time.sleep(self.attente)
+        if self.panne:
+            raise self.panne
+        with self._verrou:
+            self.appels += 1
+            return AccesFactice(f'jeton-{self.appels}', int(time.time() + self.duree))
+
+
+def relire_jeton(attribut):
+    """Texte d'un jeton au format SQL_COPT_SS_ACCESS_TOKEN"""
+    longueur, = struct.unpack('<I', attribut[:4])
+    assert longueur == len(attribut) - 4
+    return attribut[4:].decode('utf-16-le')
+
+
+def test_structure_jeton():
+    """Format ODBC : longueur little-endian puis UTF-16-LE"""
+    assert structure_jeton('abc') == b'\x06\x00\x00\x00a\x00b\x00c\x00'
+    assert relire_jeton(structure_jeton('eyJ0eXAi')) == 'eyJ0eXAi'
+
+
+def test_un_seul_appel_pour_les_connexions_simultanees():
+    """Premier jeton : un seul appel au fournisseur pour tous les threads"""
+    credential = CredentialFactice(attente=0.2)
+    jetons = CacheJetons(credential)
+    resultats = []
+    threads = [threading.Thread(target=lambda: resultats.append(jetons.jeton())) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert resultats == ['jeton-1'] * 10
+    assert credential.appels == 1
+
+
+def test_renouvellement_avant_expiration():
+    """Le thread renouvelle le jeton dans la marge, les connexions n'attendent pas"""
+    # Jetons de 40 s renouvelés 39,5 s avant expiration : nouveau jeton toutes les ~0,5 s
+    credential = CredentialFactice(duree=40)
+    jetons = CacheJetons(credential, marge=39.5, delai_erreur=0.05)
+    assert jetons.jeton() == 'jeton-1'
+    limite = time.monotonic() + 5
+    while credential.appels < 3 and time.monotonic() < limite:
+        jetons.jeton()
+        time.sleep(0.05)
+    assert credential.appels >= 3
+    assert jetons.jeton() != 'jeton-1'
+    # Seul le tout premier jeton a été attendu par une connexion
+    assert jetons.etat()['connexions_en_attente'] == 1
+
+
+def test_panne_du_fournisseur():
+    """Sans jeton valide, l'erreur du fournisseur remonte à la connexion puis disparaît au rétablissement"""
+    credential = CredentialFactice()
+    credential.panne = RuntimeError('Azure AD injoignable')
+    jetons = CacheJetons(credential, delai_erreur=0.05)
+    try:
+        jetons.jeton()
+        assert False, 'jeton() aurait dû échouer'
+    except RuntimeError:
+        pass
+    assert 'Azure AD injoignable' in jetons.etat()['derniere_erreur']
+
+    credential.panne = None
+    assert jetons.jeton().startswith('jeton-')
+    assert jetons.etat()['derniere_erreur'] is None
+
+
+def test_jeton_passe_au_driver():
+    """attributs_connexion : attrs_before de chaque nouvelle connexion DBAPI"""
+    jetons = CacheJetons(CredentialFactice())
+    recus = []
+
+    with tempfile.TemporaryDirectory() as dossier:
+        app = application.create_app({
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(dossier, 'jetons.db')}",
+            'SQLALCHEMY_ENGINE_OPTIONS': lambda uri: {'attributs_connexion': jetons.attributs_connexion},
+            'INSTANTANE_ACTIF': False
+        })
+        with app.app_context():
+            moteur = application.db.engine
+
+            # Écouteur ajouté après celui de l'extension : sqlite3 ne connaît pas attrs_before
+            @event.listens_for(moteur, 'do_connect')
+            def capturer(dialecte, enregistrement, arguments, parametres):
+                recus.append(parametres.pop('attrs_before'))
+
+            with moteur.connect() as connexion:
+                connexion.execute(text('SELECT 1'))
+            moteur.dispose()
+
+    assert len(recus) == 1
+    assert relire_jeton(recus[0][SQL_COPT_SS_ACCESS_TOKEN]) == 'jeton-1'
+
+
+def test_mode_jeton_de_l_application():
+    """AZURE_SQL_AUTH : chaîne sans identifiants, hook ajouté aux moteurs pyodbc"""
+    anciennes = {nom: os.environ.get(nom) for nom in ('AZURE_SQL_AUTH', 'AZURE_SQL_SERVER')}
+    os.environ.update(AZURE_SQL_AUTH='managed-identity', AZURE_SQL_SERVER='exemple.database.windows.net')
+    try:
+        chaine = application.create_azure_connection_string()
+        app = application.create_app({'AZURE_CREDENTIAL': CredentialFactice(), 'INSTANTANE_ACTIF': False})
+        with app.app_context():
+            options = application.create_engine_options(chaine)
+            assert options['attributs_connexion'] == app.extensions['jetons_azure'].attributs_connexion
+            assert application.etat_authentification()['mode'] == 'managed-identity'
+    finally:
+        for nom, valeur in anciennes.items():
+            if valeur is None:
+                os.environ.pop(nom, None)
+            else:
+                os.environ[nom] = valeur
+
+    parametres = make_url(chaine).query['odbc_connect']
+    assert 'SERVER=exemple.database.windows.net' in parametres
+    assert 'UID=' not in parametres and 'PWD=' not in parametres
+
+
+if __name__ == "__main__":
+    print("🧪 TEST DU CACHE DE JETONS AZURE AD")
+    print("=" * 60)
+    echecs = 0
+    for test in (test_structure_jeton, test_un_seul_appel_pour_les_connexions_simultanees,
+                 test_renouvellement_avant_expiration, test_panne_du_fournisseur,
+                 test_jeton_passe_au_driver, test_mode_jeton_de_l_application):
+        try:
+            test()
+            print(f"✅ {test.__doc__}")
+        except AssertionError as e:
+            echecs += 1
+            print(f"❌ {test.__doc__}: {e}")
+    print("=" * 60)
+    sys.exit(1 if echecs else 0)
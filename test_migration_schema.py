@@ -0,0 +1,119 @@
+"""
+🧪 Test de la migration du schéma au démarrage
+Flask Incidents Réseau - Version Azure
+
+Part d'une table incidents créée par la toute première version de
+l'application (id, titre, severite, date_incident) : après
+``verifier_schema()``, la table doit avoir toutes les colonnes du modèle et
+les routes qui les lisent doivent répondre normalement.
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+
+from sqlalchemy import func, inspect, select
+
+import app as application
+
+# Table créée par db.create_all() de la première version
+SCHEMA_INITIAL = """
+    CREATE TABLE incidents (
+        id INTEGER NOT NULL PRIMARY KEY,
+        titre VARCHAR(200) NOT NULL,
+        severite VARCHAR(50) NOT NULL,
+        date_incident DATETIME NOT NULL
+    )
+"""
+
+
+def creer_application_ancienne(dossier):
+    """Application sur une base SQLite au schéma initial, avec deux incidents"""
+    chemin = os.path.join(dossier, 'ancienne.db')
+    connexion = sqlite3.connect(chemin)
+    connexion.execute(SCHEMA_INITIAL)
+    connexion.executemany('INSERT INTO incidents (titre, severite, date_incident) VALUES (?, ?, ?)', [
+        ('Panne routeur principal', 'Critique', '2025-09-20 14:30:00.000000'),
+        ('Latence réseau', 'Moyenne', '2025-09-21 09:15:00.000000')
+    ])
+    connexion.commit()
+    connexion.close()
+    return application.create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{chemin}',
+        'INSTANTANE_ACTIF': False,
+        'RECHERCHE_BACKEND': 'memoire'
+    })
+
+
+def test_colonnes_ajoutees():
+    """verifier_schema ajoute les colonnes et index manquants"""
+    with tempfile.TemporaryDirectory() as dossier:
+        app = creer_application_ancienne(dossier)
+        application.verifier_schema(app)
+        with app.app_context():
+            inspecteur = inspect(application.db.engine)
+            colonnes = {colonne['name'] for colonne in inspecteur.get_columns('incidents')}
+            index = {element['name'] for element in inspecteur.get_indexes('incidents')}
+            dates = application.db.session.execute(
+                select(application.Incident.date_incident, application.Incident.date_modification)).all()
+            application.db.engine.dispose()
+    assert colonnes == set(application.Incident.__table__.columns.keys()), colonnes
+    assert {element.name for element in application.Incident.__table__.indexes} <= index, index
+    # Date de modification inconnue des lignes existantes : celle de l'incident
+    assert all(date_incident == date_modification for date_incident, date_modification in dates), dates
+
+
+def test_migration_idempotente():
+    """Une seconde vérification (autre worker, redémarrage) ne change rien"""
+    with tempfile.TemporaryDirectory() as dossier:
+        app = creer_application_ancienne(dossier)
+        application.verifier_schema(app)
+        with app.app_context():
+            application.migrer_schema()
+            assert application.db.session.execute(select(func.count(application.Incident.id))).scalar() == 2
+            application.db.engine.dispose()
+
+
+def test_routes_apres_migration():
+    """Détail, flux de changements, page de détail et recherche sur une base migrée"""
+    with tempfile.TemporaryDirectory() as dossier:
+        app = creer_application_ancienne(dossier)
+        application.verifier_schema(app)
+        client = app.test_client()
+
+        reponse = client.get('/api/incidents/1')
+        assert reponse.status_code == 200, reponse.get_data(as_text=True)
+        assert reponse.get_json()['titre'] == 'Panne routeur principal'
+
+        reponse = client.get('/api/incidents/changes')
+        assert reponse.status_code == 200, reponse.get_data(as_text=True)
+        assert [incident['id'] for incident in reponse.get_json()['incidents']] == [1, 2]
+
+        reponse = client.get('/incident/1')
+        assert reponse.status_code == 200, reponse.headers.get('Location')
+
+        reponse = client.get('/api/incidents/search?q=routeur')
+        assert reponse.status_code == 200, reponse.get_data(as_text=True)
+        assert [resultat['id'] for resultat in reponse.get_json()['resultats']] == [1]
+
+        reponse = client.post('/ajouter-incident', data={
+            'titre': 'Coupure fibre', 'severite': 'Critique', 'description': 'Chantier voisin'})
+        assert reponse.headers['Location'].endswith('/'), reponse.headers.get('Location')
+        with app.app_context():
+            application.db.engine.dispose()
+
+
+if __name__ == "__main__":
+    print("🧪 TEST DE LA MIGRATION DU SCHÉMA (SQLite)")
+    print("=" * 60)
+    echecs = 0
+    for test in (test_colonnes_ajoutees, test_migration_idempotente, test_routes_apres_migration):
+        try:
+            test()
+            print(f"✅ {test.__doc__}")
+        except AssertionError as e:
+            echecs += 1
+            print(f"❌ {test.__doc__}: {e}")
+    print("=" * 60)
+    sys.exit(1 if echecs else 0)
@@ -0,0 +1,150 @@
+"""
+🧪 Test des plans d'exécution des listes filtrées
+Flask Incidents Réseau - Version Azure
+
+Vérifie, sur une base SQLite locale, que les requêtes de /api/incidents
+(filtres severite/from/to et pagination par curseur) passent par l'index
+IX_incidents_date_severite, et celles de /api/incidents/changes par
+IX_incidents_date_modification : un retour au parcours complet de la
+table fait échouer le test.
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, insert, text
+
+import app as application
+
+NOM_INDEX = 'IX_incidents_date_severite'
+INDEX_CHANGEMENTS = 'IX_incidents_date_modification'
+
+
+def creer_application(dossier):
+    """Application sur une base SQLite jetable, peuplée de 2000 incidents"""
+    app = application.create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(dossier, 'plans.db')}",
+        'CACHE_BACKEND': 'aucun',
+        # Pas de rafraîchissement en arrière-plan : seules les requêtes de la route sont capturées
+        'INSTANTANE_ACTIF': False
+    })
+    with app.app_context():
+        application.db.create_all()
+        debut = datetime(2025, 1, 1)
+        lignes = [{
+            'titre': f'Incident {numero}',
+            'severite': application.SEVERITES[numero % len(application.SEVERITES)],
+            'date_incident': debut + timedelta(hours=numero),
+            # Modifications groupées par 100 : le curseur doit départager les ex aequo par id
+            'date_modification': debut + timedelta(days=numero // 100)
+        } for numero in range(2000)]
+        with application.db.engine.begin() as connexion:
+            connexion.execute(insert(application.Incident.__table__), lignes)
+            connexion.execute(text('ANALYZE'))
+    return app
+
+
+def plans_requetes(app, url):
+    """Plans SQLite (EXPLAIN QUERY PLAN) des SELECT exécutés pour une URL"""
+    requetes = []
+
+    def capturer(connexion, curseur, instruction, parametres, contexte, executemany):
+        if instruction.lstrip().upper().startswith('SELECT') and 'FROM incidents' in instruction:
+            requetes.append((instruction, parametres))
+
+    with app.app_context():
+        moteur = application.db.engine
+    event.listen(moteur, 'before_cursor_execute', capturer)
+    try:
+        reponse = app.test_client().get(url)
+    finally:
+        event.remove(moteur, 'before_cursor_execute', capturer)
+    assert reponse.status_code == 200, reponse.get_data(as_text=True)
+
+    plans = []
+    with moteur.connect() as connexion:
+        for instruction, parametres in requetes:
+            curseur = connexion.connection.cursor()
+            curseur.execute(f'EXPLAIN QUERY PLAN {instruction}', parametres)
+            plans.append((instruction, [ligne[3] for ligne in curseur.fetchall()]))
+    return reponse, plans
+
+
+def verifier_index(url, seek=True, index=NOM_INDEX):
+    """Vérifier que la requête de liste d'une URL utilise l'index"""
+    with tempfile.TemporaryDirectory() as dossier:
+        app = creer_application(dossier)
+        reponse, plans = plans_requetes(app, url)
+        # La requête de liste est celle qui trie par date (les autres sont des agrégats de version)
+        plans_liste = [details for instruction, details in plans if 'ORDER BY' in instruction]
+        assert plans_liste, f'Aucune requête de liste capturée pour {url}'
+
+        for details in plans_liste:
+            print(f"🔍 {url}")
+            for ligne in details:
+                print(f"   {ligne}")
+            acces_table = [ligne for ligne in details if 'incidents' in ligne]
+            assert acces_table and all(index in ligne for ligne in acces_table), \
+                f'{url} ne passe pas par {index}: {details}'
+            if seek:
+                assert any(ligne.startswith('SEARCH') for ligne in acces_table), \
+                    f'{url} parcourt tout l\'index au lieu d\'un seek: {details}'
+        with app.app_context():
+            application.db.engine.dispose()
+        return reponse.get_json()
+
+
+def test_filtre_plage_de_dates():
+    """from/to : seek sur la plage de dates"""
+    donnees = verifier_index('/api/incidents?from=2025-01-10&to=2025-01-20')
+    assert donnees['incidents']
+    assert all('2025-01-10' <= incident['date_incident'] < '2025-01-20' for incident in donnees['incidents'])
+
+
+def test_filtre_severite_et_dates():
+    """severite + from/to : seek sur la date, sévérité évaluée dans l'index"""
+    donnees = verifier_index('/api/incidents?severite=Critique&severite=Faible&from=2025-01-10&to=2025-02-01')
+    assert donnees['incidents']
+    assert {incident['severite'] for incident in donnees['incidents']} <= {'Critique', 'Faible'}
+
+
+def test_filtre_severite_seule():
+    """severite seule : parcours ordonné de l'index, arrêté après une page"""
+    donnees = verifier_index('/api/incidents?severite=Critique&limit=20', seek=False)
+    assert len(donnees['incidents']) == 20
+    assert all(incident['severite'] == 'Critique' for incident in donnees['incidents'])
+
+
+def test_page_suivante_filtree():
+    """Curseur + filtres : seek sur la position du curseur"""
+    premiere = verifier_index('/api/incidents?severite=Moyenne&to=2025-03-01&limit=10')
+    suivante = premiere['pagination']['next']
+    assert 'severite=Moyenne' in suivante and 'to=2025-03-01' in suivante
+    verifier_index(suivante)
+
+
+def test_flux_changements():
+    """since : seek sur (date_modification, id), sans doublon ni trou entre les pages"""
+    premiere = verifier_index('/api/incidents/changes?limit=150', index=INDEX_CHANGEMENTS)
+    assert premiere['pagination']['has_more']
+    suivante = verifier_index(premiere['pagination']['next'], index=INDEX_CHANGEMENTS)
+    ids = [incident['id'] for incident in premiere['incidents'] + suivante['incidents']]
+    assert ids == list(range(1, 301))
+
+
+if __name__ == "__main__":
+    print("🧪 TEST DES PLANS D'EXÉCUTION (SQLite)")
+    print("=" * 60)
+    echecs = 0
+    for test in (test_filtre_plage_de_dates, test_filtre_severite_et_dates,
+                 test_filtre_severite_seule, test_page_suivante_filtree, test_flux_changements):
+        try:
+            test()
+            print(f"✅ {test.__doc__}")
+        except AssertionError as e:
+            echecs += 1
+            print(f"❌ {test.__doc__}: {e}")
+    print("=" * 60)
+    sys.exit(1 if echecs else 0)
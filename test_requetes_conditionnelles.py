@@ -0,0 +1,89 @@
+"""
+🧪 Test des requêtes conditionnelles (ETag / Last-Modified)
+Flask Incidents Réseau - Version Azure
+
+Deux applications sur le même fichier SQLite jouent deux workers gunicorn,
+chacun avec son cache : une écriture passée par l'un doit invalider
+aussitôt les validateurs annoncés par l'autre.
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+import app as application
+
+
+def creer_workers(dossier):
+    configuration = {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(dossier, 'conditionnelles.db')}",
+        'INSTANTANE_ACTIF': False
+    }
+    worker_a, worker_b = application.create_app(dict(configuration)), application.create_app(dict(configuration))
+    with worker_a.app_context():
+        application.db.create_all()
+    return worker_a, worker_b
+
+
+def ajouter(client, titre):
+    reponse = client.post('/ajouter-incident', data={'titre': titre, 'severite': 'Moyenne'})
+    assert reponse.headers['Location'].endswith('/'), reponse.headers.get('Location')
+
+
+def test_ecriture_d_un_autre_worker():
+    """Après une écriture par le worker A, le worker B ne répond plus 304 à l'ancien ETag"""
+    with tempfile.TemporaryDirectory() as dossier:
+        worker_a, worker_b = creer_workers(dossier)
+        client_a, client_b = worker_a.test_client(), worker_b.test_client()
+        ajouter(client_a, 'Panne routeur')
+
+        reponse = client_b.get('/api/incidents')
+        etag = reponse.headers['ETag']
+        assert client_b.get('/api/incidents', headers={'If-None-Match': etag}).status_code == 304
+
+        ajouter(client_a, 'Coupure fibre')
+        reponse = client_b.get('/api/incidents', headers={'If-None-Match': etag})
+        assert reponse.status_code == 200, reponse.status_code
+        assert [incident['titre'] for incident in reponse.get_json()['incidents']] == ['Coupure fibre', 'Panne routeur']
+        for worker in (worker_a, worker_b):
+            with worker.app_context():
+                application.db.engine.dispose()
+
+
+def test_import_antidate():
+    """Un incident antidaté change quand même Last-Modified (date d'écriture, pas d'événement)"""
+    with tempfile.TemporaryDirectory() as dossier:
+        worker, _ = creer_workers(dossier)
+        client = worker.test_client()
+        ajouter(client, 'Panne routeur')
+        derniere_modification = client.get('/api/incidents').headers['Last-Modified']
+
+        with worker.app_context():
+            with application.db.engine.begin() as connexion:
+                # Écrit une seconde plus tard, daté de 2001
+                connexion.execute(insert(application.Incident.__table__), [{
+                    'titre': 'Archive', 'severite': 'Faible', 'date_incident': datetime(2001, 1, 1),
+                    'date_modification': datetime.utcnow().replace(microsecond=0) + timedelta(seconds=1)
+                }])
+        reponse = client.get('/api/incidents', headers={'If-Modified-Since': derniere_modification})
+        assert reponse.status_code == 200, reponse.status_code
+        with worker.app_context():
+            application.db.engine.dispose()
+
+
+if __name__ == "__main__":
+    print("🧪 TEST DES REQUÊTES CONDITIONNELLES")
+    print("=" * 60)
+    echecs = 0
+    for test in (test_ecriture_d_un_autre_worker, test_import_antidate):
+        try:
+            test()
+            print(f"✅ {test.__doc__}")
+        except AssertionError as e:
+            echecs += 1
+            print(f"❌ {test.__doc__}: {e}")
+    print("=" * 60)
+    sys.exit(1 if echecs else 0)
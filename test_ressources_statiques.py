@@ -0,0 +1,86 @@
+"""
+🧪 Test des ressources statiques à empreinte de contenu
+Flask Incidents Réseau - Version Azure
+
+Vérifie avec un dossier static/ temporaire les URLs à empreinte, la
+négociation gzip et le rechargement en mode debug, y compris quand le mode
+est activé après l'initialisation (configuration, FLASK_DEBUG).
+"""
+
+import gzip
+import os
+import sys
+import tempfile
+
+from flask import Flask
+
+from ressources_statiques import CACHE_IMMUABLE, RessourcesStatiques
+
+
+def creer_application(dossier):
+    with open(os.path.join(dossier, 'app.css'), 'w', encoding='utf-8') as fichier:
+        fichier.write('body { color: red; }\n' * 50)
+    app = Flask(__name__, static_folder=dossier)
+    RessourcesStatiques(app)
+    return app
+
+
+def url(app, source):
+    with app.test_request_context():
+        return app.extensions['ressources_statiques'].url(source)
+
+
+def modifier(dossier):
+    chemin = os.path.join(dossier, 'app.css')
+    with open(chemin, 'a', encoding='utf-8') as fichier:
+        fichier.write('a { color: blue; }\n')
+    # mtime différent même sur un système de fichiers à faible résolution
+    os.utime(chemin, ns=(os.stat(chemin).st_atime_ns, os.stat(chemin).st_mtime_ns + 10 ** 9))
+
+
+def test_servir_variante_gzip():
+    """Une ressource est servie sous son empreinte, compressée et immuable"""
+    with tempfile.TemporaryDirectory() as dossier:
+        app = creer_application(dossier)
+        adresse = url(app, 'app.css')
+        assert adresse.startswith('/assets/app.') and adresse.endswith('.css'), adresse
+        reponse = app.test_client().get(adresse, headers={'Accept-Encoding': 'gzip'})
+        assert reponse.status_code == 200
+        assert reponse.headers['Content-Encoding'] == 'gzip'
+        assert reponse.headers['Cache-Control'] == CACHE_IMMUABLE
+        assert gzip.decompress(reponse.data).startswith(b'body')
+        assert app.test_client().get('/assets/app.0000000000.css').status_code == 404
+
+
+def test_debug_active_apres_init():
+    """Le mode debug activé après init_app recharge les fichiers modifiés"""
+    with tempfile.TemporaryDirectory() as dossier:
+        app = creer_application(dossier)
+        app.debug = True
+        avant = url(app, 'app.css')
+        modifier(dossier)
+        assert url(app, 'app.css') != avant
+
+
+def test_production_sans_rechargement():
+    """Hors debug, le manifeste n'est calculé qu'une fois"""
+    with tempfile.TemporaryDirectory() as dossier:
+        app = creer_application(dossier)
+        avant = url(app, 'app.css')
+        modifier(dossier)
+        assert url(app, 'app.css') == avant
+
+
+if __name__ == "__main__":
+    print("🧪 TEST DES RESSOURCES STATIQUES")
+    print("=" * 60)
+    echecs = 0
+    for test in (test_servir_variante_gzip, test_debug_active_apres_init, test_production_sans_rechargement):
+        try:
+            test()
+            print(f"✅ {test.__doc__}")
+        except AssertionError as e:
+            echecs += 1
+            print(f"❌ {test.__doc__}: {e}")
+    print("=" * 60)
+    sys.exit(1 if echecs else 0)
@@ -0,0 +1,133 @@
+"""
+🧪 Test du routage des lectures vers un réplica
+Flask Incidents Réseau - Version Azure
+
+Deux fichiers SQLite jouent le primaire et le réplica ; leurs contenus
+diffèrent volontairement pour savoir quel moteur a servi chaque réponse.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import insert
+
+import app as application
+
+
+def creer_application(dossier, replica=True, **configuration):
+    """Primaire avec l'incident 1, réplica (en retard) vide ou sans table"""
+    app = application.create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(dossier, 'primaire.db')}",
+        'SQLALCHEMY_BINDS': {'lecture': f"sqlite:///{os.path.join(dossier, 'replica.db')}"},
+        'INSTANTANE_ACTIF': False,
+        # Mesure du retard seulement à la demande du test
+        'LECTURE_INTERVALLE': 3600,
+        **configuration
+    })
+    with app.app_context():
+        application.db.create_all()
+        inserer(application.db.engines[None], 'Primaire')
+        if replica:
+            # Le modèle n'a pas de bind : table créée directement sur le moteur du réplica
+            application.Incident.__table__.create(application.db.engines['lecture'])
+    attendre_premiere_mesure(app.extensions['routage_lecture'])
+    return app
+
+
+def attendre_premiere_mesure(routage):
+    """Démarrer le thread de mesure et attendre sa première mesure (sinon il démarre à la
+    première requête et peut rouvrir les fichiers pendant la suppression du dossier)"""
+    routage.demarrer()
+    limite = time.monotonic() + 5
+    while routage._mesure_le is None and routage._derniere_erreur is None and time.monotonic() < limite:
+        time.sleep(0.01)
+
+
+def inserer(moteur, titre):
+    with moteur.begin() as connexion:
+        connexion.execute(insert(application.Incident.__table__),
+                          [{'titre': titre, 'severite': 'Moyenne', 'date_incident': datetime.now()}])
+
+
+def titres(reponse):
+    assert reponse.status_code == 200, reponse.get_data(as_text=True)
+    return [incident['titre'] for incident in reponse.get_json()['incidents']]
+
+
+def fermer(app):
+    with app.app_context():
+        for moteur in application.db.engines.values():
+            moteur.dispose()
+
+
+def test_lecture_sur_le_replica():
+    """Les vues de lecture interrogent le réplica, le flux de changements reste sur le primaire"""
+    with tempfile.TemporaryDirectory() as dossier:
+        app = creer_application(dossier)
+        with app.app_context():
+            inserer(application.db.engines['lecture'], 'Réplica')
+        client = app.test_client()
+        assert titres(client.get('/api/incidents')) == ['Réplica']
+        assert app.extensions['routage_lecture'].etat()['lectures_replica'] == 1
+        fermer(app)
+
+
+def test_lecture_de_sa_propre_ecriture():
+    """Après une écriture, le client lit sur le primaire, hors cache, et voit son incident"""
+    with tempfile.TemporaryDirectory() as dossier:
+        app = creer_application(dossier)
+        client = app.test_client()
+        # Page du réplica (vide) mise en cache
+        assert titres(client.get('/api/incidents')) == []
+
+        reponse = client.post('/ajouter-incident', data={'titre': 'Coupure fibre', 'severite': 'Critique'})
+        assert 'lecture_primaire=1' in reponse.headers['Set-Cookie']
+        assert titres(client.get('/api/incidents')) == ['Coupure fibre', 'Primaire']
+
+        # Un autre client, sans cookie, lit le réplica : sa page n'est pas resservie au premier
+        assert titres(app.test_client().get('/api/incidents')) == []
+        assert titres(client.get('/api/incidents')) == ['Coupure fibre', 'Primaire']
+        fermer(app)
+
+
+def test_replica_en_erreur():
+    """Requête en échec sur le réplica : la vue est rejouée sur le primaire"""
+    with tempfile.TemporaryDirectory() as dossier:
+        app = creer_application(dossier, replica=False)
+        client = app.test_client()
+        assert titres(client.get('/api/incidents')) == ['Primaire']
+        etat = app.extensions['routage_lecture'].etat()
+        assert etat['echecs_replica'] >= 1 and not etat['disponible'], etat
+        fermer(app)
+
+
+def test_replica_en_retard():
+    """Retard au-delà de LECTURE_RETARD_MAX : les lectures repassent sur le primaire"""
+    with tempfile.TemporaryDirectory() as dossier:
+        app = creer_application(dossier, LECTURE_RETARD_MAX=0.05)
+        routage = app.extensions['routage_lecture']
+        routage.mesurer()
+        time.sleep(0.1)
+        routage.mesurer()
+        assert not routage.replica_disponible()
+        assert titres(app.test_client().get('/api/incidents')) == ['Primaire']
+        fermer(app)
+
+
+if __name__ == "__main__":
+    print("🧪 TEST DU ROUTAGE DES LECTURES (SQLite)")
+    print("=" * 60)
+    echecs = 0
+    for test in (test_lecture_sur_le_replica, test_lecture_de_sa_propre_ecriture,
+                 test_replica_en_erreur, test_replica_en_retard):
+        try:
+            test()
+            print(f"✅ {test.__doc__}")
+        except AssertionError as e:
+            echecs += 1
+            print(f"❌ {test.__doc__}: {e}")
+    print("=" * 60)
+    sys.exit(1 if echecs else 0)
@@ -0,0 +1,100 @@
+"""
+🧪 Test des statistiques incrémentales des incidents
+Flask Incidents Réseau - Version Azure
+
+Vérifie avec une source en mémoire, sans base, la mise à jour des
+agrégats à chaque écriture, la réconciliation et les fenêtres des
+histogrammes.
+"""
+
+import sys
+from datetime import datetime, timedelta
+
+from stats_incidents import AgregatsIncidents, cle_heure, cle_jour
+
+
+class SourceFactice:
+    """Agrégats « en base » renvoyés tels quels par la réconciliation"""
+
+    def __init__(self, par_severite=None, par_heure=None, par_jour=None):
+        self.resultat = (par_severite or {}, par_heure or {}, par_jour or {})
+        self.appels = 0
+
+    def __call__(self, debut_heures, debut_jours):
+        self.appels += 1
+        return self.resultat
+
+
+def test_cles():
+    """Les clés des histogrammes tronquent à l'heure et au jour"""
+    date = datetime(2024, 3, 5, 14, 37, 12)
+    assert cle_heure(date) == '2024-03-05T14:00'
+    assert cle_jour(date) == '2024-03-05'
+
+
+def test_enregistrer_avant_chargement():
+    """Une écriture avant la première réconciliation n'est pas comptée deux fois"""
+    source = SourceFactice({'high': 1})
+    agregats = AgregatsIncidents(source)
+    agregats.enregistrer('high', datetime.now())
+    photo = agregats.photo()
+    assert photo['total'] == 1 and photo['par_severite'] == {'high': 1}, photo
+    assert source.appels == 1
+
+
+def test_enregistrer():
+    """Chaque écriture met à jour sévérités et histogrammes sans relire la source"""
+    maintenant = datetime.now()
+    source = SourceFactice({'low': 2}, {cle_heure(maintenant): 2}, {cle_jour(maintenant): 2})
+    agregats = AgregatsIncidents(source)
+    agregats.photo()
+    agregats.enregistrer('high', maintenant)
+    agregats.enregistrer('low', maintenant)
+
+    photo = agregats.photo()
+    assert photo['par_severite'] == {'high': 1, 'low': 3}, photo['par_severite']
+    assert photo['par_heure'] == [{'debut': cle_heure(maintenant), 'nombre': 4}], photo['par_heure']
+    assert photo['par_jour'] == [{'debut': cle_jour(maintenant), 'nombre': 4}], photo['par_jour']
+    assert source.appels == 1
+
+
+def test_reconciliation():
+    """La réconciliation remplace les compteurs par ceux de la source"""
+    source = SourceFactice({'low': 2})
+    agregats = AgregatsIncidents(source, intervalle_reconciliation=0)
+    agregats.photo()
+    agregats.enregistrer('high', datetime.now())
+    source.resultat = ({'low': 5}, {}, {})
+    photo = agregats.photo()
+    assert photo['par_severite'] == {'low': 5}, photo['par_severite']
+    assert source.appels == 2
+
+
+def test_fenetres():
+    """Les histogrammes ne montrent que les dernières heures et les derniers jours"""
+    maintenant = datetime.now()
+    ancien = maintenant - timedelta(days=10)
+    source = SourceFactice({'low': 2},
+                           {cle_heure(ancien): 1, cle_heure(maintenant): 1},
+                           {cle_jour(ancien): 1, cle_jour(maintenant): 1})
+    agregats = AgregatsIncidents(source, heures=24, jours=7)
+    photo = agregats.photo()
+    assert [h['debut'] for h in photo['par_heure']] == [cle_heure(maintenant)], photo['par_heure']
+    assert [j['debut'] for j in photo['par_jour']] == [cle_jour(maintenant)], photo['par_jour']
+    assert photo['total'] == 2 and photo['fenetre'] == {'heures': 24, 'jours': 7}
+
+
+if __name__ == "__main__":
+    print("🧪 TEST DES STATISTIQUES DES INCIDENTS")
+    print("=" * 60)
+    echecs = 0
+    for test in (test_cles, test_enregistrer_avant_chargement, test_enregistrer,
+                 test_reconciliation, test_fenetres):
+        try:
+            test()
+            print(f"✅ {test.__doc__}")
+        except AssertionError as e:
+            echecs += 1
+            print(f"❌ {test.__doc__}: {e}")
+    print("=" * 60)
+    sys.exit(1 if echecs else 0)
@@ -0,0 +1,21 @@
+"""
+🌐 Point d'entrée WSGI de production
+Flask Incidents Réseau - Version Azure
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+``python app.py`` reste réservé au développement (serveur Werkzeug avec
+débogueur). Avec ``preload_app``, ce module est importé une seule fois dans
+le maître gunicorn : la configuration est lue et les templates compilés
+avant le fork, puis partagés par tous les workers. Le schéma d'une base
+créée par une version antérieure y est aussi migré, une seule fois.
+"""
+
+from app import create_app, verifier_schema
+
+app = create_app()
+verifier_schema(app)
+
+# Compiler les templates maintenant plutôt qu'à la première requête de chaque worker
+for nom in app.jinja_env.list_templates():
+    app.jinja_env.get_template(nom)